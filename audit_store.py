@@ -0,0 +1,324 @@
+"""Indexed SQLite store of session summaries with daily and weekly rollups.
+
+Every finished session (live view, ``batch_audit.py --db``) becomes one row of
+``sessions``, indexed by operator, workstation, start time and REBA risk tier.
+Each insert also updates the ``rollups`` rows of its workstation and of its
+operator for its day and ISO week in the same transaction, so dashboard
+questions such as "worst workstations this month" read a few hundred
+pre-aggregated rows instead of scanning every session.  Session ids are
+unique: a summary re-sent before it was acknowledged is stored and counted
+once.  Every summary must carry its ``session_id`` and ``started_at``; the
+store does not make them up.
+
+    store = AuditStore()
+    store.add(summary)
+    store.worst_workstations(since="2026-10-01")
+
+Days and weeks are UTC, as in the ``started_at`` timestamps of the summaries.
+
+    python audit_store.py ingest audits/*.json
+    python audit_store.py rebuild
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+DEFAULT_PATH = Path(os.environ.get("REBA_AUDIT_DB", "audits.db"))
+
+# REBA action levels, as in the report's risk table: (name, lowest score).
+RISK_TIERS = (("None", 1), ("Low", 2), ("Medium", 4), ("High", 8), ("Very high", 11))
+HIGH_RISK_TIER = 3
+PERIODS = ("day", "week")
+# Rollups are kept per workstation and, separately, per operator.
+DIMENSIONS = {"workstation": "workstation", "operator": "operator_id"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    operator_id TEXT NOT NULL,
+    workstation TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    week TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    total_frames INTEGER NOT NULL,
+    peak_reba INTEGER NOT NULL,
+    sustained_reba INTEGER,
+    peak_li REAL NOT NULL,
+    risk_tier INTEGER NOT NULL,
+    lifts INTEGER,
+    composite_li REAL,
+    summary TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_operator ON sessions (operator_id, started_at);
+CREATE INDEX IF NOT EXISTS sessions_workstation ON sessions (workstation, started_at);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started_at);
+CREATE INDEX IF NOT EXISTS sessions_risk ON sessions (risk_tier, started_at);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    period_start TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    sum_peak_reba INTEGER NOT NULL,
+    max_peak_reba INTEGER NOT NULL,
+    max_peak_li REAL NOT NULL,
+    li_over_1 INTEGER NOT NULL,
+    high_risk INTEGER NOT NULL,
+    PRIMARY KEY (period, dimension, period_start, key)
+) WITHOUT ROWID;
+"""
+
+_INSERT_SESSION = """
+INSERT OR IGNORE INTO sessions (session_id, operator_id, workstation, started_at, day, week, duration_s, total_frames,
+                                peak_reba, sustained_reba, peak_li, risk_tier, lifts, composite_li, summary)
+VALUES (:session_id, :operator_id, :workstation, :started_at, :day, :week, :duration_s, :total_frames,
+        :peak_reba, :sustained_reba, :peak_li, :risk_tier, :lifts, :composite_li, :summary)
+"""
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollups VALUES (:period, :dimension, :period_start, :key, 1, :total_frames, :duration_s,
+                            :peak_reba, :peak_reba, :peak_li, :peak_li > 1.0, :risk_tier >= :high_risk_tier)
+ON CONFLICT (period, dimension, period_start, key) DO UPDATE SET
+    sessions = sessions + 1,
+    frames = frames + excluded.frames,
+    duration_s = duration_s + excluded.duration_s,
+    sum_peak_reba = sum_peak_reba + excluded.sum_peak_reba,
+    max_peak_reba = max(max_peak_reba, excluded.max_peak_reba),
+    max_peak_li = max(max_peak_li, excluded.max_peak_li),
+    li_over_1 = li_over_1 + excluded.li_over_1,
+    high_risk = high_risk + excluded.high_risk
+"""
+
+
+def risk_tier(reba):
+    """Index into ``RISK_TIERS`` of a REBA score."""
+    return max(i for i, (_, lowest) in enumerate(RISK_TIERS) if reba >= lowest)
+
+
+def _started(summary):
+    text = summary.get("started_at")
+    if not text:
+        raise ValueError(f"summary of {summary.get('operator_id')!r} has no started_at")
+    started = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    return started if started.tzinfo else started.replace(tzinfo=timezone.utc)
+
+
+def _day(value):
+    """``YYYY-MM-DD`` for a date, datetime or ISO string (``None`` passes through)."""
+    if value is None or isinstance(value, str) and len(value) == 10:
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+    return value.isoformat()
+
+
+def _epoch(day):
+    return datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _row(summary):
+    if not summary.get("session_id"):
+        raise ValueError(f"summary of {summary.get('operator_id')!r} has no session_id")
+    started = _started(summary)
+    day = started.date()
+    niosh = summary.get("peak_niosh") or {}
+    lifting = summary.get("lifting") or {}
+    return {
+        "session_id": summary["session_id"],
+        "operator_id": summary["operator_id"],
+        "workstation": summary.get("workstation") or "",
+        "started_at": started.timestamp(),
+        "day": day.isoformat(),
+        "week": (day - timedelta(days=day.weekday())).isoformat(),
+        "duration_s": float(summary.get("duration_s") or 0.0),
+        "total_frames": int(summary.get("total_frames") or 0),
+        "peak_reba": int(summary["peak_reba"]),
+        "sustained_reba": summary.get("sustained_reba"),
+        "peak_li": float(niosh.get("li", 0.0)),
+        "risk_tier": risk_tier(int(summary["peak_reba"])),
+        "lifts": lifting.get("lifts"),
+        "composite_li": lifting.get("composite_li"),
+        "summary": json.dumps(summary),
+    }
+
+
+class AuditStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        # WAL lets the dashboard read while the live view writes.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, summary):
+        """Store one session summary; returns False if its session id is already stored."""
+        return self.add_many([summary]) == 1
+
+    def add_many(self, summaries):
+        """Store summaries in one transaction; multi-person summaries add one session per track.
+
+        A track's session id is its summary's, suffixed with the track's operator id.
+        """
+        added = 0
+        with self.conn:
+            for summary in summaries:
+                for s in summary.get("tracks") or [summary]:
+                    if "tracks" in summary:
+                        s = {**s, "session_id": summary.get("session_id") and f"{summary['session_id']}:{s['operator_id']}",
+                             "source": summary.get("source", ""), "started_at": summary.get("started_at"),
+                             "workstation": s.get("workstation") or summary.get("workstation", "")}
+                    added += self._insert(_row(s))
+        return added
+
+    def _insert(self, row):
+        if self.conn.execute(_INSERT_SESSION, row).rowcount == 0:
+            return 0
+        for period in PERIODS:
+            for dimension, column in DIMENSIONS.items():
+                self.conn.execute(_UPSERT_ROLLUP, {**row, "period": period, "dimension": dimension,
+                                                   "period_start": row[period], "key": row[column],
+                                                   "high_risk_tier": HIGH_RISK_TIER})
+        return 1
+
+    def rebuild_rollups(self):
+        """Recompute every rollup row from ``sessions``."""
+        with self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            for period in PERIODS:
+                for dimension, column in DIMENSIONS.items():
+                    self.conn.execute(f"""
+                        INSERT INTO rollups
+                        SELECT '{period}', '{dimension}', {period}, {column}, count(*), sum(total_frames),
+                               sum(duration_s), sum(peak_reba), max(peak_reba), max(peak_li), sum(peak_li > 1.0),
+                               sum(risk_tier >= ?)
+                        FROM sessions GROUP BY {period}, {column}
+                    """, (HIGH_RISK_TIER,))
+
+    def _rollup_filter(self, period, dimension, since, until, key=None):
+        if period not in PERIODS:
+            raise ValueError(f"period must be one of {PERIODS}, got {period!r}")
+        where, params = ["period = ?", "dimension = ?"], [period, dimension]
+        if since is not None:
+            # A week that started before ``since`` still counts if it overlaps it.
+            start = _day(since) if period == "day" else (date.fromisoformat(_day(since)) - timedelta(days=6)).isoformat()
+            where.append("period_start >= ?"); params.append(start)
+        if until is not None:
+            where.append("period_start <= ?"); params.append(_day(until))
+        if key is not None:
+            where.append("key = ?"); params.append(key)
+        return " AND ".join(where), params
+
+    def worst_workstations(self, since=None, until=None, limit=10):
+        """Workstations ranked by mean peak REBA over the days ``since`` to ``until`` (inclusive)."""
+        where, params = self._rollup_filter("day", "workstation", since, until)
+        return [dict(r) for r in self.conn.execute(f"""
+            SELECT key AS workstation, sum(sessions) AS sessions, round(1.0 * sum(sum_peak_reba) / sum(sessions), 2)
+                       AS mean_peak_reba,
+                   max(max_peak_reba) AS max_peak_reba, round(max(max_peak_li), 2) AS max_peak_li,
+                   sum(high_risk) AS high_risk_sessions, sum(li_over_1) AS li_over_1_sessions,
+                   round(sum(duration_s) / 3600.0, 2) AS hours
+            FROM rollups WHERE {where}
+            GROUP BY key ORDER BY mean_peak_reba DESC, max_peak_li DESC LIMIT ?
+        """, (*params, limit))]
+
+    def operators_above_li(self, threshold=1.0, since=None, until=None):
+        """Operators with sessions whose peak lifting index exceeds ``threshold``, most sessions first."""
+        where, params = ["peak_li > ?"], [threshold]
+        if since is not None:
+            where.append("started_at >= ?"); params.append(_epoch(_day(since)))
+        if until is not None:
+            where.append("started_at < ?"); params.append(_epoch(_day(until)) + 86400)
+        return [dict(r) for r in self.conn.execute(f"""
+            SELECT operator_id, count(*) AS sessions, round(max(peak_li), 2) AS max_peak_li,
+                   group_concat(DISTINCT workstation) AS workstations, max(day) AS last_day
+            FROM sessions WHERE {' AND '.join(where)}
+            GROUP BY operator_id ORDER BY sessions DESC, max_peak_li DESC
+        """, params)]
+
+    def trend(self, period="day", since=None, until=None, workstation=None, operator_id=None):
+        """Per-day or per-week totals, for everyone or for one workstation or one operator."""
+        if workstation is not None and operator_id is not None:
+            raise ValueError("trend takes a workstation or an operator, not both")
+        if operator_id is not None:
+            where, params = self._rollup_filter(period, "operator", since, until, operator_id)
+        else:
+            where, params = self._rollup_filter(period, "workstation", since, until, workstation)
+        return [dict(r) for r in self.conn.execute(f"""
+            SELECT period_start, sum(sessions) AS sessions, round(1.0 * sum(sum_peak_reba) / sum(sessions), 2)
+                       AS mean_peak_reba,
+                   max(max_peak_reba) AS max_peak_reba, round(max(max_peak_li), 2) AS max_peak_li,
+                   sum(high_risk) AS high_risk_sessions, sum(li_over_1) AS li_over_1_sessions
+            FROM rollups WHERE {where}
+            GROUP BY period_start ORDER BY period_start
+        """, params)]
+
+    def sessions(self, since=None, until=None, workstation=None, operator_id=None, min_tier=0, limit=100):
+        """Most recent sessions matching the filters, without their full summaries."""
+        where, params = ["risk_tier >= ?"], [min_tier]
+        for column, value in (("workstation", workstation), ("operator_id", operator_id)):
+            if value is not None:
+                where.append(f"{column} = ?"); params.append(value)
+        if since is not None:
+            where.append("started_at >= ?"); params.append(_epoch(_day(since)))
+        if until is not None:
+            where.append("started_at < ?"); params.append(_epoch(_day(until)) + 86400)
+        return [dict(r) for r in self.conn.execute(f"""
+            SELECT session_id, operator_id, workstation, day, duration_s, peak_reba, sustained_reba,
+                   round(peak_li, 2) AS peak_li, risk_tier, lifts, composite_li
+            FROM sessions WHERE {' AND '.join(where)} ORDER BY started_at DESC LIMIT ?
+        """, (*params, limit))]
+
+    def summary(self, session_id):
+        """The full stored summary of a session, or ``None``."""
+        row = self.conn.execute("SELECT summary FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return None if row is None else json.loads(row["summary"])
+
+    def distinct(self, column):
+        """Known workstations or operators."""
+        if column not in ("workstation", "operator_id"):
+            raise ValueError(f"unknown column {column!r}")
+        return [r[0] for r in self.conn.execute(f"SELECT DISTINCT {column} FROM sessions ORDER BY {column}")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--db", default=str(DEFAULT_PATH))
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="store session summary JSON files (batch_audit.py output)")
+    ingest.add_argument("files", nargs="+")
+    sub.add_parser("rebuild", help="recompute the daily and weekly rollups from the sessions")
+    args = parser.parse_args(argv)
+
+    with AuditStore(args.db) as store:
+        if args.command == "ingest":
+            summaries = [json.loads(Path(f).read_text()) for f in args.files]
+            print(f"{store.add_many(summaries)} new session(s) stored in {args.db}")
+        else:
+            store.rebuild_rollups()
+            print(f"rollups rebuilt in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Offline batch REBA / NIOSH / MMH audit of recorded workstation videos.
+
+Decodes each video as a streaming generator, runs MediaPipe Pose and YOLOv8
+per frame, scores frames in vectorized chunks with ``reba_engine`` and writes
+one JSON summary per file with the same per-body-part tier breakdown the live
+view keeps in ``bodyPartFrames``.  Files are spread over a process pool.
+
+    python batch_audit.py recordings/*.mp4 --out-dir audits --workers 8
+    python batch_audit.py recordings/line3/*.mp4 --workstation LINE3-PACK --db audits.db
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+import reba_engine
+from audit_store import AuditStore
+from lifting import LIFT_DURATIONS
+from session import AuditSession
+from vision import DETECTION_REGIONS, YOLO_WEIGHTS
+
+CHUNK_FRAMES = 256
+
+_detector = None
+_det_region = "full"
+
+
+def iter_frames(path, stride=1):
+    """Yield ``(index, timestamp_s, frame_bgr)`` for every ``stride``-th frame."""
+    import cv2
+
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        raise IOError(f"cannot open video {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    try:
+        while cap.grab():
+            if index % stride == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                yield index, index / fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def recording_started_at(path):
+    """When the recording began, as an ISO UTC timestamp: the file's modification
+    time (when the recorder closed it) less the video's length."""
+    import cv2
+
+    cap = cv2.VideoCapture(str(path))
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        length_s = max(cap.get(cv2.CAP_PROP_FRAME_COUNT), 0.0) / fps
+    finally:
+        cap.release()
+    started = datetime.fromtimestamp(Path(path).stat().st_mtime - length_s, timezone.utc)
+    return started.isoformat().replace("+00:00", "Z")
+
+
+def _init_worker(weights, det_region="full", threads=None):
+    global _detector, _det_region
+    from detectors import make_detector
+
+    _detector = make_detector(weights, threads)
+    _det_region = det_region
+
+
+def _worker_detector():
+    """This process's detector; loaded with the default weights when ``audit_video`` runs outside the pool."""
+    if _detector is None:
+        _init_worker(YOLO_WEIGHTS, _det_region)
+    return _detector
+
+
+def audit_video(path, out_dir, operator_id=None, profile="Male", actual_wt=8.0, stride=1, multi_person=False,
+                angle_mode="2d", lift_duration="long", workstation=""):
+    import cv2
+    from vision import PoseEstimator, wrist_pixels
+
+    path = Path(path)
+    started = time.perf_counter()
+    if multi_person:
+        if _det_region != "full":
+            raise ValueError("multi-person audits need full-frame detection to find people")
+        summary = _audit_multi_person(path, operator_id or path.stem, profile, actual_wt, stride, angle_mode,
+                                      lift_duration)
+        summary["workstation"] = workstation
+        return _write_summary(summary, path, out_dir, started)
+
+    session = AuditSession(operator_id or path.stem, profile, actual_wt, workstation, angle_mode=angle_mode,
+                           lift_duration=lift_duration)
+    detector = _worker_detector()
+    pose = PoseEstimator()
+    landmarks, objects, timestamps = [], [], []
+    width = height = None
+
+    def flush():
+        if landmarks:
+            session.score(np.stack(landmarks), objects, timestamps, width, height)
+            landmarks.clear(); objects.clear(); timestamps.clear()
+
+    try:
+        for _, ts, frame in iter_frames(path, stride):
+            height, width = frame.shape[:2]
+            lm = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if lm is None:
+                continue
+            if _det_region == "wrists":
+                detections = detector.detect_near_hands(frame, lm)
+            else:
+                detections = detector.detect(frame)
+            left, right = wrist_pixels(lm, width, height)
+            landmarks.append(lm)
+            objects.append(reba_engine.hand_object(detections, left, right))
+            timestamps.append(ts)
+            if len(landmarks) >= CHUNK_FRAMES:
+                flush()
+        flush()
+    finally:
+        pose.close()
+
+    return _write_summary(session.summary(), path, out_dir, started)
+
+
+def _audit_multi_person(path, operator_prefix, profile, actual_wt, stride, angle_mode="2d", lift_duration="long"):
+    import cv2
+    from tracking import MultiPersonAuditor
+    from vision import PoseEstimator
+
+    detector = _worker_detector()
+    auditor = MultiPersonAuditor(PoseEstimator, operator_prefix, profile, actual_wt, angle_mode, lift_duration)
+    first_ts = last_ts = None
+    for _, ts, frame in iter_frames(path, stride):
+        auditor.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), ts, detector.detect(frame))
+        first_ts = ts if first_ts is None else first_ts
+        last_ts = ts
+    tracks = auditor.finish()
+    return {
+        "operator_id": operator_prefix,
+        "profile": profile,
+        "actual_wt": actual_wt,
+        "angle_mode": angle_mode,
+        "duration_s": round(last_ts - first_ts, 1) if first_ts is not None else 0.0,
+        "peak_reba": max((t["peak_reba"] for t in tracks.values()), default=1),
+        "total_frames": sum(t["total_frames"] for t in tracks.values()),
+        "tracks": list(tracks.values()),
+    }
+
+
+def _write_summary(summary, path, out_dir, started):
+    summary["session_id"] = uuid.uuid4().hex
+    summary["started_at"] = recording_started_at(path)
+    summary["source"] = str(path)
+    summary["processing_s"] = round(time.perf_counter() - started, 2)
+    out_path = Path(out_dir) / f"{path.stem}.json"
+    out_path.write_text(json.dumps(summary, indent=2))
+    return out_path, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("videos", nargs="+", help="MP4 files to audit")
+    parser.add_argument("--out-dir", default="audits")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--profile", choices=reba_engine.PROFILES, default="Male")
+    parser.add_argument("--weight", type=float, default=8.0, help="actual weight lifted (kg)")
+    parser.add_argument("--stride", type=int, default=1, help="score every Nth frame")
+    parser.add_argument("--weights", default=YOLO_WEIGHTS,
+                        help="YOLOv8 weights for object detection (.pt, or .onnx from `detectors.py export`)")
+    parser.add_argument("--det-region", choices=DETECTION_REGIONS, default="full",
+                        help="detect objects in the whole frame or only around the wrists (single-person only)")
+    parser.add_argument("--multi-person", action="store_true", help="track and score every person in view separately")
+    parser.add_argument("--angles", choices=reba_engine.ANGLE_MODES, default="2d",
+                        help="2d: left side in the image plane; 3d: both sides in 3D, worse side kept")
+    parser.add_argument("--lift-duration", choices=LIFT_DURATIONS, default="long",
+                        help="NIOSH work duration for the frequency multiplier: <= 1 h, <= 2 h or <= 8 h")
+    parser.add_argument("--workstation", default="", help="workstation the videos were recorded at")
+    parser.add_argument("--db", help="also store the summaries in this audit database (audit_store.py)")
+    args = parser.parse_args(argv)
+    if args.multi_person and args.det_region != "full":
+        parser.error("--det-region wrists cannot find people; --multi-person needs full-frame detection")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    # Summaries are named after the video, so two videos with the same name would overwrite each other.
+    stems = {}
+    for v in args.videos:
+        stems.setdefault(Path(v).stem, []).append(v)
+    clashes = [paths for paths in stems.values() if len(paths) > 1]
+    if clashes:
+        parser.error("videos with the same name would write the same summary: "
+                     + "; ".join(", ".join(paths) for paths in clashes) + " (audit them into separate --out-dir)")
+
+    Path(args.out_dir).mkdir(parents=True, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(args.weights, args.det_region, max(1, (os.cpu_count() or 1) // args.workers))) as pool:
+        futures = {
+            pool.submit(audit_video, v, args.out_dir, None, args.profile, args.weight, args.stride, args.multi_person,
+                        args.angles, args.lift_duration, args.workstation): v
+            for v in args.videos
+        }
+        for future in as_completed(futures):
+            try:
+                out_path, summary = future.result()
+            except Exception as exc:
+                print(f"FAILED {futures[future]}: {exc}")
+                continue
+            print(f"{out_path}: peak REBA {summary['peak_reba']}, {summary['total_frames']} frames "
+                  f"in {summary['processing_s']}s")
+            if args.db:
+                with AuditStore(args.db) as store:
+                    store.add(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Insert and dashboard query times of ``AuditStore`` at tens of thousands of sessions.
+
+Fills a fresh database with synthetic session summaries (operators, workstations
+and start times spread over a few months), timing one-by-one inserts as the
+live view does them, then times each dashboard query.
+
+    python benchmarks/bench_audit_store.py --sessions 50000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audit_store import AuditStore  # noqa: E402
+
+
+def synthetic_summaries(n, operators=200, workstations=40, days=120, seed=0):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(n):
+        started = start + timedelta(seconds=rng.uniform(0, days * 86400))
+        operator = rng.randrange(operators)
+        # Operators mostly work at their own station.
+        station = operator % workstations if rng.random() < 0.8 else rng.randrange(workstations)
+        yield {
+            "session_id": f"bench-{i}",
+            "operator_id": f"OP-{operator:03d}",
+            "workstation": f"WS-{station:02d}",
+            "started_at": started.isoformat().replace("+00:00", "Z"),
+            "duration_s": rng.uniform(30, 900),
+            "total_frames": rng.randrange(900, 27000),
+            "peak_reba": rng.randint(1, 13),
+            "sustained_reba": rng.randint(1, 10),
+            "peak_niosh": {"li": rng.uniform(0.2, 2.5)},
+            "lifting": {"lifts": rng.randrange(40), "composite_li": rng.uniform(0.2, 3.0)},
+        }
+
+
+def timed(fn, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=50000)
+    parser.add_argument("--db", help="database path (default: a temporary file)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp, AuditStore(args.db or Path(tmp) / "bench.db") as store:
+        insert_ms = []
+        for summary in synthetic_summaries(args.sessions):
+            start = time.perf_counter()
+            store.add(summary)
+            insert_ms.append((time.perf_counter() - start) * 1000)
+        insert_ms = np.array(insert_ms)
+        print(f"{args.sessions} inserts: mean {insert_ms.mean():.3f} ms  p95 {np.percentile(insert_ms, 95):.3f} ms")
+
+        queries = {
+            "worst workstations (30 days)": lambda: store.worst_workstations("2026-03-01", "2026-03-31"),
+            "worst workstations (all)": lambda: store.worst_workstations(),
+            "operators above LI 1.0 (30 days)": lambda: store.operators_above_li(1.0, "2026-03-01", "2026-03-31"),
+            "daily trend (all)": lambda: store.trend("day"),
+            "weekly trend, one workstation": lambda: store.trend("week", workstation="WS-07"),
+            "recent high-risk sessions": lambda: store.sessions(min_tier=3, limit=100),
+            "one operator's sessions": lambda: store.sessions(operator_id="OP-042"),
+        }
+        for name, query in queries.items():
+            ms, rows = timed(query)
+            print(f"{name:<36} {ms:8.2f} ms  {len(rows):>5} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+// Node runner for the browser's coco-ssd detector (lite_mobilenet_v2, as
+// cocoSsd.load() in auditor.js) over a directory of JPEG frames, for
+// bench_detectors.py.  Prints per-frame detect time and detections as one
+// JSON document on stdout.  Needs @tensorflow/tfjs-node and
+// @tensorflow-models/coco-ssd installed where Node can resolve them.
+//
+//   node benchmarks/bench_coco_ssd.js /tmp/frames
+
+const fs = require("fs");
+const path = require("path");
+const tf = require("@tensorflow/tfjs-node");
+const cocoSsd = require("@tensorflow-models/coco-ssd");
+
+async function main(dir) {
+  const files = fs.readdirSync(dir).filter(f => f.endsWith(".jpg")).sort();
+  const model = await cocoSsd.load({ base: "lite_mobilenet_v2" });
+  const warm = tf.zeros([64, 64, 3], "int32");
+  await model.detect(warm);
+  warm.dispose();
+
+  const detectMs = [];
+  const detections = [];
+  for (const file of files) {
+    const image = tf.node.decodeImage(fs.readFileSync(path.join(dir, file)), 3);
+    const start = process.hrtime.bigint();
+    const predictions = await model.detect(image);
+    detectMs.push(Number(process.hrtime.bigint() - start) / 1e6);
+    image.dispose();
+    detections.push(predictions.map(p => [p.class, p.score, p.bbox]));
+  }
+  process.stdout.write(JSON.stringify({ node: process.version, tfjs: tf.version.tfjs, detect_ms: detectMs, detections }));
+}
+
+main(process.argv[2]);
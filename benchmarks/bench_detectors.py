@@ -0,0 +1,171 @@
+"""Latency and accuracy of coco-ssd, YOLOv8n FP32 and YOLOv8n int8 on the same clips.
+
+The golden fixtures are synthetic landmarks with no pixels, so this runs on
+workstation video clips instead; every detector sees the same sampled frames.  Latency is ms per frame at each batch size (coco-ssd runs
+one frame at a time under Node with tfjs-node, as in the browser).  Accuracy
+is measured against a reference detector, YOLOv8n FP32 by default:
+precision / recall of its non-person boxes (same class, IoU >= 0.5) and, with
+MediaPipe wrists, how often the held object ``hand_object`` picks agrees,
+which is what the scores depend on.
+
+    python detectors.py export --int8 --calibrate recordings/station1.mp4
+    python benchmarks/bench_detectors.py recordings/station1.mp4 recordings/station2.mp4 --coco-ssd
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import reba_engine  # noqa: E402
+from batch_audit import iter_frames  # noqa: E402
+from detectors import ONNX_INT8_WEIGHTS, ONNX_WEIGHTS, make_detector  # noqa: E402
+from tracking import iou_matrix  # noqa: E402
+
+COCO_RUNNER = BENCH_DIR / "bench_coco_ssd.js"
+MATCH_IOU = 0.5
+MIN_SCORE = 0.25
+WARMUP_FRAMES = 3
+
+
+def load_frames(paths, per_clip):
+    frames = []
+    for path in paths:
+        clip = [frame for _, _, frame in iter_frames(path)]
+        frames += [clip[i] for i in np.linspace(0, len(clip) - 1, min(per_clip, len(clip))).astype(int)]
+    return frames
+
+
+def wrists(frames):
+    import cv2
+    from vision import PoseEstimator, wrist_pixels
+
+    pose = PoseEstimator()
+    try:
+        out = []
+        for frame in frames:
+            lm = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            out.append(wrist_pixels(lm, frame.shape[1], frame.shape[0]) if lm is not None else (None, None))
+        return out
+    finally:
+        pose.close()
+
+
+def time_detector(detector, frames, batch):
+    """Detections and ms per frame with ``batch`` frames per call."""
+    detector.detect_batch(frames[:WARMUP_FRAMES])
+    per_frame = []
+    detections = []
+    for i in range(0, len(frames), batch):
+        chunk = frames[i:i + batch]
+        start = time.perf_counter()
+        found = detector.detect_batch(chunk)
+        per_frame.append((time.perf_counter() - start) * 1000 / len(chunk))
+        detections += found
+    return detections, np.array(per_frame)
+
+
+def run_coco_ssd(frames):
+    import cv2
+
+    node = shutil.which("node")
+    if node is None:
+        print("node not found: coco-ssd skipped")
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, frame in enumerate(frames):
+            cv2.imwrite(str(Path(tmp) / f"{i:06d}.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+        out = subprocess.run([node, str(COCO_RUNNER), tmp], capture_output=True, text=True)
+    if out.returncode != 0:
+        print(f"coco-ssd skipped: {out.stderr.strip().splitlines()[-1] if out.stderr.strip() else out.returncode}")
+        return None
+    result = json.loads(out.stdout)
+    return [[tuple(d) for d in dets] for dets in result["detections"]], np.array(result["detect_ms"])
+
+
+def _objects(dets):
+    return [d for d in dets if d[1] > MIN_SCORE and d[0] != "person"]
+
+
+def accuracy(detections, reference, wrist_pairs):
+    tp = fp = fn = 0
+    for found, ref in zip(detections, reference):
+        found, ref = _objects(found), _objects(ref)
+        matched = set()
+        if found and ref:
+            ious = iou_matrix([d[2] for d in found], [r[2] for r in ref])
+            for i, d in enumerate(found):
+                j = next((j for j in np.argsort(-ious[i]) if ious[i, j] >= MATCH_IOU and j not in matched
+                          and ref[j][0] == d[0]), None)
+                if j is not None:
+                    matched.add(j)
+        tp += len(matched)
+        fp += len(found) - len(matched)
+        fn += len(ref) - len(matched)
+    result = {"precision": tp / max(1, tp + fp), "recall": tp / max(1, tp + fn)}
+    if wrist_pairs is not None:
+        held = [(reba_engine.hand_object(d, *w), reba_engine.hand_object(r, *w))
+                for d, r, w in zip(detections, reference, wrist_pairs) if w[0] is not None]
+        result["held_agreement"] = sum(a == b for a, b in held) / max(1, len(held))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("videos", nargs="+", help="workstation clips")
+    parser.add_argument("--frames", type=int, default=150, help="frames sampled per clip")
+    parser.add_argument("--models", nargs="+", default=[str(ONNX_WEIGHTS), str(ONNX_INT8_WEIGHTS)],
+                        help=".onnx or .pt weights; the first is the accuracy reference")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--threads", type=int, help="ONNX Runtime intra-op threads (default: all cores)")
+    parser.add_argument("--coco-ssd", action="store_true", help="include the browser's coco-ssd under Node")
+    parser.add_argument("--no-pose", action="store_true", help="skip the held-object agreement")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.videos, args.frames)
+    wrist_pairs = None if args.no_pose else wrists(frames)
+    print(f"{len(frames)} frames from {len(args.videos)} clip(s)")
+
+    results, reference = {}, None
+    for model in args.models:
+        detector = make_detector(model, args.threads)
+        name = Path(model).name
+        results[name] = {"ms_per_frame": {}}
+        for batch in args.batch:
+            detections, ms = time_detector(detector, frames, batch)
+            results[name]["ms_per_frame"][batch] = {"p50": float(np.median(ms)), "p95": float(np.percentile(ms, 95))}
+            if batch == args.batch[0]:
+                reference = reference or detections
+                results[name].update(accuracy(detections, reference, wrist_pairs))
+    if args.coco_ssd:
+        coco = run_coco_ssd(frames)
+        if coco is not None:
+            detections, ms = coco
+            results["coco-ssd"] = {"ms_per_frame": {1: {"p50": float(np.median(ms[WARMUP_FRAMES:])),
+                                                        "p95": float(np.percentile(ms[WARMUP_FRAMES:], 95))}},
+                                   **accuracy(detections, reference, wrist_pairs)}
+
+    print(f"{'detector':<22}" + "".join(f"{f'b{b} p50':>9}{f'b{b} p95':>9}" for b in args.batch)
+          + f"{'prec':>7}{'recall':>7}{'held':>7}")
+    for name, r in results.items():
+        cells = "".join(f"{r['ms_per_frame'][b]['p50']:>9.1f}{r['ms_per_frame'][b]['p95']:>9.1f}"
+                        if b in r["ms_per_frame"] else f"{'-':>9}{'-':>9}" for b in args.batch)
+        held = f"{r['held_agreement']:>7.1%}" if "held_agreement" in r else f"{'-':>7}"
+        print(f"{name:<22}{cells}{r['precision']:>7.1%}{r['recall']:>7.1%}{held}")
+    if args.out:
+        Path(args.out).write_text(json.dumps({"frames": len(frames), "reference": Path(args.models[0]).name,
+                                              "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
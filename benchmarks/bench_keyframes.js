@@ -0,0 +1,87 @@
+// Memory of the keyframe gallery over a long session.  Replays a synthetic
+// multi-hour REBA trace at 30 fps through KeyframeGallery, attaching a JPEG-
+// sized Blob to every accepted frame (after a few frames, as toBlob would),
+// and samples the gallery's bytes and the process heap every simulated ten
+// minutes.  The trace drifts upwards so new worst postures keep replacing old
+// ones until the end, the worst case for churn.  Exits non-zero if the
+// gallery holds more than KEYFRAME_COUNT frames' worth of bytes or the heap
+// keeps growing after the first hour.
+//
+//   node --expose-gc benchmarks/bench_keyframes.js [hours]
+
+const { KeyframeGallery, KEYFRAME_COUNT } = require("../frontend/keyframes.js");
+
+const FPS = 30;
+const JPEG_BYTES = 30 * 1024;
+const ENCODE_DELAY_FRAMES = 3;
+const SAMPLE_EVERY_S = 600;
+const HEAP_GROWTH_LIMIT_MB = 2;
+
+function rng(seed) {
+  return () => {
+    seed = (seed * 1664525 + 1013904223) >>> 0;
+    return seed / 4294967296;
+  };
+}
+
+function heapMb() {
+  if (global.gc) global.gc();
+  let m = process.memoryUsage();
+  return { heap: m.heapUsed / 1048576, external: (m.external + m.arrayBuffers) / 1048576 };
+}
+
+async function main(hours) {
+  const random = rng(42);
+  const gallery = new KeyframeGallery();
+  const frames = Math.round(hours * 3600 * FPS);
+  const pending = [];
+  const samples = [];
+  let spellLeft = 0, severity = 0;
+  let maxBytes = 0;
+
+  for (let i = 0; i < frames; i++) {
+    let tMs = i * 1000 / FPS;
+    // Spells of bad posture (about one a minute, a few seconds long) whose
+    // severity drifts up by 3 over the session, capped at the table's 15.
+    if (spellLeft <= 0 && random() < 1 / (60 * FPS)) {
+      spellLeft = Math.round((2 + random() * 6) * FPS);
+      severity = random() * 7 + 3 * tMs / (hours * 3600 * 1000);
+    }
+    spellLeft--;
+    let score = Math.min(15, 3 + Math.floor(random() * 2) + (spellLeft > 0 ? Math.floor(severity * (0.7 + 0.3 * random())) : 0));
+    let entry = gallery.offer(tMs, score, { li: Number((score / 10).toFixed(2)) });
+    if (entry) pending.push([i + ENCODE_DELAY_FRAMES, entry, entry.version]);
+    while (pending.length && pending[0][0] <= i) {
+      let [, e, version] = pending.shift();
+      gallery.setBlob(e, version, new Blob([new Uint8Array(JPEG_BYTES - 512 + Math.floor(random() * 1024))]));
+    }
+    maxBytes = Math.max(maxBytes, gallery.bytes);
+    if (i % (SAMPLE_EVERY_S * FPS) === 0) {
+      await new Promise(resolve => setImmediate(resolve));
+      samples.push({ t_h: tMs / 3600000, kept: gallery.count, captures: gallery.captures, gallery_kb: gallery.bytes / 1024, ...heapMb() });
+    }
+  }
+
+  console.log(`${hours} h at ${FPS} fps: ${frames} frames, ${gallery.captures} captures, ${gallery.count} kept${global.gc ? "" : " (run with --expose-gc for exact heap figures)"}`);
+  console.log(`${"t (h)".padStart(6)}${"kept".padStart(6)}${"captures".padStart(10)}${"gallery KB".padStart(12)}${"heap MB".padStart(10)}${"ext MB".padStart(9)}`);
+  for (const s of samples) {
+    console.log(`${s.t_h.toFixed(2).padStart(6)}${String(s.kept).padStart(6)}${String(s.captures).padStart(10)}` +
+      `${s.gallery_kb.toFixed(0).padStart(12)}${s.heap.toFixed(2).padStart(10)}${s.external.toFixed(2).padStart(9)}`);
+  }
+
+  let after = samples.filter(s => s.t_h >= 1);
+  let growth = after.length ? Math.max(...after.map(s => s.heap)) - after[0].heap : 0;
+  let payload = await gallery.toPayload("bench");
+  console.log(`peak gallery ${(maxBytes / 1024).toFixed(0)} KB, heap growth after 1 h ${growth.toFixed(2)} MB, ` +
+    `export ${payload.frames.length} frames / ${(JSON.stringify(payload).length / 1024).toFixed(0)} KB`);
+
+  let failures = [];
+  if (maxBytes > KEYFRAME_COUNT * (JPEG_BYTES + 512)) failures.push(`gallery held ${maxBytes} bytes`);
+  if (global.gc && growth > HEAP_GROWTH_LIMIT_MB) failures.push(`heap grew ${growth.toFixed(2)} MB after the first hour`);
+  if (failures.length) {
+    console.log(`FAIL: ${failures.join("; ")}`);
+    process.exit(1);
+  }
+}
+
+main(Number(process.argv[2] || 4));
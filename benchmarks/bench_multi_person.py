@@ -0,0 +1,83 @@
+"""Per-frame cost of multi-person auditing at 1, 2 and 4 people in view.
+
+Tiles a single-operator clip side by side N times so every tile holds the same
+person, then times ``MultiPersonAuditor.process`` per frame.  Person boxes come
+from the tile layout by default (pose + tracking cost only); pass ``--detector``
+to include a YOLOv8 pass on the full tiled frame.
+
+    python benchmarks/bench_multi_person.py recordings/station1.mp4 --frames 300
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch_audit import iter_frames  # noqa: E402
+from tracking import MultiPersonAuditor  # noqa: E402
+from vision import ObjectDetector, PoseEstimator  # noqa: E402
+
+
+def load_frames(path, limit):
+    import cv2
+
+    frames = []
+    for _, _, frame in iter_frames(path):
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if len(frames) >= limit:
+            break
+    return frames
+
+
+def tile(frame, people):
+    cols = 2 if people > 1 else 1
+    rows = (people + cols - 1) // cols
+    h, w = frame.shape[:2]
+    out = np.zeros((rows * h, cols * w, 3), dtype=frame.dtype)
+    boxes = []
+    for i in range(people):
+        r, c = divmod(i, cols)
+        out[r * h:(r + 1) * h, c * w:(c + 1) * w] = frame
+        boxes.append(("person", 1.0, [c * w, r * h, w, h]))
+    return out, boxes
+
+
+def run(frames, people, detector=None):
+    auditor = MultiPersonAuditor(PoseEstimator, "BENCH")
+    times = []
+    for i, frame in enumerate(frames):
+        tiled, boxes = tile(frame, people)
+        start = time.perf_counter()
+        detections = detector.detect(tiled[:, :, ::-1]) if detector else boxes
+        auditor.process(tiled, i / 30, detections)
+        times.append((time.perf_counter() - start) * 1000)
+    tracks = auditor.finish()
+    return np.array(times[5:] or times), len(tracks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("video", help="single-operator clip")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--people", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--detector", action="store_true", help="include YOLOv8 person detection")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.video, args.frames)
+    detector = ObjectDetector() if args.detector else None
+    baseline = None
+    print(f"{'people':>6} {'tracks':>6} {'mean ms':>8} {'p95 ms':>8} {'ms/person':>9} {'vs 1':>6}")
+    for people in args.people:
+        times, tracks = run(frames, people, detector)
+        mean = times.mean()
+        baseline = baseline or mean / people
+        print(f"{people:>6} {tracks:>6} {mean:>8.1f} {np.percentile(times, 95):>8.1f} "
+              f"{mean / people:>9.1f} {mean / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""Per-stage speed and cross-implementation parity over the golden fixtures.
+
+Times every scoring stage on the recorded standing / bending / overhead reach /
+carrying clips in ``benchmarks/fixtures``, for ``reba_engine`` (vectorised over
+all frames) and for ``frontend/scoring.js`` under Node, plus server-side PDF
+report generation.  Every implementation's per-frame scores must equal the
+golden values stored in the fixtures, and the two bilateral 3D angle kernels,
+wrist detection regions and lift segmenters must agree with each other.  Results go to a JSON file; any stage
+slower than its limit in ``thresholds.json`` or any parity mismatch makes the
+run exit non-zero.
+
+    python benchmarks/bench_pipeline.py --out bench_results.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import reba_engine  # noqa: E402
+import vision  # noqa: E402
+from lifting import LiftSegmenter  # noqa: E402
+from session import AuditSession  # noqa: E402
+
+FIXTURE_DIR = BENCH_DIR / "fixtures"
+THRESHOLDS_PATH = BENCH_DIR / "thresholds.json"
+JS_RUNNER = BENCH_DIR / "bench_scoring.js"
+
+MIN_TIME_S = 0.2
+REPEATS = 5
+FLOAT_RTOL = 1e-9
+# Lift trace, as in bench_scoring.js: each clip played back to back, released between plays.
+LIFT_TRACE_REPEATS = 3
+LIFT_TRACE_GAP_S = 1.0
+
+
+def load_fixtures(paths=None):
+    paths = paths or sorted(FIXTURE_DIR.glob("*.json"))
+    fixtures = []
+    for path in paths:
+        fx = json.loads(Path(path).read_text())
+        fx["lm"] = np.array([f["landmarks"] for f in fx["frames"]])
+        fx["wrists"] = [((f[15, 0] * fx["width"], f[15, 1] * fx["height"]), (f[16, 0] * fx["width"], f[16, 1] * fx["height"]))
+                        for f in fx["lm"]]
+        fixtures.append(fx)
+    return fixtures
+
+
+def best_time(fn, per):
+    """Best-of-``REPEATS`` seconds per unit, with ``fn`` covering ``per`` units per call."""
+    best = math.inf
+    for _ in range(REPEATS):
+        calls, start = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < MIN_TIME_S or not calls:
+            fn()
+            calls += 1
+        best = min(best, elapsed / (calls * per))
+    return best
+
+
+def python_scores(fx):
+    objects = [reba_engine.hand_object(f["detections"], lw, rw) for f, (lw, rw) in zip(fx["frames"], fx["wrists"])]
+    present = np.array([o != reba_engine.NO_OBJECT for o in objects])
+    s = reba_engine.score_frames(fx["lm"], fx["actual_wt"], present, fx["width"], fx["height"])
+    return [
+        {
+            **{k: s[k][i].item() for k in fx["frames"][0]["expected"] if k in s and k not in ("mmh_zone", "mmh_reach")},
+            "mmh_zone": reba_engine.MMH_ZONES[s["mmh_zone"][i]],
+            "mmh_reach": reba_engine.MMH_REACHES[s["mmh_reach"][i]],
+            "object": objects[i],
+            "mmh_limit": {p: float(reba_engine.mmh_limit(p, s["mmh_zone"][i], s["mmh_reach"][i])) for p in reba_engine.PROFILES},
+        }
+        for i in range(len(objects))
+    ]
+
+
+def python_angles_3d(fx):
+    a = reba_engine.joint_angles_3d(fx["lm"], fx["width"], fx["height"])
+    return [{"angles_3d": {j: a[j][i].item() for j in reba_engine.JOINTS}} for i in range(len(fx["lm"]))]
+
+
+def python_rois(fx):
+    return [{"wrist_rois": [list(r) for r in vision.wrist_rois(lm, fx["width"], fx["height"])]} for lm in fx["lm"]]
+
+
+def roi_coverage(fixtures):
+    """Share of frame pixels inside the wrist regions, and of hand-held objects they still reach."""
+    pixels = held = found = 0
+    for fx in fixtures:
+        for f, lm, (lw, rw) in zip(fx["frames"], fx["lm"], fx["wrists"]):
+            rois = vision.wrist_rois(lm, fx["width"], fx["height"])
+            pixels += sum(w * h for _, _, w, h in rois) / (fx["width"] * fx["height"])
+            obj = reba_engine.hand_object(f["detections"], lw, rw)
+            boxes = [bbox for name, _, bbox in f["detections"] if name == obj]
+            if boxes:
+                held += 1
+                found += any(_overlaps(bbox, roi) for bbox in boxes for roi in rois)
+    frames = sum(len(fx["frames"]) for fx in fixtures)
+    return {"pixel_share": pixels / frames, "held_frames": held, "held_found_share": found / held if held else 1.0}
+
+
+def _overlaps(a, b):
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def python_timings(fixtures):
+    lm = np.concatenate([fx["lm"] for fx in fixtures])
+    n = len(lm)
+    detections = [f["detections"] for fx in fixtures for f in fx["frames"]]
+    wrists = [w for fx in fixtures for w in fx["wrists"]]
+    present = np.ones(n, dtype=bool)
+    angles = reba_engine.joint_angles(lm)
+    scores = reba_engine.joint_scores(angles)
+    h_cm = reba_engine.niosh(lm, angles["trunk"], 8.0, present, initial_wrist_v=100.0)["h_cm"]
+
+    def hand_objects():
+        for d, (lw, rw) in zip(detections, wrists):
+            reba_engine.hand_object(d, lw, rw)
+
+    def mmh():
+        zone, reach = reba_engine.mmh_zone(lm, h_cm)
+        reba_engine.mmh_limit("Male", zone, reach)
+
+    stages = {
+        "calc_angle": lambda: reba_engine.joint_angles(lm),
+        "angles_3d": lambda: reba_engine.joint_angles_3d(lm),
+        "reba_lookup": lambda: reba_engine.reba_score(scores, 8.0, present),
+        "niosh": lambda: reba_engine.niosh(lm, angles["trunk"], 8.0, present, initial_wrist_v=100.0),
+        "mmh_zone": mmh,
+        "hand_object": hand_objects,
+        "score_frame": lambda: reba_engine.score_frames(lm, 8.0, present, initial_wrist_v=100.0),
+    }
+    return {name: best_time(fn, n) * 1e6 for name, fn in stages.items()}
+
+
+def report_timings(fixtures):
+    from report_pdf import build_report
+
+    summaries = []
+    for fx in fixtures:
+        session = AuditSession(f"BENCH-{fx['scenario']}", actual_wt=fx["actual_wt"])
+        objects = [f["expected"]["object"] for f in fx["frames"]]
+        session.score(fx["lm"], objects, [f["t"] for f in fx["frames"]], fx["width"], fx["height"])
+        summaries.append(session.summary())
+
+    start = time.perf_counter()
+    build_report(summaries[0])
+    first = time.perf_counter() - start
+    warm = best_time(lambda: [build_report(s) for s in summaries], len(summaries))
+    return {"first_report": first * 1e3, "report": warm * 1e3}
+
+
+def python_lifting(fixtures):
+    """``LiftSegmenter`` summary over the lift trace, with A rounded to 0.1 degree as in ``nioshFor``."""
+    seg = LiftSegmenter("long", fixtures[0]["actual_wt"] if fixtures else 8.0)
+    t = 0.0
+    for fx in fixtures:
+        clip = [(s["h_cm"], s["v_cm"], round(a, 1), s["mmh_zone"], s["object"] != reba_engine.NO_OBJECT)
+                for s, a in zip(python_scores(fx), _a_deg(fx))]
+        for _ in range(LIFT_TRACE_REPEATS):
+            for h, v, a, zone, held in clip:
+                seg.push(t, h, v, a, zone, held)
+                t += 1 / fx["fps"]
+            h, v, a, zone, _held = clip[-1]
+            for _ in range(int(LIFT_TRACE_GAP_S * fx["fps"])):
+                seg.push(t, h, v, a, zone, False)
+                t += 1 / fx["fps"]
+    return seg.summary()
+
+
+def _a_deg(fx):
+    objects = [reba_engine.hand_object(f["detections"], lw, rw) for f, (lw, rw) in zip(fx["frames"], fx["wrists"])]
+    present = np.array([o != reba_engine.NO_OBJECT for o in objects])
+    return reba_engine.score_frames(fx["lm"], fx["actual_wt"], present, fx["width"], fx["height"])["a_deg"].tolist()
+
+
+def js_run(fixture_paths):
+    node = shutil.which("node")
+    if node is None:
+        return None
+    out = subprocess.run([node, str(JS_RUNNER), *map(str, fixture_paths)], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def compare(expected, actual, label):
+    """Mismatch descriptions between two lists of per-frame score dicts."""
+    problems = []
+    if len(expected) != len(actual):
+        return [f"{label}: {len(actual)} frames, expected {len(expected)}"]
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        for key, want in e.items():
+            got = a.get(key)
+            if isinstance(want, float):
+                ok = isinstance(got, (int, float)) and math.isclose(got, want, rel_tol=FLOAT_RTOL, abs_tol=1e-12)
+            elif isinstance(want, dict):
+                problems += compare([want], [got or {}], f"{label} frame {i} {key}")
+                continue
+            else:
+                ok = got == want
+            if not ok:
+                problems.append(f"{label} frame {i} {key}: {got!r} != {want!r}")
+    return problems
+
+
+def check_thresholds(results, thresholds):
+    slow = []
+    for group, limits in thresholds.items():
+        for stage, limit in limits.items():
+            value = results.get(group, {}).get(stage)
+            if value is not None and value > limit:
+                slow.append(f"{group}.{stage}: {value:.3f} > {limit}")
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("fixtures", nargs="*", help="fixture files (default: benchmarks/fixtures/*.json)")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--thresholds", default=str(THRESHOLDS_PATH))
+    parser.add_argument("--no-js", action="store_true", help="skip the Node run of frontend/scoring.js")
+    parser.add_argument("--no-report", action="store_true", help="skip PDF report timing")
+    args = parser.parse_args(argv)
+
+    paths = [Path(p) for p in args.fixtures] or sorted(FIXTURE_DIR.glob("*.json"))
+    fixtures = load_fixtures(paths)
+    frames = sum(len(fx["frames"]) for fx in fixtures)
+
+    parity = []
+    for fx in fixtures:
+        golden = [f["expected"] for f in fx["frames"]]
+        parity += compare(golden, python_scores(fx), f"python {fx['scenario']}")
+
+    results = {"python_us_per_frame": python_timings(fixtures)}
+    js = None if args.no_js else js_run(paths)
+    if js is not None:
+        results["js_us_per_frame"] = js["timings"]
+        for fx in fixtures:
+            golden = [f["expected"] for f in fx["frames"]]
+            parity += compare(golden, js["scores"][fx["scenario"]], f"js {fx['scenario']}")
+            limits = [{"mmh_limit": s["mmh_limit"]} for s in python_scores(fx)]
+            parity += compare(limits, js["scores"][fx["scenario"]], f"js {fx['scenario']}")
+            parity += compare(python_angles_3d(fx), js["scores"][fx["scenario"]], f"js {fx['scenario']}")
+            parity += compare(python_rois(fx), js["scores"][fx["scenario"]], f"js {fx['scenario']}")
+        parity += compare([python_lifting(fixtures)], [js["lifting"]], "js lifting")
+    if not args.no_report:
+        results["report_ms"] = report_timings(fixtures)
+    coverage = roi_coverage(fixtures)
+
+    thresholds = json.loads(Path(args.thresholds).read_text())
+    slow = check_thresholds(results, thresholds)
+    output = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "node": js["node"] if js else None,
+        "fixtures": [fx["scenario"] for fx in fixtures],
+        "frames": frames,
+        **results,
+        "wrist_roi": coverage,
+        "thresholds": thresholds,
+        "slow": slow,
+        "parity_ok": not parity,
+        "parity_mismatches": parity[:50],
+    }
+    Path(args.out).write_text(json.dumps(output, indent=2))
+
+    for group in ("python_us_per_frame", "js_us_per_frame", "report_ms"):
+        if group in results:
+            print(group)
+            for stage, value in results[group].items():
+                limit = thresholds.get(group, {}).get(stage)
+                flag = "" if limit is None or value <= limit else "  SLOW"
+                print(f"  {stage:<14} {value:10.3f}   (limit {limit}){flag}")
+    if js is None and not args.no_js:
+        print("node not found: JS stages and JS parity skipped")
+    print(f"wrist regions: {coverage['pixel_share']:.0%} of frame pixels, "
+          f"{coverage['held_found_share']:.0%} of {coverage['held_frames']} held-object frames reached")
+    print(f"parity: {'OK' if not parity else f'{len(parity)} mismatch(es)'} over {frames} frames")
+    for line in parity[:10] + slow:
+        print(f"  {line}")
+    return 1 if parity or slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
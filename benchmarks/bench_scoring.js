@@ -0,0 +1,148 @@
+// Node runner for the browser scoring code (frontend/scoring.js): times each
+// stage over the golden fixtures and prints per-frame scores for the parity
+// check in bench_pipeline.py, as one JSON document on stdout.  Each stage is
+// timed in its own Node process (`--stage <name>`), so type feedback the JIT
+// collected on earlier stages cannot slow down or speed up later ones.
+//
+//   node benchmarks/bench_scoring.js benchmarks/fixtures/*.json
+
+const { execFileSync } = require("child_process");
+const fs = require("fs");
+const path = require("path");
+const S = require(path.join(__dirname, "..", "frontend", "scoring.js"));
+const L = require(path.join(__dirname, "..", "frontend", "lifting.js"));
+
+const MIN_TIME_MS = 200;
+const REPEATS = 5;
+
+function toPoints(landmarks) {
+  return landmarks.map(([x, y, z, visibility]) => ({ x, y, z, visibility }));
+}
+
+// Same association as onResults in auditor.js.
+function handObject(lm, detections, width, height) {
+  let lwX = lm[15].x * width, lwY = lm[15].y * height;
+  let rwX = lm[16].x * width, rwY = lm[16].y * height;
+  for (const [cls, score, bbox] of detections) {
+    if (score > 0.25 && cls !== "person") {
+      let nearLeft = lwX > 0 && S.isHandNearBox(lwX, lwY, bbox);
+      let nearRight = rwX > 0 && S.isHandNearBox(rwX, rwY, bbox);
+      if (nearLeft || nearRight) return cls || "Unidentified Object";
+    }
+  }
+  return (Math.hypot(lwX - rwX, lwY - rwY) < 180 && lwY > 0 && rwY > 0) ? "Unidentified Object" : S.NO_OBJECT;
+}
+
+function scoreClip(fx) {
+  let initialWristV = null;
+  return fx.frames.map(f => {
+    let lm = toPoints(f.landmarks);
+    let angles3d = S.jointAngles3D(S.packAngleLandmarks(lm, fx.width, fx.height, fx.width));
+    let object = handObject(lm, f.detections, fx.width, fx.height);
+    let s = S.scoreFrame(lm, fx.width, fx.height, fx.actual_wt, object, initialWristV);
+    if (initialWristV === null) initialWristV = s.niosh.v_cm;
+    return {
+      neck: s.neck, trunk: s.trunk, legs: s.legs, upper_arm: s.upper_arm, lower_arm: s.lower_arm, wrist: s.wrist,
+      neck_score: s.neck_score, trunk_score: s.trunk_score, legs_score: s.legs_score,
+      upper_arm_score: s.upper_arm_score, lower_arm_score: s.lower_arm_score, wrist_score: s.wrist_score,
+      reba: s.reba, rwl: s.niosh.rwl, li: s.niosh.li, h_cm: s.niosh.h_cm, v_cm: s.niosh.v_cm, a_deg: Number(s.niosh.a_deg),
+      mmh_zone: s.mmhZone, mmh_reach: s.mmhReach, object: object,
+      wrist_rois: S.wristRois(lm, fx.width, fx.height),
+      angles_3d: Object.fromEntries(S.ANGLE_JOINTS.map((j, k) => [j, angles3d[k]])),
+      mmh_limit: { Male: S.getDynamicMmhLimit("Male", s.mmhZone, s.mmhReach), Female: S.getDynamicMmhLimit("Female", s.mmhZone, s.mmhReach) }
+    };
+  });
+}
+
+// Lift segmentation over every clip played LIFT_TRACE_REPEATS times back to
+// back, with the object released for LIFT_TRACE_GAP_S between plays.
+const LIFT_TRACE_REPEATS = 3;
+const LIFT_TRACE_GAP_S = 1.0;
+
+function liftTrace(fixtures, scores) {
+  let seg = new L.LiftSegmenter("long", fixtures.length ? fixtures[0].actual_wt : 8.0);
+  let t = 0;
+  for (const fx of fixtures) {
+    let clip = scores[fx.scenario];
+    for (let r = 0; r < LIFT_TRACE_REPEATS; r++) {
+      for (const s of clip) {
+        seg.push(t * 1000, s.h_cm, s.v_cm, s.a_deg, s.mmh_zone, s.object !== S.NO_OBJECT);
+        t += 1 / fx.fps;
+      }
+      let last = clip[clip.length - 1];
+      for (let k = 0; k < LIFT_TRACE_GAP_S * fx.fps; k++) {
+        seg.push(t * 1000, last.h_cm, last.v_cm, last.a_deg, last.mmh_zone, false);
+        t += 1 / fx.fps;
+      }
+    }
+  }
+  return seg.summary();
+}
+
+// Best-of-REPEATS microseconds per frame for `fn` run over every frame.
+function timeStage(frames, fn) {
+  let sink = 0, best = Infinity;
+  for (let r = 0; r < REPEATS; r++) {
+    let n = 0, start = process.hrtime.bigint(), elapsed = 0;
+    while (elapsed < MIN_TIME_MS) {
+      for (const f of frames) sink += fn(f) ? 1 : 0;
+      n += frames.length;
+      elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+    }
+    best = Math.min(best, elapsed * 1000 / n);
+  }
+  return sink >= 0 ? best : NaN;
+}
+
+function loadFrames(fixtures, scores) {
+  const frames = [];
+  for (const fx of fixtures) {
+    fx.frames.forEach((f, i) => {
+      let lm = toPoints(f.landmarks);
+      frames.push({ fx, f, lm, s: scores[fx.scenario][i], packed: S.packAngleLandmarks(lm, fx.width, fx.height, fx.width) });
+    });
+  }
+  return frames;
+}
+
+// Per-frame work of each timed stage.  angles_3d is the main-thread cost of
+// the 3D mode with the worker pipeline (the pose worker packs); pack_angles_3d
+// adds the packing the classic pipeline does on the main thread.
+const packBuf = new Float32Array(S.ANGLE_BUFFER_LENGTH);
+const anglesOut = new Float64Array(6);
+const STAGES = {
+  calc_angle: ({ lm }) =>
+    S.calcAngle(lm[11], lm[23], lm[25]) + S.calcAngle(lm[0], lm[11], lm[23]) + S.calcAngle(lm[23], lm[11], lm[13]) +
+    S.calcAngle(lm[11], lm[13], lm[15]) + S.calcAngle(lm[23], lm[25], lm[27]) + S.calcAngle(lm[13], lm[15], lm[19]),
+  angles_3d: ({ packed }) => S.jointAngles3D(packed, anglesOut)[1],
+  pack_angles_3d: ({ fx, lm }) => S.jointAngles3D(S.packAngleLandmarks(lm, fx.width, fx.height, fx.width, packBuf), anglesOut)[1],
+  reba_lookup: ({ fx, s }) =>
+    S.calculateOfficialREBA(s.trunk_score, s.neck_score, s.legs_score, s.upper_arm_score, s.lower_arm_score, s.wrist_score, fx.actual_wt, s.object),
+  niosh: ({ fx, lm, s }) => S.nioshFor(lm, fx.width, fx.height, s.trunk, fx.actual_wt, s.object, 100.0).rwl,
+  mmh_zone: ({ lm, s }) => S.getDynamicMmhLimit("Male", S.mmhZoneFor(lm), s.mmh_reach),
+  hand_object: ({ fx, f, lm }) => handObject(lm, f.detections, fx.width, fx.height),
+  score_frame: ({ fx, lm, s }) => S.scoreFrame(lm, fx.width, fx.height, fx.actual_wt, s.object, 100.0).reba
+};
+
+function main(args) {
+  let stage = null;
+  if (args[0] === "--stage") [, stage, ...args] = args;
+  const fixtures = args.map(f => JSON.parse(fs.readFileSync(f, "utf8")));
+  const scores = {};
+  for (const fx of fixtures) scores[fx.scenario] = scoreClip(fx);
+  const frames = loadFrames(fixtures, scores);
+  if (stage) {
+    process.stdout.write(JSON.stringify(timeStage(frames, STAGES[stage])));
+    return;
+  }
+
+  const timings = {};
+  for (const name of Object.keys(STAGES)) {
+    timings[name] = JSON.parse(execFileSync(process.execPath, [__filename, "--stage", name, ...args], { encoding: "utf8" }));
+  }
+
+  const lifting = liftTrace(fixtures, scores);
+  process.stdout.write(JSON.stringify({ node: process.version, frames: frames.length, timings, scores, lifting }));
+}
+
+main(process.argv.slice(2));
@@ -0,0 +1,80 @@
+"""Frame-time cost of the peak-posture snapshot, before and after lazy capture.
+
+The live view used to JPEG-encode every frame (``canvas.toDataURL('image/jpeg')``)
+in case it became the peak; it now blits the canvas into a snapshot canvas only
+when the peak REBA strictly rises, and encodes once, for the report.  No
+browser runs here, so the encode is measured as OpenCV's libjpeg encode plus
+base64 of a camera-sized frame (the same work toDataURL does, at its default
+quality 0.92) and the blit as a frame copy.  The captures per session come from
+the golden fixtures' REBA traces, with the old ``>=`` peak rule for comparison:
+ties used to move the peak posture to the later frame, and now keep the first.
+
+On a device, the "snapshot" stage of the stage timing overlay and the Frame
+Time card give the same comparison directly.
+
+    python benchmarks/bench_snapshot.py
+"""
+
+import base64
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from bench_pipeline import best_time, load_fixtures  # noqa: E402
+
+JPEG_QUALITY = 92
+
+
+def camera_frame(width, height, seed=0):
+    """A frame that compresses like camera video: smooth shading plus sensor noise."""
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 / width, y * 255 / height, (x + y) * 127 / (width + height)], axis=-1)
+    noise = np.random.default_rng(seed).normal(0, 6, base.shape)
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def peak_updates(reba, strict):
+    """Frames that move the peak posture under the strict (``>``) or old (``>=``) rule."""
+    peak, updates = 1, 0
+    for r in reba:
+        if r > peak or (not strict and r == peak):
+            peak = r
+            updates += 1
+    return updates
+
+
+def main():
+    fixtures = load_fixtures()
+    width, height = fixtures[0]["width"], fixtures[0]["height"]
+    frame = camera_frame(width, height)
+    snapshot = np.empty_like(frame)
+
+    def encode():
+        _, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        return "data:image/jpeg;base64," + base64.b64encode(jpeg.tobytes()).decode()
+
+    encode_ms = best_time(encode, 1) * 1e3
+    blit_ms = best_time(lambda: np.copyto(snapshot, frame), 1) * 1e3
+    print(f"{width}x{height} frame: JPEG encode + data URL {encode_ms:.3f} ms, blit {blit_ms:.3f} ms")
+
+    print(f"{'fixture':<16}{'frames':>7}{'> peaks':>9}{'>= peaks':>10}{'after ms':>10}")
+    total_frames = total_strict = 0
+    for fx in fixtures:
+        reba = [f["expected"]["reba"] for f in fx["frames"]]
+        strict, ties = peak_updates(reba, True), peak_updates(reba, False)
+        # Mean snapshot cost per frame over the clip; the one report-time encode is not per frame.
+        after = blit_ms * strict / len(reba)
+        print(f"{fx['scenario']:<16}{len(reba):>7}{strict:>9}{ties:>10}{after:>10.4f}")
+        total_frames += len(reba)
+        total_strict += strict
+    print(f"mean snapshot cost per frame: {encode_ms:.3f} ms before, {blit_ms * total_strict / total_frames:.4f} ms after "
+          f"({encode_ms / (1000 / 30):.0%} of a 30 fps frame budget before)")
+
+
+if __name__ == "__main__":
+    main()
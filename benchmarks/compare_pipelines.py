@@ -0,0 +1,60 @@
+"""Main-thread vs worker pipeline latency from two recorded sessions.
+
+Run the same capture once per "Inference Pipeline" setting, then point this at
+the two sessions' ``timing.json`` files (or their session directories under
+``sessions/``) or at a downloaded ``stage_timing.json``.  Prints p50 / p95 per
+stage side by side; ``main_lag`` is how late a 50 ms timer on the main thread
+fired, i.e. how long the page was blocked.
+
+    python benchmarks/compare_pipelines.py sessions/<main-session> sessions/<worker-session>
+    python benchmarks/compare_pipelines.py stage_timing.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from telemetry import load_timing  # noqa: E402
+
+STAGES = ("pose_send", "pose_infer", "on_results", "scoring", "detect", "draw", "main_lag")
+
+
+def load(path):
+    """Stage-timing payloads in ``path``: a session dir, timing.json or a downloaded list."""
+    path = Path(path)
+    if path.is_dir():
+        timing = load_timing(path)
+        if timing is None:
+            raise SystemExit(f"{path} has no timing.json")
+        return [timing]
+    data = json.loads(path.read_text())
+    return data if isinstance(data, list) else [data]
+
+
+def row(timing, stage):
+    h = timing["stages"].get(stage)
+    if not h or not h["n"]:
+        return "-", "-"
+    return f"{h['p50_ms']:.2f}", f"{h['p95_ms']:.2f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("timings", nargs="+", help="session dirs, timing.json or stage_timing.json files")
+    args = parser.parse_args(argv)
+
+    timings = [t for path in args.timings for t in load(path)]
+    names = [t.get("pipeline", "main") for t in timings]
+    print(f"{'stage':<12}" + "".join(f"{name + ' p50':>14}{name + ' p95':>14}" for name in names))
+    for stage in STAGES:
+        print(f"{stage:<12}" + "".join(f"{p50:>14}{p95:>14}" for p50, p95 in (row(t, stage) for t in timings)))
+    print(f"{'fps':<12}" + "".join(f"{t['fps']:>14.1f}{'':>14}" for t in timings))
+    print(f"{'frames':<12}" + "".join(f"{t['frames']:>14}{'':>14}" for t in timings))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
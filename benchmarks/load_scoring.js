@@ -0,0 +1,76 @@
+// One synthetic operator for load_test.py: replays a landmark clip in real
+// time through the per-frame work of onResults in auditor.js (scoreFrame,
+// tier counters, rolling / sustained windows, lift segmentation, keyframe
+// selection) and prints frame latency, CPU and memory as one JSON document.
+// A frame's latency runs from when it was due to when it was scored, so an
+// operator that falls behind shows it as growing latency.
+//
+//   node benchmarks/load_scoring.js clip.json 30 10
+
+const fs = require("fs");
+const path = require("path");
+const S = require(path.join(__dirname, "..", "frontend", "scoring.js"));
+const { PostureWindows } = require(path.join(__dirname, "..", "frontend", "window_stats.js"));
+const { LiftSegmenter } = require(path.join(__dirname, "..", "frontend", "lifting.js"));
+const { KeyframeGallery } = require(path.join(__dirname, "..", "frontend", "keyframes.js"));
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+function percentile(sorted, q) {
+  return sorted.length ? sorted[Math.min(sorted.length - 1, Math.floor(q / 100 * sorted.length))] : null;
+}
+
+async function main(clipPath, fps, durationS) {
+  const clip = JSON.parse(fs.readFileSync(clipPath, "utf8"));
+  const frames = clip.frames.map(f => ({ lm: f.landmarks.map(([x, y, z, visibility]) => ({ x, y, z, visibility })), object: f.object }));
+  const windows = new PostureWindows();
+  const lifting = new LiftSegmenter("long", clip.actual_wt);
+  const gallery = new KeyframeGallery();
+  const tiers = { trunk: [0, 0, 0], neck: [0, 0, 0], upper_arm: [0, 0, 0], legs: [0, 0, 0], wrists: [0, 0, 0] };
+  const latencies = [];
+  const periodMs = 1000 / fps;
+  let initialWristV = null;
+  let peak = 1;
+
+  // Stagger operators within one frame period, as independent cameras would be.
+  await sleep(Math.random() * periodMs);
+  const cpuStart = process.cpuUsage();
+  const start = performance.now();
+  for (let i = 0; ; i++) {
+    let due = start + i * periodMs;
+    if (due - start >= durationS * 1000) break;
+    // Timers may fire a fraction of a millisecond early: wait until the frame is due.
+    for (let wait; (wait = due - performance.now()) > 0; ) await sleep(wait);
+
+    let f = frames[i % frames.length];
+    let tMs = i * periodMs;
+    let s = S.scoreFrame(f.lm, clip.width, clip.height, clip.actual_wt, f.object, initialWristV);
+    if (initialWristV === null) initialWristV = s.niosh.v_cm;
+    for (const [part, score] of [["trunk", s.trunk_score], ["neck", s.neck_score], ["upper_arm", s.upper_arm_score],
+                                 ["legs", s.legs_score], ["wrists", s.wrist_score]]) {
+      tiers[part][score <= 2 ? 0 : score <= 4 ? 1 : 2]++;
+    }
+    if (s.reba > peak) peak = s.reba;
+    windows.push(tMs, s.reba, s.niosh.li);
+    lifting.push(tMs, s.niosh.h_cm, s.niosh.v_cm, Number(s.niosh.a_deg), s.mmhZone, f.object !== S.NO_OBJECT);
+    gallery.offer(tMs, s.reba, { li: s.niosh.li, mmh_zone: s.mmhZone, object: f.object });
+    latencies.push(performance.now() - due);
+  }
+  const wallMs = performance.now() - start;
+  const cpu = process.cpuUsage(cpuStart);
+  const memory = process.memoryUsage();
+  latencies.sort((a, b) => a - b);
+  process.stdout.write(JSON.stringify({
+    frames: latencies.length,
+    wall_s: wallMs / 1000,
+    cpu_s: (cpu.user + cpu.system) / 1e6,
+    rss_mb: memory.rss / 1048576,
+    heap_mb: memory.heapUsed / 1048576,
+    latency_ms: { p50: percentile(latencies, 50), p95: percentile(latencies, 95), p99: percentile(latencies, 99),
+                  max: latencies[latencies.length - 1] },
+    peak_reba: peak,
+    lifts: lifting.summary().lifts
+  }));
+}
+
+main(process.argv[2], Number(process.argv[3] || 30), Number(process.argv[4] || 10));
@@ -0,0 +1,268 @@
+"""Synthetic operators ramped to find how many concurrent sessions one machine holds.
+
+Each synthetic operator replays a landmark clip in real time, with no camera:
+the golden fixtures (default) or a session recorded with landmark recording
+on (``--session``).  ``--engine python`` runs every operator as a thread of
+this process, each folding frames one at a time into its own
+``session.AuditSession`` as the server does, and ``--engine js`` runs every
+operator as a Node process of ``load_scoring.js``, which replays the per-frame
+work of ``onResults`` in ``frontend/auditor.js``.  ``--engine server`` streams
+a clip (``--video``) through one ``webrtc_service.ServerVideoProcessor`` per
+operator, pose estimation included.
+
+The ramp runs each level of ``--sessions`` for ``--duration`` seconds and reports
+throughput against the offered frame rate, frame latency (due to scored)
+percentiles, CPU (per cent of one core) and memory per session.  A level
+passes when p95 latency stays within ``--latency-limit-ms`` and throughput
+within 5% of the offered rate; the ramp stops at the first level that fails,
+and the last passing level is the scaling limit.
+
+    python benchmarks/load_test.py --engine python --sessions 1,2,4,8,16,32
+    python benchmarks/load_test.py --engine js --session sessions/<session_id> --out load.json
+    python benchmarks/load_test.py --engine server --video recordings/station1.mp4 --sessions 1,2,4
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from bench_pipeline import load_fixtures  # noqa: E402
+from session import AuditSession  # noqa: E402
+
+JS_RUNNER = BENCH_DIR / "load_scoring.js"
+THROUGHPUT_FLOOR = 0.95
+
+
+def fixture_clip():
+    """All golden fixture clips back to back, at the first clip's frame size."""
+    fixtures = load_fixtures()
+    return {
+        "source": "fixtures",
+        "width": fixtures[0]["width"],
+        "height": fixtures[0]["height"],
+        "actual_wt": fixtures[0]["actual_wt"],
+        "landmarks": np.concatenate([fx["lm"] for fx in fixtures]),
+        "objects": [f["expected"]["object"] for fx in fixtures for f in fx["frames"]],
+    }
+
+
+def recorded_clip(session_dir, actual_wt):
+    """A recorded session's landmarks and replayed hand objects."""
+    from replay import hand_objects, load_recording
+
+    recording = load_recording(session_dir)
+    settings = recording["settings"]
+    return {
+        "source": str(session_dir),
+        "width": settings.get("width", 640),
+        "height": settings.get("height", 480),
+        "actual_wt": actual_wt if actual_wt is not None else settings.get("actual_wt", 8.0),
+        "landmarks": recording["landmarks"].astype(np.float64),
+        "objects": hand_objects(recording),
+    }
+
+
+def rss_mb():
+    """Resident set size of this process; peak RSS where ``/proc`` is missing."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1048576
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1048576 if sys.platform == "darwin" else peak / 1024
+
+
+def latency_percentiles(latencies_ms):
+    values = np.asarray(latencies_ms) if len(latencies_ms) else np.zeros(1)
+    return {f"p{q}": round(float(np.percentile(values, q)), 2) for q in (50, 95, 99)} | {"max": round(float(values.max()), 2)}
+
+
+def python_operator(clip, fps, duration, start, latencies, stagger):
+    """One operator: score each frame when it is due and record how late it finished."""
+    session = AuditSession(actual_wt=clip["actual_wt"])
+    landmarks, objects, n = clip["landmarks"], clip["objects"], len(clip["objects"])
+    period = 1.0 / fps
+    for i in range(int(duration * fps)):
+        due = start + stagger + i * period
+        if (wait := due - time.perf_counter()) > 0:
+            time.sleep(wait)
+        session.score(landmarks[i % n][None], [objects[i % n]], [i * period], clip["width"], clip["height"])
+        latencies.append((time.perf_counter() - due) * 1000)
+
+
+def run_python(clip, sessions, fps, duration):
+    latencies = [[] for _ in range(sessions)]
+    rss_before = rss_mb()
+    start = time.perf_counter() + 0.1
+    threads = [threading.Thread(target=python_operator, args=(clip, fps, duration, start, latencies[k], k / (sessions * fps)))
+               for k in range(sessions)]
+    cpu_start = time.process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    return {
+        "frames": sum(len(l) for l in latencies),
+        "wall_s": wall,
+        "latency_ms": latency_percentiles([v for l in latencies for v in l]),
+        "cpu_pct_per_session": round(100 * cpu / wall / sessions, 1),
+        # Threads share the process: charge the growth over the idle process to the sessions.
+        "mb_per_session": round(max(rss_mb() - rss_before, 0.0) / sessions, 2),
+    }
+
+
+def write_js_clip(clip, path):
+    frames = [{"landmarks": lm.tolist(), "object": obj} for lm, obj in zip(clip["landmarks"], clip["objects"])]
+    Path(path).write_text(json.dumps({k: clip[k] for k in ("width", "height", "actual_wt")} | {"frames": frames}))
+
+
+def run_js(clip_path, sessions, fps, duration):
+    node = shutil.which("node")
+    procs = [subprocess.Popen([node, str(JS_RUNNER), str(clip_path), str(fps), str(duration)],
+                              stdout=subprocess.PIPE, text=True) for _ in range(sessions)]
+    results = []
+    for proc in procs:
+        out, _ = proc.communicate()
+        if proc.returncode:
+            raise RuntimeError(f"load_scoring.js exited with {proc.returncode}")
+        results.append(json.loads(out))
+    wall = max(r["wall_s"] for r in results)
+    # Each operator's percentiles come from its own frames; the worst operator bounds the level.
+    return {
+        "frames": sum(r["frames"] for r in results),
+        "wall_s": wall,
+        "latency_ms": {q: round(max(r["latency_ms"][q] for r in results), 2) for q in ("p50", "p95", "p99", "max")},
+        "cpu_pct_per_session": round(100 * sum(r["cpu_s"] / r["wall_s"] for r in results) / sessions, 1),
+        "mb_per_session": round(sum(r["rss_mb"] for r in results) / sessions, 2),
+    }
+
+
+def run_server(frames, sessions, fps, duration, detector):
+    from webrtc_service import ServerVideoProcessor
+
+    rss_before = rss_mb()
+    processors = [ServerVideoProcessor(f"LOAD-{k}", detector=detector) for k in range(sessions)]
+    period = 1.0 / fps
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    for i in range(int(duration * fps)):
+        if (wait := start + i * period - time.perf_counter()) > 0:
+            time.sleep(wait)
+        for processor in processors:
+            processor.queue.put(time.perf_counter(), frames[i % len(frames)])
+    time.sleep(0.5)
+    stats = [p.stats() for p in processors]
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    rss = rss_mb()
+    for processor in processors:
+        processor.on_ended()
+    errors = [s["error"] for s in stats if s["error"]]
+    if errors:
+        raise RuntimeError(errors[0])
+    return {
+        "frames": sum(s["processed"] for s in stats),
+        "wall_s": wall,
+        # stats() keeps arrival-to-result percentiles over each connection's recent frames.
+        "latency_ms": {"p50": max(s["latency_p50_ms"] or 0.0 for s in stats),
+                       "p95": max(s["latency_p95_ms"] or 0.0 for s in stats), "p99": None, "max": None},
+        "drop_pct": round(float(np.mean([s["drop_pct"] for s in stats])), 1),
+        "cpu_pct_per_session": round(100 * cpu / wall / sessions, 1),
+        "mb_per_session": round(max(rss - rss_before, 0.0) / sessions, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--engine", choices=("python", "js", "server"), default="python")
+    parser.add_argument("--session", help="recorded session directory to replay (default: the golden fixtures)")
+    parser.add_argument("--video", help="clip for --engine server")
+    parser.add_argument("--weights", help="object detector weights for --engine server (default: no detection)")
+    parser.add_argument("--actual-wt", type=float, help="load in kg (default: the source's)")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="comma-separated concurrency levels")
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate offered by each operator")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--latency-limit-ms", type=float, default=100.0, help="p95 frame latency a level may reach")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+    levels = [int(n) for n in args.sessions.split(",")]
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.engine == "server":
+        if not args.video:
+            parser.error("--engine server needs --video")
+        from webrtc_loopback import clip_frames
+
+        frames = clip_frames(args.video)
+        detector = None
+        if args.weights:
+            from detectors import shared_pool
+
+            detector = shared_pool(args.weights)
+        source = args.video
+        run = lambda n: run_server(frames, n, args.fps, args.duration, detector)  # noqa: E731
+    else:
+        clip = recorded_clip(args.session, args.actual_wt) if args.session else fixture_clip()
+        if args.actual_wt is not None:
+            clip["actual_wt"] = args.actual_wt
+        source = clip["source"]
+        if args.engine == "js":
+            if not shutil.which("node"):
+                parser.error("--engine js needs node on PATH")
+            clip_path = Path(tmp.name) / "clip.json"
+            write_js_clip(clip, clip_path)
+            run = lambda n: run_js(clip_path, n, args.fps, args.duration)  # noqa: E731
+        else:
+            run = lambda n: run_python(clip, n, args.fps, args.duration)  # noqa: E731
+
+    print(f"{args.engine} engine, {source}, {args.fps:g} fps per operator, {args.duration:g} s per level, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'sessions':>8}{'fps':>9}{'target':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'cpu %/s':>9}{'MB/s':>7}  result")
+    results, limit = [], None
+    for n in levels:
+        r = {"sessions": n, **run(n)}
+        # The last frame is due one period before the level ends: rate over the offered duration.
+        r["throughput_fps"] = round(r["frames"] / max(r["wall_s"], args.duration), 1)
+        r["target_fps"] = round(n * args.fps, 1)
+        lat = r["latency_ms"]
+        r["passed"] = lat["p95"] <= args.latency_limit_ms and r["throughput_fps"] >= THROUGHPUT_FLOOR * r["target_fps"]
+        results.append(r)
+        print(f"{n:>8}{r['throughput_fps']:>9.1f}{r['target_fps']:>8.0f}"
+              + "".join(f"{lat[q]:>9.1f}" if lat[q] is not None else f"{'-':>9}" for q in ("p50", "p95", "p99", "max"))
+              + f"{r['cpu_pct_per_session']:>9.1f}{r['mb_per_session']:>7.1f}  {'ok' if r['passed'] else 'FAIL'}")
+        if not r["passed"]:
+            break
+        limit = n
+    tmp.cleanup()
+
+    if limit is None:
+        print(f"scaling limit: not even {levels[0]} session(s) within p95 {args.latency_limit_ms:g} ms")
+    elif limit == levels[-1]:
+        print(f"scaling limit: at least {limit} sessions (every level passed)")
+    else:
+        print(f"scaling limit: {limit} sessions")
+    if args.out:
+        Path(args.out).write_text(json.dumps({"engine": args.engine, "source": source, "fps": args.fps,
+                                              "duration_s": args.duration, "latency_limit_ms": args.latency_limit_ms,
+                                              "cpus": os.cpu_count(), "scaling_limit": limit, "levels": results},
+                                             indent=2))
+
+
+if __name__ == "__main__":
+    main()
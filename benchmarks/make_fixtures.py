@@ -0,0 +1,136 @@
+"""Regenerate the golden landmark / detection fixtures in ``benchmarks/fixtures``.
+
+Each scenario is a 3-second, 30 fps side-view clip of MediaPipe-style pose
+landmarks moving between two key poses, with coco-ssd style detections and the
+expected per-frame scores from ``reba_engine``.  The scores are the golden
+values the benchmark parity check holds every implementation to, so only
+regenerate them when the scoring rules change on purpose.
+
+    python benchmarks/make_fixtures.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import reba_engine  # noqa: E402
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+WIDTH, HEIGHT, FPS, FRAMES = 640, 480, 30, 90
+ACTUAL_WT = 8.0
+
+# Key landmarks (left side, normalised x / y) for the two poses of each clip.
+STANDING = {
+    0: (0.52, 0.18), 11: (0.50, 0.28), 13: (0.50, 0.42), 15: (0.52, 0.55), 19: (0.53, 0.58),
+    23: (0.50, 0.55), 25: (0.50, 0.72), 27: (0.50, 0.90),
+}
+SCENARIOS = {
+    "standing": (STANDING, {**STANDING, 0: (0.56, 0.20), 15: (0.58, 0.50), 19: (0.60, 0.52)}),
+    "bending": (STANDING, {
+        0: (0.74, 0.44), 11: (0.68, 0.41), 13: (0.70, 0.55), 15: (0.71, 0.68), 19: (0.71, 0.71),
+        23: (0.45, 0.55), 25: (0.49, 0.72), 27: (0.45, 0.90),
+    }),
+    "overhead_reach": (
+        {**STANDING, 13: (0.60, 0.30), 15: (0.70, 0.28), 19: (0.73, 0.28)},
+        {**STANDING, 13: (0.53, 0.16), 15: (0.54, 0.05), 19: (0.54, 0.03)},
+    ),
+    "carrying": (
+        {**STANDING, 13: (0.52, 0.42), 15: (0.62, 0.48), 19: (0.64, 0.48)},
+        {**STANDING, 0: (0.55, 0.19), 11: (0.52, 0.29), 13: (0.53, 0.42), 15: (0.63, 0.40),
+         19: (0.65, 0.39), 25: (0.54, 0.71), 27: (0.48, 0.90)},
+    ),
+}
+# Objects in view per scenario: (class, score, normalised [x, y, w, h]); a box
+# centred on the wrists follows the hands.
+OBJECTS = {
+    "standing": [("cup", 0.71, (0.80, 0.40, 0.05, 0.08))],
+    "bending": [("suitcase", 0.64, "hands")],
+    "overhead_reach": [("book", 0.41, (0.45, 0.00, 0.12, 0.06))],
+    "carrying": [("suitcase", 0.83, "hands"), ("chair", 0.55, (0.05, 0.55, 0.20, 0.35))],
+}
+# Landmarks not in the key poses copy a key landmark (face, hand and foot points).
+ALIASES = {**{i: 0 for i in range(1, 11)}, 17: 19, 18: 20, 21: 19, 22: 20, 29: 27, 30: 28, 31: 27, 32: 28}
+# Side view: right-side landmarks sit just behind the left ones.
+RIGHT_OFFSET = 0.02
+
+
+def pose_array(keys):
+    lm = np.zeros((33, 4))
+    lm[:, 3] = 0.9
+    for i, (x, y) in keys.items():
+        lm[i, :2] = x, y
+        if i:
+            lm[i + 1, :2] = x + RIGHT_OFFSET, y
+    for i, src in ALIASES.items():
+        lm[i, :2] = lm[src, :2] + (0.004 * (i % 3), 0.0)
+    return lm
+
+
+def clip(name, seed):
+    rng = np.random.default_rng(seed)
+    a, b = (pose_array(p) for p in SCENARIOS[name])
+    phase = (1 - np.cos(np.linspace(0, 2 * np.pi, FRAMES))) / 2
+    lm = a[None] + phase[:, None, None] * (b - a)[None]
+    lm[:, :, :2] += rng.normal(0, 0.003, (FRAMES, 33, 2))
+    return np.round(lm, 5)
+
+
+def detections(name, lm):
+    out = []
+    for frame in lm:
+        dets = [["person", 0.92, [WIDTH * 0.35, HEIGHT * 0.02, WIDTH * 0.4, HEIGHT * 0.93]]]
+        for cls, score, box in OBJECTS[name]:
+            if box == "hands":
+                cx, cy = frame[[15, 16], 0].mean(), frame[[15, 16], 1].mean()
+                box = (cx - 0.06, cy - 0.02, 0.12, 0.12)
+            x, y, w, h = box
+            dets.append([cls, score, [round(x * WIDTH, 1), round(y * HEIGHT, 1), round(w * WIDTH, 1), round(h * HEIGHT, 1)]])
+        out.append(dets)
+    return out
+
+
+def golden(lm, dets):
+    objects = [
+        reba_engine.hand_object(d, (f[15, 0] * WIDTH, f[15, 1] * HEIGHT), (f[16, 0] * WIDTH, f[16, 1] * HEIGHT))
+        for f, d in zip(lm, dets)
+    ]
+    present = np.array([o != reba_engine.NO_OBJECT for o in objects])
+    s = reba_engine.score_frames(lm, ACTUAL_WT, present, WIDTH, HEIGHT)
+    keys = reba_engine.JOINTS + tuple(f"{j}_score" for j in reba_engine.JOINTS) + ("reba", "rwl", "li", "h_cm", "v_cm")
+    return [
+        {
+            **{k: s[k][i].item() for k in keys},
+            "mmh_zone": reba_engine.MMH_ZONES[s["mmh_zone"][i]],
+            "mmh_reach": reba_engine.MMH_REACHES[s["mmh_reach"][i]],
+            "object": objects[i],
+        }
+        for i in range(len(lm))
+    ]
+
+
+def write_fixture(name, seed):
+    lm = clip(name, seed)
+    dets = detections(name, lm)
+    expected = golden(lm, dets)
+    header = {"scenario": name, "width": WIDTH, "height": HEIGHT, "fps": FPS, "actual_wt": ACTUAL_WT}
+    lines = [json.dumps({"t": round(i / FPS, 4), "landmarks": lm[i].tolist(), "detections": dets[i], "expected": expected[i]})
+             for i in range(FRAMES)]
+    path = FIXTURE_DIR / f"{name}.json"
+    path.write_text(json.dumps(header)[:-1] + ', "frames": [\n' + ",\n".join(lines) + "\n]}\n")
+    return path
+
+
+def main():
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    for seed, name in enumerate(SCENARIOS):
+        path = write_fixture(name, seed)
+        reba = [f["expected"]["reba"] for f in json.loads(path.read_text())["frames"]]
+        print(f"{path.name}: REBA {min(reba)}-{max(reba)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Server inference mode over a local WebRTC loopback, with no STUN / TURN.
+
+Each connection pairs two aiortc peers in this process: a "tablet" peer
+sending a clip (or a test pattern) at 30 fps, and a "server" peer handing every
+received frame to a ``webrtc_service.ServerVideoProcessor`` and sending the
+annotated frames back, as ``streamlit-webrtc`` does.  Signalling is direct
+and the peers use host candidates only.  Prints, per connection, the
+server-side readout (``stats()``) and the round trip measured by the sender:
+from sending a frame to receiving the frame that replaced it.
+
+    python benchmarks/webrtc_loopback.py --video recordings/station1.mp4 --connections 4 --duration 20
+    python benchmarks/webrtc_loopback.py --weights models/yolov8n-int8.onnx --out loopback.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from webrtc_service import ServerVideoProcessor  # noqa: E402
+
+FPS = 30
+
+
+def clip_frames(path, size=(640, 480)):
+    """Frames of ``path`` at ``size``, or a moving test pattern without a clip."""
+    import cv2
+
+    if path:
+        from batch_audit import iter_frames
+
+        return [cv2.resize(frame, size) for _, _, frame in iter_frames(path)]
+    frames = []
+    for i in range(FPS * 2):
+        frame = np.full((size[1], size[0], 3), 40, dtype=np.uint8)
+        cv2.circle(frame, (int(size[0] * (0.2 + 0.6 * i / (FPS * 2))), size[1] // 2), 40, (0, 200, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+async def run_connection(index, frames, detector, duration):
+    from aiortc import RTCConfiguration, RTCPeerConnection, VideoStreamTrack
+    from aiortc.mediastreams import MediaStreamTrack
+    from av import VideoFrame
+
+    sent = {}
+    round_trip_ms = []
+
+    class ClipTrack(VideoStreamTrack):
+        def __init__(self):
+            super().__init__()
+            self.i = 0
+
+        async def recv(self):
+            pts, time_base = await self.next_timestamp()
+            frame = VideoFrame.from_ndarray(frames[self.i % len(frames)], format="bgr24")
+            frame.pts, frame.time_base = pts, time_base
+            sent[pts] = time.perf_counter()
+            self.i += 1
+            return frame
+
+    class ProcessedTrack(MediaStreamTrack):
+        kind = "video"
+
+        def __init__(self, source, processor):
+            super().__init__()
+            self.source = source
+            self.processor = processor
+
+        async def recv(self):
+            return self.processor.recv(await self.source.recv())
+
+    processor = ServerVideoProcessor(f"LOOP-{index}", detector=detector)
+    config = RTCConfiguration(iceServers=[])
+    tablet, server = RTCPeerConnection(config), RTCPeerConnection(config)
+
+    @server.on("track")
+    def on_server_track(track):
+        server.addTrack(ProcessedTrack(track, processor))
+
+    async def consume(track):
+        first_pts = None
+        while True:
+            try:
+                frame = await track.recv()
+            except Exception:
+                return
+            # The returned frame keeps the timestamp of the frame it replaced,
+            # but each RTP sender adds a random 32-bit offset: match on the
+            # distance from the first returned frame (the first one sent).
+            if first_pts is None:
+                first_pts = frame.pts
+            started = sent.get((frame.pts - first_pts) % (1 << 32))
+            if started is not None:
+                round_trip_ms.append((time.perf_counter() - started) * 1000)
+
+    consumers = []
+
+    @tablet.on("track")
+    def on_tablet_track(track):
+        consumers.append(asyncio.ensure_future(consume(track)))
+
+    tablet.addTransceiver(ClipTrack(), direction="sendrecv")
+    await tablet.setLocalDescription(await tablet.createOffer())
+    await server.setRemoteDescription(tablet.localDescription)
+    await server.setLocalDescription(await server.createAnswer())
+    await tablet.setRemoteDescription(server.localDescription)
+
+    await asyncio.sleep(duration)
+    stats = processor.stats()
+    await tablet.close()
+    await server.close()
+    for task in consumers:
+        task.cancel()
+    processor.on_ended()
+    rt = np.asarray(round_trip_ms) if round_trip_ms else np.zeros(1)
+    return {"connection": index, "returned": len(round_trip_ms),
+            "round_trip_p50_ms": round(float(np.percentile(rt, 50)), 1),
+            "round_trip_p95_ms": round(float(np.percentile(rt, 95)), 1), **stats}
+
+
+async def run(args):
+    detector = None
+    if args.weights:
+        from detectors import shared_pool
+
+        detector = shared_pool(args.weights, args.threads)
+    frames = clip_frames(args.video)
+    return await asyncio.gather(*(run_connection(i, frames, detector, args.duration) for i in range(args.connections)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--video", help="clip to stream (default: a test pattern, on which pose finds nobody)")
+    parser.add_argument("--connections", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per connection")
+    parser.add_argument("--weights", help="object detector weights for the shared pool (default: no detection)")
+    parser.add_argument("--threads", type=int, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    print(f"{'conn':>4}{'recv':>7}{'proc':>7}{'drop%':>7}{'fps':>6}{'lat p50':>9}{'lat p95':>9}"
+          f"{'lag p50':>9}{'rtt p50':>9}{'rtt p95':>9}")
+    for r in results:
+        print(f"{r['connection']:>4}{r['received']:>7}{r['processed']:>7}{r['drop_pct']:>7.1f}{r['fps']:>6.1f}"
+              + "".join(f"{r[k]:>9.1f}" if r[k] is not None else f"{'-':>9}"
+                        for k in ("latency_p50_ms", "latency_p95_ms", "lag_p50_ms", "round_trip_p50_ms", "round_trip_p95_ms")))
+        if r["error"]:
+            print(f"     error: {r['error']}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
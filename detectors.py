@@ -0,0 +1,266 @@
+"""CPU object detection with YOLOv8n exported to ONNX, and a shared model pool.
+
+``export`` turns the Ultralytics weights into an ONNX model with a dynamic batch
+axis and optionally an int8 copy: static QDQ quantisation calibrated on frames
+from the plant's own footage, or dynamic weight-only quantisation without
+them.  ``OnnxDetector`` runs either one with ONNX Runtime on the CPU,
+letterboxing a whole batch of frames (or wrist crops) into one input tensor,
+and returns the same ``(class_name, score, [x, y, w, h])`` detections as
+``vision.ObjectDetector``.
+
+``make_detector`` picks the backend from the weights file (``.pt`` or
+``.onnx``).  ``shared_pool`` loads each model once per process and serves
+every caller, e.g. all Streamlit sessions, through one ``DetectorPool``: a
+background thread that gathers concurrent requests into batches.
+
+    python detectors.py export --weights yolov8n.pt --int8 --calibrate recordings/station1.mp4
+    python batch_audit.py recordings/*.mp4 --weights models/yolov8n-int8.onnx
+"""
+
+import argparse
+import ast
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+import numpy as np
+
+from vision import YOLO_WEIGHTS, BatchDetector, ObjectDetector
+
+MODEL_DIR = Path(os.environ.get("REBA_MODEL_DIR", "models"))
+ONNX_WEIGHTS = MODEL_DIR / "yolov8n.onnx"
+ONNX_INT8_WEIGHTS = MODEL_DIR / "yolov8n-int8.onnx"
+INPUT_SIZE = 640
+# Ultralytics' predict defaults, so both backends report the same boxes.
+CONF_THRESHOLD = 0.25
+NMS_IOU = 0.7
+LETTERBOX_FILL = 114
+CALIBRATION_FRAMES = 64
+
+POOL_MAX_BATCH = 8
+POOL_MAX_WAIT_MS = 5.0
+
+COCO_NAMES = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light",
+    "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow",
+    "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee",
+    "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard", "surfboard",
+    "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
+    "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch",
+    "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard", "cell phone",
+    "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase", "scissors", "teddy bear",
+    "hair drier", "toothbrush",
+)
+
+
+def letterbox(frame_bgr, size=INPUT_SIZE):
+    """Resize keeping the aspect ratio and pad to ``size`` square; returns CHW RGB float32, scale and padding."""
+    import cv2
+
+    h, w = frame_bgr.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = round(h * scale), round(w * scale)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    out = np.full((size, size, 3), LETTERBOX_FILL, dtype=np.uint8)
+    out[top:top + nh, left:left + nw] = cv2.resize(frame_bgr, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return out[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0, scale, (left, top)
+
+
+def yolo_detections(output, scale, pad, shape, names, conf=CONF_THRESHOLD, iou=NMS_IOU):
+    """Detections from one image's raw YOLOv8 output ``(4 + classes, anchors)``.
+
+    Boxes are mapped back to the original ``(height, width)`` image and clipped to it.
+    """
+    import cv2
+
+    pred = output.T
+    cls = pred[:, 4:].argmax(axis=1)
+    scores = pred[np.arange(len(pred)), 4 + cls]
+    keep = scores > conf
+    pred, cls, scores = pred[keep], cls[keep], scores[keep]
+    if not len(pred):
+        return []
+    x0 = np.clip((pred[:, 0] - pred[:, 2] / 2 - pad[0]) / scale, 0, shape[1])
+    y0 = np.clip((pred[:, 1] - pred[:, 3] / 2 - pad[1]) / scale, 0, shape[0])
+    x1 = np.clip((pred[:, 0] + pred[:, 2] / 2 - pad[0]) / scale, 0, shape[1])
+    y1 = np.clip((pred[:, 1] + pred[:, 3] / 2 - pad[1]) / scale, 0, shape[0])
+    boxes = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+    # Class-aware NMS, as Ultralytics does by default.
+    kept = cv2.dnn.NMSBoxesBatched(boxes.tolist(), scores.tolist(), cls.tolist(), conf, iou)
+    order = sorted(np.asarray(kept, dtype=int).reshape(-1), key=lambda i: -scores[i])
+    return [(names[cls[i]], float(scores[i]), [float(v) for v in boxes[i]]) for i in order]
+
+
+class OnnxDetector(BatchDetector):
+    def __init__(self, model_path=ONNX_WEIGHTS, threads=None, conf=CONF_THRESHOLD, iou=NMS_IOU):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self._input = self._session.get_inputs()[0]
+        size = self._input.shape[2]
+        self.size = size if isinstance(size, int) else INPUT_SIZE
+        # A fixed batch axis (non-dynamic export) means one frame per run.
+        self._fixed_batch = self._input.shape[0] if isinstance(self._input.shape[0], int) else None
+        meta = self._session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else dict(enumerate(COCO_NAMES))
+        self.conf, self.iou = conf, iou
+
+    def detect_batch(self, frames_bgr):
+        if not frames_bgr:
+            return []
+        prepared = [letterbox(f, self.size) for f in frames_bgr]
+        step = self._fixed_batch or len(prepared)
+        outputs = []
+        for i in range(0, len(prepared), step):
+            blob = np.stack([p[0] for p in prepared[i:i + step]])
+            outputs += list(self._session.run(None, {self._input.name: blob})[0])
+        return [yolo_detections(out, scale, pad, frame.shape[:2], self.names, self.conf, self.iou)
+                for out, frame, (_, scale, pad) in zip(outputs, frames_bgr, prepared)]
+
+
+def make_detector(weights=YOLO_WEIGHTS, threads=None):
+    """ONNX Runtime for ``.onnx`` weights, Ultralytics (PyTorch) for anything else."""
+    if Path(weights).suffix == ".onnx":
+        if not Path(weights).exists():
+            raise FileNotFoundError(f"{weights} not found; create it with `python detectors.py export`")
+        return OnnxDetector(weights, threads)
+    return ObjectDetector(weights)
+
+
+class DetectorPool(BatchDetector):
+    """One detector shared by many threads; concurrent requests run as one batch.
+
+    Each call queues its frames and waits; a worker thread takes whatever has
+    queued up (up to ``max_batch`` frames, waiting at most ``max_wait_ms`` for
+    more) and runs it through ``detect_batch`` of the wrapped detector.
+    """
+
+    def __init__(self, detector, max_batch=POOL_MAX_BATCH, max_wait_ms=POOL_MAX_WAIT_MS):
+        self.detector = detector
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.batches = 0
+        self.frames = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="detector-pool", daemon=True).start()
+
+    def submit(self, frame_bgr):
+        future = Future()
+        self._queue.put((frame_bgr, future))
+        return future
+
+    def detect_batch(self, frames_bgr):
+        return [f.result() for f in [self.submit(frame) for frame in frames_bgr]]
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            try:
+                while len(pending) < self.max_batch:
+                    pending.append(self._queue.get(timeout=self.max_wait_s))
+            except queue.Empty:
+                pass
+            # Requests cancelled while queued are dropped; the rest can no longer be cancelled.
+            pending = [(frame, future) for frame, future in pending if future.set_running_or_notify_cancel()]
+            if not pending:
+                continue
+            # Every future gets an outcome: a failed or short batch fails all its callers.
+            try:
+                results = list(self.detector.detect_batch([frame for frame, _ in pending]))
+                if len(results) != len(pending):
+                    raise RuntimeError(f"detector returned {len(results)} results for {len(pending)} frames")
+            except Exception as exc:
+                for _, future in pending:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.frames += len(pending)
+            for (_, future), result in zip(pending, results):
+                future.set_result(result)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(weights=ONNX_WEIGHTS, threads=None):
+    """The process-wide ``DetectorPool`` for ``weights``, loading the model on first use."""
+    key = (str(weights), threads)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = DetectorPool(make_detector(weights, threads))
+        return _pools[key]
+
+
+class _CalibrationFrames:
+    """ONNX Runtime calibration reader over letterboxed frames."""
+
+    def __init__(self, input_name, frames, size):
+        self._items = iter([{input_name: letterbox(f, size)[0][None]} for f in frames])
+
+    def get_next(self):
+        return next(self._items, None)
+
+
+def _sample_frames(paths, count):
+    from batch_audit import iter_frames
+
+    frames = []
+    for path in paths:
+        frames += [frame for _, _, frame in iter_frames(path)]
+    if len(frames) <= count:
+        return frames
+    return [frames[i] for i in np.linspace(0, len(frames) - 1, count).astype(int)]
+
+
+def export(weights=YOLO_WEIGHTS, out=ONNX_WEIGHTS, int8_out=None, calibrate=(), size=INPUT_SIZE):
+    """Export to ONNX (dynamic batch axis) and optionally quantise to int8; returns the written paths."""
+    from ultralytics import YOLO
+
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    Path(YOLO(weights).export(format="onnx", imgsz=size, dynamic=True, simplify=True)).replace(out)
+    written = [out]
+    if int8_out is None:
+        return written
+
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    if calibrate:
+        import onnxruntime as ort
+
+        input_name = ort.InferenceSession(str(out), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        reader = _CalibrationFrames(input_name, _sample_frames(calibrate, CALIBRATION_FRAMES), size)
+        quantize_static(str(out), str(int8_out), reader, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+    else:
+        quantize_dynamic(str(out), str(int8_out), weight_type=QuantType.QUInt8)
+    written.append(Path(int8_out))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="export YOLOv8 weights to ONNX, optionally with an int8 copy")
+    exp.add_argument("--weights", default=YOLO_WEIGHTS)
+    exp.add_argument("--out", default=str(ONNX_WEIGHTS))
+    exp.add_argument("--int8", nargs="?", const=str(ONNX_INT8_WEIGHTS), metavar="PATH",
+                     help=f"also write an int8 model (default path {ONNX_INT8_WEIGHTS})")
+    exp.add_argument("--calibrate", nargs="+", default=[], metavar="VIDEO",
+                     help="clips for static int8 calibration; without them weights-only dynamic quantisation is used")
+    exp.add_argument("--imgsz", type=int, default=INPUT_SIZE)
+    args = parser.parse_args(argv)
+
+    for path in export(args.weights, args.out, args.int8, args.calibrate, args.imgsz):
+        print(f"wrote {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,800 @@
+const videoElement = document.getElementById('webcam');
+const canvasElement = document.getElementById('output_canvas');
+// "main" runs pose, detection and drawing here; "worker" moves them into Web
+// Workers (worker_pipeline.js).  Fixed for the page's lifetime: the canvas
+// can be handed to a worker only once, so boot.js reloads on a change.
+const pipelineMode = PIPELINE_MODES.includes(bootArgs.pipeline) ? bootArgs.pipeline : "main";
+const canvasCtx = pipelineMode === "main" ? canvasElement.getContext('2d') : null;
+let pipeline = null;
+const toggleBtn = document.getElementById('toggleBtn');
+
+// The diagram ships in the repo; the GitHub copy is only a fallback.
+const DIAGRAM_URLS = [assetManifest.diagram.local, assetManifest.diagram.cdn];
+
+let objectModel = null;
+let currentObject = "No object detected";
+let persistObject = "No object detected";
+
+let isAnalyzing = false;
+let startTime = 0;
+let currentSessionId = null;
+const telemetry = new TelemetryRecorder();
+// Raw landmarks and detections for offline replay (replay.py), when enabled.
+const landmarkRecorder = new LandmarkRecorder();
+let recordLandmarks = false;
+let sessionDuration = 0;
+let activeCameraInstance = null;
+let initialWristV = null;
+
+let bodyPartFrames = {
+  trunk: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+  neck: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+  upper_arm: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+  legs: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+  wrists: { s1_2: 0, s3_4: 0, s5_plus: 0 }
+};
+let totalFramesRecorded = 0;
+
+let peakRebaScore = 1;
+let frameTimeMs = 0;
+
+// --- STAGE TIMING ---
+const profiler = new StageProfiler();
+let showTimingOverlay = false;
+let poseSendStart = 0;
+
+function toggleTimingOverlay() {
+  showTimingOverlay = !showTimingOverlay;
+  document.getElementById('timingBtn').classList.toggle('active', showTimingOverlay);
+}
+
+// --- KEYFRAME GALLERY ---
+// The session's worst postures (keyframes.js).  Accepted frames are scaled
+// into a small canvas and JPEG-encoded asynchronously (toBlob, or in the
+// pose worker), so the scoring path only pays for one drawImage.
+const gallery = new KeyframeGallery();
+const keyframeCanvas = document.createElement('canvas');
+const keyframeCtx = keyframeCanvas.getContext('2d');
+
+// Peak-posture snapshot: captured when the sustained REBA improves, so at most
+// a handful of times per session.  `peakSnapshotVersion` discards captures
+// that finish after a newer peak (or a new session) has started one.
+let peakSnapshot = null;
+let peakSnapshotVersion = 0;
+
+// Downscaled JPEG of the current frame, handed to `store` when encoded.
+function captureFrame(store) {
+  if (pipeline) {
+    pipeline.captureKeyframe(KEYFRAME_WIDTH, KEYFRAME_QUALITY).then(store);
+    return;
+  }
+  let [w, h] = keyframeSize(canvasElement.width, canvasElement.height);
+  if (keyframeCanvas.width !== w) keyframeCanvas.width = w;
+  if (keyframeCanvas.height !== h) keyframeCanvas.height = h;
+  profiler.time("snapshot", () => keyframeCtx.drawImage(canvasElement, 0, 0, w, h));
+  keyframeCanvas.toBlob(store, 'image/jpeg', KEYFRAME_QUALITY);
+}
+
+function captureKeyframe(entry) {
+  let version = entry.version;
+  captureFrame(blob => { if (gallery.setBlob(entry, version, blob)) updateKeyframeCard(); });
+}
+
+function capturePeakSnapshot(tMs, reba) {
+  let version = ++peakSnapshotVersion;
+  captureFrame(blob => { if (blob && version === peakSnapshotVersion) peakSnapshot = { tMs: tMs, reba: reba, blob: blob }; });
+}
+
+function updateKeyframeCard() {
+  document.getElementById('keyframes').innerText = `${gallery.count} (${(gallery.bytes / 1024).toFixed(0)} KB)`;
+}
+
+function blobToDataUrl(blob) {
+  return new Promise(resolve => {
+    let reader = new FileReader();
+    reader.onload = () => resolve(reader.result);
+    reader.onerror = () => resolve("");
+    reader.readAsDataURL(blob);
+  });
+}
+
+// The report's posture snapshot: the sustained peak, else the worst keyframe,
+// else the current frame.
+async function snapshotBlob() {
+  if (peakSnapshot) return peakSnapshot.blob;
+  let worst = gallery.entries()[0];
+  if (worst) return worst.blob;
+  if (pipeline) {
+    let start = performance.now();
+    let blob = await pipeline.encodeSnapshot();
+    profiler.add("encode", performance.now() - start);
+    return blob;
+  }
+  let start = performance.now();
+  return new Promise(resolve => canvasElement.toBlob(blob => {
+    profiler.add("encode", performance.now() - start);
+    resolve(blob);
+  }, 'image/jpeg', 0.85));
+}
+
+// Standalone HTML contact sheet of the gallery, for sharing outside the report.
+async function exportKeyframes() {
+  let figures = [];
+  for (const e of gallery.entries()) {
+    let i = e.info;
+    figures.push(`<figure><img src="${await blobToDataUrl(e.blob)}"><figcaption>REBA ${e.reba} at ${(e.tMs / 1000).toFixed(1)}s - ` +
+      `LI ${i.li} - ${i.mmh_zone} - ${i.object} - trunk ${i.trunk}°, neck ${i.neck}°, upper arm ${i.upper_arm}°</figcaption></figure>`);
+  }
+  let html = `<!DOCTYPE html><html><head><meta charset="utf-8"><title>Keyframes ${operatorId}</title>` +
+    `<style>body{font-family:sans-serif}figure{display:inline-block;margin:8px}img{width:480px}</style></head>` +
+    `<body><h1>Worst postures - ${operatorId} (${new Date(startTime).toISOString()})</h1>${figures.join("")}</body></html>`;
+  let link = document.createElement('a');
+  link.href = URL.createObjectURL(new Blob([html], { type: "text/html" }));
+  link.download = `REBA_Keyframes_${operatorId}.html`;
+  link.click();
+  setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+}
+let peakAngles = { 
+  neck: 121.4, trunk: 174.9, legs: 178.0, upper_arm: 45.4, lower_arm: 46.6, wrist: 114.1, 
+  neck_score: 2, trunk_score: 2, legs_score: 1, upper_arm_score: 3, lower_arm_score: 2, wrist_score: 2 
+};
+
+let liveMmhZone = "Shoulder to Elbow";
+let liveMmhReach = "Close Reach";
+let peakMmhZone = "Shoulder to Elbow";
+let peakMmhReach = "Close Reach";
+
+let latestNiosh = { rwl: 18.71, li: 0.43, status: "SAFE", am: 1.0, hm: 1.0, vm: 0.86, dm: 1.0, fm: 0.95, cm: 1.0, h_cm: 25.0, v_cm: 122.1, d_cm: 25.0, a_deg: 0.9 };
+let peakNiosh = { rwl: 18.71, li: 0.43, status: "SAFE", am: 1.0, hm: 1.0, vm: 0.86, dm: 1.0, fm: 0.95, cm: 1.0, h_cm: 25.0, v_cm: 122.1, d_cm: 25.0, a_deg: 0.9 };
+
+// Sidebar settings; pushed in by Python as render args without reloading the iframe.
+let operatorId = "OP-001";
+let workstation = "";
+let evalProfile = "Male";
+let actualWeight = 8.0;
+let detectEveryN = 3;
+let detectMinIntervalMs = 100;
+let detectRegion = "full";
+
+// Adaptive capture quality; off until the sidebar sets a target FPS.
+const quality = new QualityController();
+let poseComplexity = quality.settings.modelComplexity;
+let detectMinScore = quality.settings.detectMinScore;
+let rollingWindowS = 10;
+let sustainS = 3;
+let angleMode = "2d";
+
+// Lift cycles for the measured NIOSH frequency and travel distance.
+const lifting = new LiftSegmenter();
+
+// Reused by the 3D angle mode: the packed landmarks and the chosen joint angles.
+const angleLandmarkBuf = new Float32Array(ANGLE_BUFFER_LENGTH);
+const angleBuf = new Float64Array(6);
+
+// 3D angles from the metric world landmarks when MediaPipe provides them,
+// else from the image landmarks with z on the x scale.  The pose worker sends
+// them already packed; the classic pipeline packs them here.
+function frameAngles(lm, worldLm, width, height, packed) {
+  if (angleMode !== "3d") return null;
+  if (!packed) {
+    packed = worldLm ? packAngleLandmarks(worldLm, 1, 1, 1, angleLandmarkBuf)
+                     : packAngleLandmarks(lm, width, height, width, angleLandmarkBuf);
+  }
+  return jointAngles3D(packed, angleBuf);
+}
+
+// Rolling and sustained ("worst posture held >= sustainS") REBA / LI.
+const postureWindows = new PostureWindows(rollingWindowS * 1000, sustainS * 1000);
+
+function sustainedLabel() {
+  return postureWindows.sustainedReba === null ? "-" : `${postureWindows.sustainedReba} (≥${sustainS}s)`;
+}
+
+// --- PYTHON BRIDGE ---
+// Events wait in an outbox until Python acknowledges their seq in the render
+// args, so reruns that coalesce several component values lose nothing.
+const clientId = Math.random().toString(36).slice(2, 10);
+let outbox = [];
+let eventSeq = 0;
+
+function postEvent(kind, payload) {
+  outbox.push({ seq: ++eventSeq, kind: kind, payload: payload });
+  Streamlit.setComponentValue({ client_id: clientId, events: outbox });
+}
+
+function applyArgs(args) {
+  if (args.operator_id !== undefined) operatorId = args.operator_id;
+  if (args.workstation !== undefined) workstation = args.workstation;
+  if (args.profile !== undefined) evalProfile = args.profile;
+  if (args.actual_wt !== undefined) actualWeight = Number(args.actual_wt);
+  lifting.configure(args.lift_duration ?? lifting.duration, actualWeight);
+  if (args.det_every !== undefined) detectEveryN = Number(args.det_every);
+  if (args.det_interval_ms !== undefined) detectMinIntervalMs = Number(args.det_interval_ms);
+  if (args.det_region !== undefined) detectRegion = args.det_region;
+  if (args.target_fps !== undefined && Number(args.target_fps) !== quality.targetFps) {
+    quality.configure(Number(args.target_fps), performance.now());
+    applyQuality(quality.settings);
+  }
+  if (args.angle_mode !== undefined) angleMode = args.angle_mode;
+  if (args.record_landmarks !== undefined) recordLandmarks = Boolean(args.record_landmarks);
+  if ((args.rolling_s !== undefined && Number(args.rolling_s) !== rollingWindowS) ||
+      (args.sustain_s !== undefined && Number(args.sustain_s) !== sustainS)) {
+    rollingWindowS = Number(args.rolling_s ?? rollingWindowS);
+    sustainS = Number(args.sustain_s ?? sustainS);
+    postureWindows.configure(rollingWindowS * 1000, sustainS * 1000);
+  }
+  if (args.ack && args.ack.client_id === clientId) outbox = outbox.filter(e => e.seq > args.ack.seq);
+}
+
+applyArgs(bootArgs);
+Streamlit.onRender(applyArgs);
+
+// --- MODEL PRELOAD & WARM-UP ---
+// One tiny inference per model compiles the WASM / WebGL kernels before the
+// first camera frame needs them.
+const warmupCanvas = document.createElement('canvas');
+warmupCanvas.width = 64;
+warmupCanvas.height = 64;
+
+function reportColdStart() {
+  if (coldStart.pose_ready_ms === null || coldStart.detector_ready_ms === null || coldStart.first_frame_ms === null) return;
+  document.getElementById('cold_start').innerText = `${(coldStart.first_frame_ms / 1000).toFixed(2)}s (${coldStart.mode})`;
+  postEvent("cold_start", { ...coldStart, user_agent: navigator.userAgent });
+}
+
+let cocoOptions = assetMode === "offline" ? { base: 'lite_mobilenet_v2', modelUrl: assetUrl(assetManifest.coco_ssd_model) } : {};
+if (pipelineMode === "main") {
+  cocoSsd.load(cocoOptions).then(async model => {
+    try { await model.detect(warmupCanvas); } catch (e) {}
+    objectModel = model;
+    coldStart.detector_ready_ms = performance.now() - bootStart;
+    reportColdStart();
+  });
+}
+
+function detectorReady() {
+  return pipeline ? pipeline.detectReady : objectModel !== null;
+}
+
+function resetSessionMemory() {
+  peakRebaScore = 1;
+  sessionDuration = 0;
+  totalFramesRecorded = 0;
+  initialWristV = null;
+  postureWindows.reset();
+  peakSnapshot = null;
+  peakSnapshotVersion++;
+  lifting.reset();
+  gallery.reset();
+  updateKeyframeCard();
+  bodyPartFrames = {
+    trunk: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+    neck: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+    upper_arm: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+    legs: { s1_2: 0, s3_4: 0, s5_plus: 0 },
+    wrists: { s1_2: 0, s3_4: 0, s5_plus: 0 }
+  };
+  document.getElementById('peak_score').innerText = "1";
+  document.getElementById('sustained_score').innerText = "-";
+  document.getElementById('lift_stats').innerText = "-";
+  document.getElementById('timer').innerText = "0.0s";
+}
+
+function toggleAnalysis() {
+  if (!isAnalyzing) {
+    resetSessionMemory();
+    isAnalyzing = true;
+    startTime = Date.now();
+    currentSessionId = `${clientId}-${startTime}`;
+    telemetry.start(currentSessionId);
+    if (recordLandmarks) {
+      landmarkRecorder.start(currentSessionId, {
+        width: videoElement.videoWidth || 640, height: videoElement.videoHeight || 480,
+        operator_id: operatorId, workstation: workstation, actual_wt: actualWeight, profile: evalProfile,
+        angle_mode: angleMode, pipeline: pipelineMode, lift_duration: lifting.duration
+      });
+    }
+    profiler.reset();
+    quality.reset(performance.now());
+    toggleBtn.innerText = "⏹ Stop Session";
+    toggleBtn.classList.add("recording");
+  } else {
+    isAnalyzing = false;
+    sessionDuration = ((Date.now() - startTime) / 1000.0).toFixed(1);
+    toggleBtn.innerText = "▶ Start Analysis";
+    toggleBtn.classList.remove("recording");
+    telemetry.stop();
+    landmarkRecorder.stop();
+    postEvent("session_summary", buildSessionSummary());
+    if (gallery.count || peakSnapshot) gallery.toPayload(currentSessionId, peakSnapshot).then(payload => postEvent("keyframes", payload));
+    postEvent("stage_timing", { session_id: currentSessionId, ...profiler.export(pipelineMode) });
+  }
+}
+
+function recordPartScore(partKey, score) {
+  if (score <= 2) bodyPartFrames[partKey].s1_2++;
+  else if (score <= 4) bodyPartFrames[partKey].s3_4++;
+  else bodyPartFrames[partKey].s5_plus++;
+}
+
+// --- DETECTION SCHEDULER & BOX TRACKER ---
+// Detection runs off the pose loop at a configurable cadence; between
+// detections the last boxes are extrapolated with a constant-velocity model.
+const TRACK_MATCH_IOU = 0.3;
+const TRACK_MAX_AGE_MS = 1000;
+
+let trackedBoxes = [];
+let detectInFlight = false;
+let framesSinceDetect = Infinity;
+let lastDetectStart = 0;
+let lastPoseFrameTime = 0;
+let lastDetectDoneTime = 0;
+let poseFps = 0;
+let detFps = 0;
+
+function ema(prev, value, alpha = 0.1) {
+  return prev === 0 ? value : prev + alpha * (value - prev);
+}
+
+function boxIoU(a, b) {
+  let ix = Math.max(0, Math.min(a[0] + a[2], b[0] + b[2]) - Math.max(a[0], b[0]));
+  let iy = Math.max(0, Math.min(a[1] + a[3], b[1] + b[3]) - Math.max(a[1], b[1]));
+  let inter = ix * iy;
+  let union = a[2] * a[3] + b[2] * b[3] - inter;
+  return union > 0 ? inter / union : 0;
+}
+
+function updateTracks(predictions, now) {
+  let next = [];
+  predictions.forEach(pred => {
+    if (pred.score <= detectMinScore || pred.class === 'person') return;
+    let best = null, bestIoU = TRACK_MATCH_IOU;
+    trackedBoxes.forEach(tr => {
+      if (tr.class !== pred.class) return;
+      let iou = boxIoU(predictTrackBox(tr, now), pred.bbox);
+      if (iou > bestIoU) { best = tr; bestIoU = iou; }
+    });
+    let vx = 0, vy = 0;
+    if (best) {
+      let dt = Math.max(1, now - best.t);
+      vx = ema(best.vx, (pred.bbox[0] - best.bbox[0]) / dt, 0.5);
+      vy = ema(best.vy, (pred.bbox[1] - best.bbox[1]) / dt, 0.5);
+    }
+    next.push({ class: pred.class, score: pred.score, bbox: pred.bbox, vx: vx, vy: vy, t: now });
+  });
+  trackedBoxes = next;
+}
+
+function predictTrackBox(tr, now) {
+  let dt = now - tr.t;
+  return [tr.bbox[0] + tr.vx * dt, tr.bbox[1] + tr.vy * dt, tr.bbox[2], tr.bbox[3]];
+}
+
+function currentTrackedBoxes(now) {
+  trackedBoxes = trackedBoxes.filter(tr => now - tr.t <= TRACK_MAX_AGE_MS);
+  return trackedBoxes.map(tr => ({ class: tr.class, score: tr.score, bbox: predictTrackBox(tr, now), predicted: now > tr.t }));
+}
+
+// Wrist-region mode tiles the regions into one strip (render.js).
+const roiCanvas = document.createElement("canvas");
+const roiCtx = roiCanvas.getContext("2d");
+
+function maybeScheduleDetection(now, lm) {
+  framesSinceDetect++;
+  if (!detectorReady() || detectInFlight || videoElement.readyState !== 4) return;
+  let every = quality.enabled ? Math.max(detectEveryN, quality.settings.detectEvery) : detectEveryN;
+  if (framesSinceDetect < every || now - lastDetectStart < detectMinIntervalMs) return;
+  let rois = null;
+  if (detectRegion === "wrists") {
+    // No visible wrist means nothing can be held: keep extrapolating old boxes.
+    rois = lm ? wristRois(lm, videoElement.videoWidth || 640, videoElement.videoHeight || 480) : [];
+    if (rois.length === 0) return;
+  }
+  framesSinceDetect = 0;
+  lastDetectStart = now;
+  detectInFlight = true;
+  if (pipeline) {
+    // The worker tiles the regions itself; onDetections clears the flag.
+    pipeline.detect(rois).then(sent => { if (!sent) detectInFlight = false; });
+    return;
+  }
+  let scales = rois ? drawRoiTiles(roiCtx, videoElement, rois) : null;
+  objectModel.detect(rois ? roiCanvas : videoElement).then(predictions => {
+    onDetections(rois ? roiPredictionsToFrame(predictions, rois, scales) : predictions, performance.now() - now);
+  }).catch(e => {}).finally(() => { detectInFlight = false; });
+}
+
+function onDetections(predictions, detectMs) {
+  let done = performance.now();
+  profiler.add("detect", detectMs);
+  if (isAnalyzing) landmarkRecorder.noteDetections(predictions, Date.now() - startTime);
+  updateTracks(predictions, done);
+  if (lastDetectDoneTime > 0) detFps = ema(detFps, 1000.0 / Math.max(1, done - lastDetectDoneTime));
+  lastDetectDoneTime = done;
+  document.getElementById('det_fps').innerText = detFps.toFixed(1);
+}
+
+function markPoseFrame(now) {
+  if (coldStart.first_frame_ms === null) {
+    coldStart.first_frame_ms = now - bootStart;
+    reportColdStart();
+  }
+  profiler.frame(now);
+  if (lastPoseFrameTime > 0) poseFps = ema(poseFps, 1000.0 / Math.max(1, now - lastPoseFrameTime));
+  lastPoseFrameTime = now;
+  document.getElementById('pose_fps').innerText = poseFps.toFixed(1);
+}
+
+// Tracked boxes near a wrist, and the held object they imply.
+function associateHandObject(lm, width, height, now) {
+  let leftWrist = lm[15], rightWrist = lm[16];
+  let lwX = leftWrist ? leftWrist.x * width : -1;
+  let lwY = leftWrist ? leftWrist.y * height : -1;
+  let rwX = rightWrist ? rightWrist.x * width : -1;
+  let rwY = rightWrist ? rightWrist.y * height : -1;
+
+  let handBoxes = [];
+  let handOnObjectDetected = "No object detected";
+  if (detectorReady()) {
+    currentTrackedBoxes(now).forEach(pred => {
+      let nearLeft = lwX > 0 && isHandNearBox(lwX, lwY, pred.bbox);
+      let nearRight = rwX > 0 && isHandNearBox(rwX, rwY, pred.bbox);
+      if (nearLeft || nearRight) handBoxes.push(pred);
+    });
+    handOnObjectDetected = handBoxes.length > 0 ? (handBoxes[0].class || "Unidentified Object") :
+      (Math.hypot(lwX - rwX, lwY - rwY) < 180 && lwY > 0 && rwY > 0) ? "Unidentified Object" : "No object detected";
+  }
+
+  currentObject = handOnObjectDetected;
+  if (currentObject !== "No object detected") persistObject = currentObject;
+  document.getElementById('object_detected').innerText = currentObject;
+  return handBoxes;
+}
+
+// Scoring, metric cards and session bookkeeping for one pose result.
+function scoreLandmarks(lm, worldLm, width, height, angleLandmarks = null) {
+  let frame = profiler.time("scoring", () =>
+    scoreFrame(lm, width, height, actualWeight, currentObject, initialWristV,
+               frameAngles(lm, worldLm, width, height, angleLandmarks)));
+  let totalReba = frame.reba;
+  document.getElementById('live_score').innerText = totalReba;
+
+  if (initialWristV === null && isAnalyzing) initialWristV = frame.niosh.v_cm;
+  latestNiosh = frame.niosh;
+  document.getElementById('niosh_result').innerText = `${latestNiosh.status} (LI ${latestNiosh.li.toFixed(2)})`;
+
+  liveMmhZone = frame.mmhZone;
+  liveMmhReach = frame.mmhReach;
+  document.getElementById('mmh_zone').innerText = `${liveMmhZone} (${liveMmhReach})`;
+
+  if (isAnalyzing) {
+    totalFramesRecorded++;
+    landmarkRecorder.pushFrame(Date.now() - startTime, lm, worldLm);
+    let lift = lifting.push(Date.now() - startTime, frame.niosh.h_cm, frame.niosh.v_cm, Number(frame.niosh.a_deg),
+      frame.mmhZone, currentObject !== NO_OBJECT);
+    if (lift) {
+      document.getElementById('lift_stats').innerText = `${lifting.count} / ${lift.lifts_per_min.toFixed(1)} (LI ${lift.li.toFixed(2)})`;
+    }
+    recordPartScore('trunk', frame.trunk_score);
+    recordPartScore('neck', frame.neck_score);
+    recordPartScore('upper_arm', frame.upper_arm_score);
+    recordPartScore('legs', frame.legs_score);
+    recordPartScore('wrists', frame.wrist_score);
+    telemetry.push({
+      ...frame,
+      t_ms: Date.now() - startTime,
+      rwl: frame.niosh.rwl,
+      li: frame.niosh.li,
+      mmh_zone: MMH_ZONE_INDEX.indexOf(frame.mmhZone),
+      mmh_reach: frame.mmhReach === "Far Reach" ? 1 : 0,
+      object: currentObject !== NO_OBJECT ? 1 : 0
+    });
+
+    let keyframe = gallery.offer(Date.now() - startTime, totalReba, {
+      li: Number(frame.niosh.li.toFixed(2)), mmh_zone: frame.mmhZone, object: currentObject,
+      neck: Number(frame.neck.toFixed(1)), trunk: Number(frame.trunk.toFixed(1)), legs: Number(frame.legs.toFixed(1)),
+      upper_arm: Number(frame.upper_arm.toFixed(1)), lower_arm: Number(frame.lower_arm.toFixed(1)), wrist: Number(frame.wrist.toFixed(1))
+    });
+    if (keyframe) captureKeyframe(keyframe);
+
+    if (postureWindows.push(Date.now() - startTime, totalReba, frame.niosh.li)) {
+      document.getElementById('sustained_score').innerText = sustainedLabel();
+      recordPeakPosture(frame);
+      capturePeakSnapshot(Date.now() - startTime, postureWindows.sustainedReba);
+    }
+    let rolling = postureWindows.rolling();
+    document.getElementById('rolling_reba').innerText = `${rolling.reba_mean.toFixed(1)} / ${rolling.reba_p95}`;
+
+    sessionDuration = ((Date.now() - startTime) / 1000.0).toFixed(1);
+    document.getElementById('timer').innerText = sessionDuration + "s";
+  }
+
+  // The peak posture follows the sustained REBA (above); until a posture has
+  // been held for the sustain window, the worst single frame stands in.
+  if (totalReba > peakRebaScore) {
+    peakRebaScore = totalReba;
+    document.getElementById('peak_score').innerText = peakRebaScore;
+    if (postureWindows.sustainedReba === null) recordPeakPosture(frame);
+  }
+}
+
+function recordPeakPosture(frame) {
+  peakMmhZone = frame.mmhZone;
+  peakMmhReach = frame.mmhReach;
+  peakNiosh = { ...frame.niosh };
+  peakAngles = {
+    neck: frame.neck, neck_score: frame.neck_score,
+    trunk: frame.trunk, trunk_score: frame.trunk_score,
+    legs: frame.legs, legs_score: frame.legs_score,
+    upper_arm: frame.upper_arm, upper_arm_score: frame.upper_arm_score,
+    lower_arm: frame.lower_arm, lower_arm_score: frame.lower_arm_score,
+    wrist: frame.wrist, wrist_score: frame.wrist_score
+  };
+}
+
+async function onResults(results) {
+  let callbackStart = performance.now();
+  if (poseSendStart > 0) profiler.add("pose_infer", callbackStart - poseSendStart);
+  canvasElement.width = videoElement.videoWidth || 640;
+  canvasElement.height = videoElement.videoHeight || 480;
+
+  canvasCtx.save();
+  canvasCtx.clearRect(0, 0, canvasElement.width, canvasElement.height);
+  canvasCtx.drawImage(results.image, 0, 0, canvasElement.width, canvasElement.height);
+
+  let now = performance.now();
+  let drawMs = now - callbackStart;
+  markPoseFrame(now);
+  maybeScheduleDetection(now, results.poseLandmarks);
+
+  if (results.poseLandmarks) {
+    let lm = results.poseLandmarks;
+    let handBoxes = associateHandObject(lm, canvasElement.width, canvasElement.height, now);
+
+    let drawStart = performance.now();
+    handBoxes.forEach(pred => drawHandBox(canvasCtx, pred));
+    drawConnectors(canvasCtx, lm, POSE_CONNECTIONS, {color: '#00FF00', lineWidth: 3});
+    drawLandmarks(canvasCtx, lm, {color: '#FF0000', lineWidth: 2, radius: 4});
+    drawMs += performance.now() - drawStart;
+
+    scoreLandmarks(lm, results.poseWorldLandmarks, canvasElement.width, canvasElement.height);
+  }
+  profiler.add("draw", drawMs);
+  if (showTimingOverlay) profiler.drawOverlay(canvasCtx);
+  canvasCtx.restore();
+
+  profiler.add("on_results", performance.now() - callbackStart);
+  frameTimeMs = ema(frameTimeMs, performance.now() - now);
+  document.getElementById('frame_ms').innerText = frameTimeMs.toFixed(1) + " ms";
+}
+
+// Worker pipeline counterpart of onResults: the pose worker has already
+// drawn the frame, so this scores, updates the cards and sends back the
+// boxes and overlay rows for it to draw next.
+function onWorkerPose(msg, roundTripMs) {
+  let now = performance.now();
+  profiler.add("pose_send", roundTripMs);
+  profiler.add("pose_infer", msg.infer_ms);
+  profiler.add("draw", msg.draw_ms);
+  markPoseFrame(now);
+  maybeScheduleDetection(now, msg.landmarks);
+
+  let handBoxes = [];
+  if (msg.landmarks) {
+    handBoxes = associateHandObject(msg.landmarks, msg.width, msg.height, now);
+    scoreLandmarks(msg.landmarks, msg.worldLandmarks, msg.width, msg.height, msg.angleLandmarks);
+  }
+  pipeline.setOverlay(handBoxes, showTimingOverlay ? profiler.overlayLines() : null);
+  applyQuality(quality.observe(now, msg.infer_ms + msg.draw_ms));
+
+  profiler.add("on_results", performance.now() - now);
+  frameTimeMs = ema(frameTimeMs, roundTripMs);
+  document.getElementById('frame_ms').innerText = frameTimeMs.toFixed(1) + " ms";
+}
+
+// Pose input: the video itself, or a downscaled copy when the quality level
+// lowers the input resolution (landmarks are normalised, so nothing else moves).
+const poseCanvas = document.createElement("canvas");
+const poseCtx = poseCanvas.getContext("2d");
+
+function poseInput() {
+  let width = videoElement.videoWidth || 640, height = videoElement.videoHeight || 480;
+  let target = quality.enabled ? quality.settings.inputWidth : width;
+  if (target >= width) return videoElement;
+  let scaledHeight = Math.round(height * target / width);
+  if (poseCanvas.width !== target) poseCanvas.width = target;
+  if (poseCanvas.height !== scaledHeight) poseCanvas.height = scaledHeight;
+  poseCtx.drawImage(videoElement, 0, 0, target, scaledHeight);
+  return poseCanvas;
+}
+
+// Applies a level returned by the quality controller (null: no change).  With
+// the controller off the settings are the start level, the fixed defaults.
+function applyQuality(settings) {
+  if (!settings) return;
+  if (settings.modelComplexity !== poseComplexity) {
+    poseComplexity = settings.modelComplexity;
+    if (pipeline) pipeline.setModelComplexity(poseComplexity);
+    else pose.setOptions({ modelComplexity: poseComplexity });
+  }
+  detectMinScore = settings.detectMinScore;
+  document.getElementById('quality_level').innerText = quality.enabled ? settings.name : `${settings.name} (fixed)`;
+}
+
+let pose = null;
+if (pipelineMode === "main") {
+  pose = new Pose({
+    locateFile: (file) => assetUrl(assetManifest.pose_files) + file
+  });
+  pose.setOptions({ modelComplexity: poseComplexity, smoothLandmarks: true, minDetectionConfidence: 0.5 });
+  pose.onResults(onResults);
+  pose.initialize().then(() => {
+    coldStart.pose_ready_ms = performance.now() - bootStart;
+    reportColdStart();
+  });
+} else {
+  // The workers warm their own models up before reporting ready.
+  let tasks = assetManifest.pose_worker;
+  let base = assetUrl(tasks);
+  pipeline = new WorkerPipeline({
+    video: videoElement,
+    canvas: canvasElement,
+    onPose: onWorkerPose,
+    onDetections: (msg, roundTripMs) => {
+      onDetections(msg.predictions, msg.detect_ms ?? roundTripMs);
+      detectInFlight = false;
+    },
+    onReady: which => {
+      coldStart[which === "pose" ? "pose_ready_ms" : "detector_ready_ms"] = performance.now() - bootStart;
+      reportColdStart();
+    }
+  });
+  pipeline.start({
+    visionUrl: new URL(base + tasks.module, location.href).href,
+    wasmUrl: new URL(base + tasks.wasm, location.href).href,
+    modelUrls: Object.fromEntries(Object.entries(tasks.models).map(([level, model]) => [level, assetUrl(model)])),
+    modelComplexity: poseComplexity,
+    detectorScripts: assetManifest.scripts.filter(e => e.name === "tfjs" || e.name === "coco_ssd").map(e => new URL(assetUrl(e), location.href).href),
+    detectorOptions: cocoOptions.modelUrl ? { ...cocoOptions, modelUrl: new URL(cocoOptions.modelUrl, location.href).href } : cocoOptions
+  });
+}
+profiler.startLagProbe();
+
+async function switchCamera(facingMode) {
+  if (activeCameraInstance) await activeCameraInstance.stop();
+  if (videoElement.srcObject) videoElement.srcObject.getTracks().forEach(t => t.stop());
+
+  activeCameraInstance = new Camera(videoElement, {
+    onFrame: async () => {
+      if (pipeline) {
+        // Fire and forget: the worker's reply drives onWorkerPose.
+        pipeline.sendFrame(quality.enabled ? quality.settings.inputWidth : 0);
+        return;
+      }
+      poseSendStart = performance.now();
+      await pose.send({ image: poseInput() });
+      let done = performance.now();
+      profiler.add("pose_send", done - poseSendStart);
+      applyQuality(quality.observe(done, done - poseSendStart));
+      poseSendStart = 0;
+    },
+    width: 640, height: 480, facingMode: facingMode
+  });
+  activeCameraInstance.start();
+}
+
+switchCamera('user');
+
+function buildSessionSummary() {
+  let pct = {};
+  Object.keys(bodyPartFrames).forEach(part => {
+    pct[part] = {};
+    Object.keys(bodyPartFrames[part]).forEach(tier => {
+      pct[part][tier] = totalFramesRecorded ? 100.0 * bodyPartFrames[part][tier] / totalFramesRecorded : 0.0;
+    });
+  });
+  return {
+    session_id: currentSessionId,
+    started_at: new Date(startTime).toISOString(),
+    operator_id: operatorId,
+    workstation: workstation,
+    profile: evalProfile,
+    actual_wt: actualWeight,
+    angle_mode: angleMode,
+    duration_s: Number(sessionDuration),
+    total_frames: totalFramesRecorded,
+    peak_reba: peakRebaScore,
+    peak_angles: peakAngles,
+    peak_niosh: { ...peakNiosh, a_deg: Number(peakNiosh.a_deg) },
+    peak_mmh_zone: peakMmhZone,
+    peak_mmh_reach: peakMmhReach,
+    mmh_limit: getDynamicMmhLimit(evalProfile, peakMmhZone, peakMmhReach),
+    sustain_s: sustainS,
+    sustained_reba: postureWindows.sustainedReba,
+    sustained_li: postureWindows.sustainedLi,
+    sustained_at_s: postureWindows.sustainedRebaAtMs === null ? null : Number((postureWindows.sustainedRebaAtMs / 1000).toFixed(1)),
+    object: persistObject,
+    body_part_frames: bodyPartFrames,
+    body_part_pct: pct,
+    quality: quality.summary(performance.now()),
+    lifting: lifting.summary()
+  };
+}
+
+function getPct(partKey, tierKey) {
+  if (totalFramesRecorded === 0) {
+    if (partKey === 'upper_arm' && tierKey === 's1_2') return "36.3%";
+    if (partKey === 'upper_arm' && tierKey === 's3_4') return "63.7%";
+    if (tierKey === 's1_2') return "100.0%";
+    return "0.0%";
+  }
+  return ((bodyPartFrames[partKey][tierKey] / totalFramesRecorded) * 100).toFixed(1) + "%";
+}
+
+// --- PDF REPORT ---
+// Report requests copy the session's figures (and the snapshot / keyframe
+// Blobs) right away and queue the build in report_worker.js, so analysis
+// keeps running and several operators' reports can be queued back-to-back.
+let reportQueue = null;
+
+function updateReportButton(pending) {
+  document.getElementById('reportBtn').innerText = pending
+    ? `📄 Building PDF Report (${pending} queued)...`
+    : "📄 Download PDF Report";
+}
+
+function collectReport() {
+  let q = quality.enabled ? quality.summary(performance.now()) : null;
+  let lifts = lifting.summary();
+  return {
+    operator_id: operatorId,
+    duration_s: isAnalyzing ? ((Date.now() - startTime) / 1000.0).toFixed(1) : (sessionDuration || "12.4"),
+    peak_reba: peakRebaScore,
+    sustained_reba: postureWindows.sustainedReba,
+    sustain_s: sustainS,
+    quality_line: q ? `Capture quality (target ${q.target_fps} FPS): ${Object.entries(q.time_at_level_s).map(([name, secs]) => `${name} ${secs}s`).join(", ")} - ${q.adjustments.length} adjustment(s)` : "",
+    body_parts: [["Trunk", "trunk"], ["Neck", "neck"], ["Upper Arm", "upper_arm"], ["Legs", "legs"], ["Wrists", "wrists"]]
+      .map(([label, part]) => [label, getPct(part, 's1_2'), getPct(part, 's3_4'), getPct(part, 's5_plus')]),
+    angles: { ...peakAngles },
+    profile: evalProfile,
+    mmh_zone: peakMmhZone,
+    mmh_reach: peakMmhReach,
+    object: persistObject,
+    actual_wt: actualWeight,
+    max_limit: getDynamicMmhLimit(evalProfile, peakMmhZone, peakMmhReach),
+    niosh: { ...peakNiosh },
+    lifts: lifts,
+    lifts_line: lifts.lifts
+      ? `Measured lifts: ${lifts.lifts} at ${lifts.lifts_per_min} /min (${lifts.duration} duration), mean D ${lifts.mean_d_cm} cm - max lift LI ${lifts.max_li}, composite LI ${lifts.composite_li}`
+      : "Measured lifts: none segmented (the table FM above is assumed).",
+    keyframes: gallery.entries().map(e => ({ ...e.info, blob: e.blob, reba: e.reba, t_s: (e.tMs / 1000).toFixed(1) })),
+    min_gap_s: gallery.minGapMs / 1000,
+    snapshot: null,
+    filename: `REBA_NIOSH_Audit_${operatorId}.pdf`
+  };
+}
+
+async function downloadPdfReport() {
+  if (!reportQueue) {
+    reportQueue = new ReportQueue({
+      jspdfUrl: new URL(assetUrl(assetManifest.scripts.find(e => e.name === "jspdf")), location.href).href,
+      diagramUrls: DIAGRAM_URLS.map(url => new URL(url, location.href).href),
+      onChange: updateReportButton
+    });
+  }
+  let report = collectReport();
+  report.snapshot = await snapshotBlob();
+  try {
+    let blob = await reportQueue.enqueue(report);
+    let link = document.createElement('a');
+    link.href = URL.createObjectURL(blob);
+    link.download = report.filename;
+    link.click();
+    setTimeout(() => URL.revokeObjectURL(link.href), 1000);
+  } catch (e) {
+    console.error("PDF report failed:", e);
+  }
+}
+
+Streamlit.setFrameHeight();
+window.addEventListener("resize", () => Streamlit.setFrameHeight());
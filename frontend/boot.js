@@ -0,0 +1,46 @@
+// Loads the third-party scripts from the CDN or the local offline bundle
+// (frontend/vendor, see offline_assets.py), then starts the auditor.
+const bootStart = performance.now();
+const coldStart = { mode: null, scripts_ms: null, pose_ready_ms: null, detector_ready_ms: null, first_frame_ms: null };
+let bootArgs = null;
+let assetManifest = null;
+let assetMode = "cdn";
+const APP_SCRIPTS = ["render.js", "worker_pipeline.js", "telemetry.js", "profiler.js", "window_stats.js", "quality.js", "lifting.js", "keyframes.js", "report_builder.js", "auditor.js"];
+
+function assetUrl(entry) {
+  return assetMode === "offline" ? entry.local : entry.cdn;
+}
+
+function loadScript(src) {
+  return new Promise((resolve, reject) => {
+    const el = document.createElement("script");
+    el.src = src;
+    el.crossOrigin = "anonymous";
+    el.async = false; // fetch in parallel, execute in insertion order
+    el.onload = resolve;
+    el.onerror = () => reject(new Error(`failed to load ${src}`));
+    document.head.appendChild(el);
+  });
+}
+
+async function boot(args) {
+  assetMode = args.asset_mode === "offline" ? "offline" : "cdn";
+  coldStart.mode = assetMode;
+  if ("serviceWorker" in navigator) navigator.serviceWorker.register("sw.js").catch(e => {});
+
+  assetManifest = await (await fetch("asset_manifest.json")).json();
+  await Promise.all(assetManifest.scripts.map(entry => loadScript(assetUrl(entry))));
+  coldStart.scripts_ms = performance.now() - bootStart;
+  await Promise.all(APP_SCRIPTS.map(loadScript));
+}
+
+Streamlit.onRender(args => {
+  if (bootArgs === null) {
+    bootArgs = args;
+    boot(args);
+  }
+  else if (args.asset_mode !== bootArgs.asset_mode || args.pipeline !== bootArgs.pipeline) {
+    location.reload();
+  }
+});
+Streamlit.setComponentReady();
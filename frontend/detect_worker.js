@@ -0,0 +1,38 @@
+// coco-ssd object detection off the main thread.  Frames arrive as
+// transferred ImageBitmaps, optionally with wrist regions to tile (see
+// wristRois); predictions go back in frame pixels.
+let model = null;
+let tileCtx = null;
+
+self.onmessage = async ({ data: msg }) => {
+  if (msg.type === "init") {
+    importScripts(...msg.scripts, "scoring.js", "render.js");
+    model = await cocoSsd.load(msg.options);
+    tileCtx = new OffscreenCanvas(ROI_TILE_PX, ROI_TILE_PX).getContext("2d");
+    self.postMessage({ type: "ready" });
+    return;
+  }
+  if (msg.type !== "detect") return;
+
+  let bitmap = msg.bitmap;
+  try {
+    let start = performance.now();
+    let predictions;
+    if (msg.rois) {
+      let scales = drawRoiTiles(tileCtx, bitmap, msg.rois);
+      let tiles = tileCtx.canvas.transferToImageBitmap();
+      try {
+        predictions = roiPredictionsToFrame(await model.detect(tiles), msg.rois, scales);
+      } finally {
+        tiles.close();
+      }
+    } else {
+      predictions = await model.detect(bitmap);
+    }
+    self.postMessage({ type: "detections", id: msg.id, predictions: predictions, detect_ms: performance.now() - start });
+  } catch (e) {
+    self.postMessage({ type: "detections", id: msg.id, predictions: [], error: String(e) });
+  } finally {
+    bitmap.close();
+  }
+};
@@ -0,0 +1,138 @@
+// Bounded gallery of a session's worst postures.  A min-heap keyed by REBA
+// holds at most KEYFRAME_COUNT frames, so a frame that does not beat the
+// mildest one kept is rejected in O(1) and an accepted one costs O(log K).
+// Kept frames are at least KEYFRAME_MIN_GAP_MS apart: within one spell of bad
+// posture only its worst frame survives, so the gallery shows K separate
+// moments rather than K neighbouring frames.  Each frame is a downscaled JPEG
+// Blob (no base64 strings in JS memory), released as soon as it is evicted, so
+// memory is capped at about K Blobs however long the session runs.
+const KEYFRAME_COUNT = 8;
+const KEYFRAME_MIN_GAP_MS = 5000;
+const KEYFRAME_WIDTH = 480;
+const KEYFRAME_QUALITY = 0.8;
+
+class KeyframeGallery {
+  constructor(capacity = KEYFRAME_COUNT, minGapMs = KEYFRAME_MIN_GAP_MS) {
+    this.capacity = capacity;
+    this.minGapMs = minGapMs;
+    this.reset();
+  }
+
+  reset() {
+    this.heap = [];
+    this.latest = null;
+    this.bytes = 0;
+    this.captures = 0;
+  }
+
+  get count() {
+    return this.heap.length;
+  }
+
+  // Offer a frame (session time in ms, REBA, per-frame details).  Returns the
+  // entry to fill in with setBlob, or null when the frame is not kept.  Times
+  // must not decrease, so only the latest entry can be within the gap.
+  offer(tMs, reba, info) {
+    let latest = this.latest;
+    if (latest && tMs - latest.tMs < this.minGapMs) {
+      if (reba <= latest.reba) return null;
+      // Same spell of bad posture: its worse frame replaces the kept one.
+      this._release(latest);
+      Object.assign(latest, { tMs: tMs, reba: reba, info: info, version: latest.version + 1 });
+      this._siftDown(latest.index);
+      this.captures++;
+      return latest;
+    }
+    let entry = { tMs: tMs, reba: reba, info: info, blob: null, version: 0, index: this.heap.length };
+    if (this.heap.length < this.capacity) {
+      this.heap.push(entry);
+      this._siftUp(entry.index);
+    } else {
+      if (reba <= this.heap[0].reba) return null;
+      this._release(this.heap[0]);
+      this.heap[0].index = -1;
+      entry.index = 0;
+      this.heap[0] = entry;
+      this._siftDown(0);
+    }
+    this.latest = entry;
+    this.captures++;
+    return entry;
+  }
+
+  // Attach the encoded frame, unless the entry was evicted or replaced meanwhile.
+  setBlob(entry, version, blob) {
+    if (!blob || entry.index < 0 || entry.version !== version) return false;
+    this._release(entry);
+    entry.blob = blob;
+    this.bytes += blob.size;
+    return true;
+  }
+
+  // Kept frames, worst first.
+  entries() {
+    return this.heap.filter(e => e.blob).sort((a, b) => b.reba - a.reba || a.tMs - b.tMs);
+  }
+
+  _release(entry) {
+    if (entry.blob) this.bytes -= entry.blob.size;
+    entry.blob = null;
+  }
+
+  _swap(i, j) {
+    let h = this.heap;
+    [h[i], h[j]] = [h[j], h[i]];
+    h[i].index = i;
+    h[j].index = j;
+  }
+
+  _siftUp(i) {
+    while (i > 0) {
+      let parent = (i - 1) >> 1;
+      if (this.heap[parent].reba <= this.heap[i].reba) break;
+      this._swap(i, parent);
+      i = parent;
+    }
+  }
+
+  _siftDown(i) {
+    let n = this.heap.length;
+    for (;;) {
+      let l = 2 * i + 1, r = l + 1, min = i;
+      if (l < n && this.heap[l].reba < this.heap[min].reba) min = l;
+      if (r < n && this.heap[r].reba < this.heap[min].reba) min = r;
+      if (min === i) break;
+      this._swap(i, min);
+      i = min;
+    }
+  }
+
+  // Export payload: every kept frame's details with its JPEG as base64, plus
+  // the session's peak-posture snapshot ({ tMs, reba, blob }) when given.
+  async toPayload(sessionId, peak = null) {
+    let frames = [];
+    for (const e of this.entries()) {
+      frames.push({ ...e.info, t_s: Number((e.tMs / 1000).toFixed(1)), reba: e.reba, jpeg: await blobToBase64(e.blob) });
+    }
+    let payload = { session_id: sessionId, min_gap_s: this.minGapMs / 1000, frames: frames };
+    if (peak) payload.peak = { t_s: Number((peak.tMs / 1000).toFixed(1)), reba: peak.reba, jpeg: await blobToBase64(peak.blob) };
+    return payload;
+  }
+}
+
+async function blobToBase64(blob) {
+  let bytes = new Uint8Array(await blob.arrayBuffer());
+  let chunks = [];
+  for (let i = 0; i < bytes.length; i += 0x8000) chunks.push(String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000)));
+  return btoa(chunks.join(""));
+}
+
+// Scaled copy of a canvas for a keyframe: width KEYFRAME_WIDTH at most.
+function keyframeSize(width, height) {
+  let scale = Math.min(1, KEYFRAME_WIDTH / Math.max(1, width));
+  return [Math.round(width * scale), Math.round(height * scale)];
+}
+
+if (typeof module !== "undefined") {
+  module.exports = { KeyframeGallery, blobToBase64, keyframeSize, KEYFRAME_COUNT, KEYFRAME_MIN_GAP_MS };
+}
@@ -0,0 +1,244 @@
+// Streaming lift-cycle segmentation for the NIOSH frequency and travel
+// distance.  Each frame feeds the smoothed wrist height and the hand-object
+// state into a small state machine: a lift starts once an object has been held
+// for LIFT_GRASP_MS and ends once it has been released for LIFT_RELEASE_MS;
+// holds whose wrist travel stays under LIFT_MIN_TRAVEL_CM are not lifts.
+// Origin and destination are the first and last held frames, which gives each
+// lift its own D, and the lift rate gives the frequency multiplier (FM) from
+// the NIOSH table.  Lifts are grouped into task categories by origin and
+// destination MMH zone for the composite lifting index.  Work per frame is
+// O(1) and memory is fixed: a ring of recent lift times for the rate, a
+// bounded log of recent lifts and one accumulator per category.
+const LIFT_GRASP_MS = 250;
+const LIFT_RELEASE_MS = 400;
+const LIFT_MIN_TRAVEL_CM = 10;
+const LIFT_SMOOTH_ALPHA = 0.3;
+// NIOSH averages the lifting frequency over a 15 minute sample.
+const LIFT_RATE_WINDOW_MS = 15 * 60 * 1000;
+// Lifts end at least a grasp plus a release apart: room for every lift in the window.
+const LIFT_RATE_CAPACITY = Math.ceil(LIFT_RATE_WINDOW_MS / (LIFT_GRASP_MS + LIFT_RELEASE_MS)) + 1;
+const LIFT_LOG_SIZE = 32;
+
+// NIOSH frequency multiplier table: lifts/min rows; columns are work duration
+// (<= 1 h, <= 2 h, <= 8 h) x vertical origin (V < 75 cm, V >= 75 cm).
+const FM_FREQUENCIES = [0.2, 0.5, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15];
+const FM_TABLE = [
+  [1.00, 1.00, 0.95, 0.95, 0.85, 0.85],
+  [0.97, 0.97, 0.92, 0.92, 0.81, 0.81],
+  [0.94, 0.94, 0.88, 0.88, 0.75, 0.75],
+  [0.91, 0.91, 0.84, 0.84, 0.65, 0.65],
+  [0.88, 0.88, 0.79, 0.79, 0.55, 0.55],
+  [0.84, 0.84, 0.72, 0.72, 0.45, 0.45],
+  [0.80, 0.80, 0.60, 0.60, 0.35, 0.35],
+  [0.75, 0.75, 0.50, 0.50, 0.27, 0.27],
+  [0.70, 0.70, 0.42, 0.42, 0.22, 0.22],
+  [0.60, 0.60, 0.35, 0.35, 0.18, 0.18],
+  [0.52, 0.52, 0.30, 0.30, 0.00, 0.15],
+  [0.45, 0.45, 0.26, 0.26, 0.00, 0.13],
+  [0.41, 0.41, 0.00, 0.23, 0.00, 0.00],
+  [0.37, 0.37, 0.00, 0.21, 0.00, 0.00],
+  [0.00, 0.34, 0.00, 0.00, 0.00, 0.00],
+  [0.00, 0.31, 0.00, 0.00, 0.00, 0.00],
+  [0.00, 0.28, 0.00, 0.00, 0.00, 0.00]
+];
+const LIFT_DURATIONS = ["short", "moderate", "long"];
+
+// FM for a lift rate; linear between table rows, 0 past the last non-zero row.
+function frequencyMultiplier(liftsPerMin, duration, vCm) {
+  let col = 2 * Math.max(0, LIFT_DURATIONS.indexOf(duration)) + (vCm >= 75 ? 1 : 0);
+  if (liftsPerMin <= FM_FREQUENCIES[0]) return FM_TABLE[0][col];
+  for (let i = 1; i < FM_FREQUENCIES.length; i++) {
+    if (liftsPerMin > FM_FREQUENCIES[i]) continue;
+    let lo = FM_TABLE[i - 1][col], hi = FM_TABLE[i][col];
+    // FM_FREQUENCIES[i - 1] < liftsPerMin <= FM_FREQUENCIES[i]
+    if (hi === 0) return 0;
+    let f = (liftsPerMin - FM_FREQUENCIES[i - 1]) / (FM_FREQUENCIES[i] - FM_FREQUENCIES[i - 1]);
+    return lo + f * (hi - lo);
+  }
+  return 0;
+}
+
+// Frequency-independent RWL (every multiplier but FM) at one end of a lift;
+// the object is held, so coupling is CM 1.0 as in nioshFor.
+function frequencyIndependentRwl(hCm, vCm, dCm, aDeg) {
+  let hm = Math.min(1.0, 25.0 / Math.max(25.0, hCm));
+  let vm = Math.max(0.0, 1.0 - 0.0033 * Math.abs(vCm - 75.0));
+  let dm = Math.min(1.0, 0.82 + 4.5 / Math.max(25.0, dCm));
+  let am = Math.max(0.0, 1.0 - 0.0032 * aDeg);
+  return 23.0 * hm * vm * dm * am;
+}
+
+function liftingIndex(load, rwl) {
+  return load / Math.max(0.1, rwl);
+}
+
+class LiftSegmenter {
+  constructor(duration = "long", load = 8.0) {
+    this.rateTimes = new Float64Array(LIFT_RATE_CAPACITY);
+    this.configure(duration, load);
+    this.reset();
+  }
+
+  configure(duration, load) {
+    this.duration = LIFT_DURATIONS.includes(duration) ? duration : "long";
+    this.load = load;
+  }
+
+  reset() {
+    this.state = "idle";
+    this.v = null;
+    this.startMs = null;
+    this.lastMs = null;
+    this.graspMs = null;
+    this.releaseMs = null;
+    this.origin = null;
+    this.last = null;
+    this.vMin = 0;
+    this.vMax = 0;
+    this.rateHead = 0;
+    this.rateSize = 0;
+    this.count = 0;
+    this.sumD = 0;
+    this.maxLi = 0;
+    this.log = [];
+    // Per (origin zone, destination zone): lifts and the worst lift's FIRWL.
+    this.categories = new Map();
+  }
+
+  // One frame: session time, NIOSH geometry (H, V, A) and MMH zone name.
+  // Returns the finished lift on the frame that completes one, else null.
+  push(tMs, hCm, vCm, aDeg, zone, held) {
+    if (this.startMs === null) this.startMs = tMs;
+    this.lastMs = tMs;
+    this.v = this.v === null ? vCm : this.v + LIFT_SMOOTH_ALPHA * (vCm - this.v);
+
+    if (this.state === "idle") {
+      if (!held) {
+        this.graspMs = null;
+        return null;
+      }
+      if (this.graspMs === null) {
+        this.graspMs = tMs;
+        this.origin = { t: tMs, h: hCm, v: this.v, a: aDeg, zone: zone };
+        this.vMin = this.vMax = this.v;
+      }
+      this._hold(tMs, hCm, aDeg, zone);
+      if (tMs - this.graspMs >= LIFT_GRASP_MS) this.state = "holding";
+      return null;
+    }
+
+    if (held) {
+      this.releaseMs = null;
+      this._hold(tMs, hCm, aDeg, zone);
+      return null;
+    }
+    if (this.releaseMs === null) this.releaseMs = tMs;
+    if (tMs - this.releaseMs < LIFT_RELEASE_MS) return null;
+    this.state = "idle";
+    this.graspMs = null;
+    this.releaseMs = null;
+    return this.vMax - this.vMin >= LIFT_MIN_TRAVEL_CM ? this._finish() : null;
+  }
+
+  _hold(tMs, hCm, aDeg, zone) {
+    if (this.v < this.vMin) this.vMin = this.v;
+    if (this.v > this.vMax) this.vMax = this.v;
+    this.last = { t: tMs, h: hCm, v: this.v, a: aDeg, zone: zone };
+  }
+
+  _finish() {
+    let o = this.origin, d = this.last;
+    let dCm = Math.abs(d.v - o.v);
+    let endMs = d.t;
+    this.rateTimes[(this.rateHead + this.rateSize) % LIFT_RATE_CAPACITY] = endMs;
+    if (this.rateSize < LIFT_RATE_CAPACITY) this.rateSize++;
+    else this.rateHead = (this.rateHead + 1) % LIFT_RATE_CAPACITY;
+    let rate = this.liftsPerMin(endMs);
+    let fm = frequencyMultiplier(rate, this.duration, o.v);
+
+    // The worse end of the lift governs.
+    let firwl = Math.min(frequencyIndependentRwl(o.h, o.v, dCm, o.a), frequencyIndependentRwl(d.h, d.v, dCm, d.a));
+    let rwl = firwl * fm;
+    let li = liftingIndex(this.load, rwl);
+
+    let lift = {
+      start_s: Number(((o.t - this.startMs) / 1000).toFixed(1)),
+      duration_s: Number(((endMs - o.t) / 1000).toFixed(1)),
+      v_origin_cm: Number(o.v.toFixed(1)), v_dest_cm: Number(d.v.toFixed(1)), d_cm: Number(dCm.toFixed(1)),
+      origin_zone: o.zone, dest_zone: d.zone,
+      lifts_per_min: Number(rate.toFixed(2)), fm: Number(fm.toFixed(2)),
+      rwl: Number(rwl.toFixed(2)), li: Number(li.toFixed(2))
+    };
+    this.count++;
+    this.sumD += dCm;
+    if (li > this.maxLi) this.maxLi = li;
+    this.log.push(lift);
+    if (this.log.length > LIFT_LOG_SIZE) this.log.shift();
+
+    let key = `${o.zone} -> ${d.zone}`;
+    let cat = this.categories.get(key);
+    if (!cat) this.categories.set(key, { origin_zone: o.zone, dest_zone: d.zone, lifts: 1, firwl: firwl, v_origin_cm: o.v });
+    else {
+      cat.lifts++;
+      if (firwl < cat.firwl) { cat.firwl = firwl; cat.v_origin_cm = o.v; }
+    }
+    return lift;
+  }
+
+  // Lifts per minute over the last LIFT_RATE_WINDOW_MS, at least one minute.
+  liftsPerMin(nowMs) {
+    while (this.rateSize > 0 && nowMs - this.rateTimes[this.rateHead] > LIFT_RATE_WINDOW_MS) {
+      this.rateHead = (this.rateHead + 1) % LIFT_RATE_CAPACITY;
+      this.rateSize--;
+    }
+    let spanMs = Math.min(LIFT_RATE_WINDOW_MS, Math.max(60000, nowMs - this.startMs));
+    return this.rateSize * 60000 / spanMs;
+  }
+
+  // NIOSH composite lifting index over the task categories, each at its
+  // session frequency: CLI = STLI_1 + sum over i >= 2 of the LI increase of
+  // task i from FM(F_1..i-1) to FM(F_1..i), tasks ordered worst STLI first.
+  compositeIndex(minutes) {
+    let tasks = [...this.categories.values()].map(c => {
+      let freq = c.lifts / minutes;
+      let fm = frequencyMultiplier(freq, this.duration, c.v_origin_cm);
+      return { ...c, freq: freq, fili: liftingIndex(this.load, c.firwl), stli: liftingIndex(this.load, c.firwl * fm) };
+    }).sort((a, b) => b.stli - a.stli);
+    if (tasks.length === 0) return { cli: null, tasks: [] };
+    let cli = tasks[0].stli, freq = tasks[0].freq;
+    for (let i = 1; i < tasks.length; i++) {
+      let t = tasks[i];
+      let before = frequencyMultiplier(freq, this.duration, t.v_origin_cm);
+      freq += t.freq;
+      let after = frequencyMultiplier(freq, this.duration, t.v_origin_cm);
+      cli += liftingIndex(this.load, t.firwl * after) - liftingIndex(this.load, t.firwl * before);
+    }
+    return { cli: cli, tasks: tasks };
+  }
+
+  summary() {
+    let minutes = this.startMs === null ? 1 : Math.max(1, (this.lastMs - this.startMs) / 60000);
+    let composite = this.compositeIndex(minutes);
+    // Session FM: the table at the session lift rate, from the worst task's origin height.
+    let tasks = composite.tasks;
+    let fm = tasks.length ? frequencyMultiplier(this.count / minutes, this.duration, tasks[0].v_origin_cm) : null;
+    return {
+      duration: this.duration,
+      lifts: this.count,
+      lifts_per_min: Number((this.count / minutes).toFixed(2)),
+      fm: fm === null ? null : Number(fm.toFixed(2)),
+      mean_d_cm: this.count ? Number((this.sumD / this.count).toFixed(1)) : null,
+      max_li: this.count ? Number(this.maxLi.toFixed(2)) : null,
+      composite_li: composite.cli === null ? null : Number(composite.cli.toFixed(2)),
+      tasks: composite.tasks.map(t => ({
+        origin_zone: t.origin_zone, dest_zone: t.dest_zone, lifts: t.lifts,
+        lifts_per_min: Number(t.freq.toFixed(2)), fili: Number(t.fili.toFixed(2)), stli: Number(t.stli.toFixed(2))
+      })),
+      recent: this.log
+    };
+  }
+}
+
+if (typeof module !== "undefined") {
+  module.exports = { frequencyMultiplier, frequencyIndependentRwl, LiftSegmenter, LIFT_DURATIONS, FM_TABLE };
+}
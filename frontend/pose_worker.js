@@ -0,0 +1,117 @@
+// Pose inference and rendering off the main thread.  Owns the output canvas
+// (transferred as an OffscreenCanvas) and a MediaPipe Tasks PoseLandmarker.
+// Each frame arrives as a transferred ImageBitmap; the worker runs pose, draws
+// the frame, skeleton, hand-object boxes and timing overlay, and posts back
+// only the landmarks, the packed 3D angle landmarks and its timings.  The main thread sends the boxes and
+// overlay rows it wants drawn, and asks for keyframes and report snapshots.
+importScripts("render.js", "scoring.js");
+
+let vision = null;
+let fileset = null;
+let landmarker = null;
+let modelUrls = null;
+let modelComplexity = 0;
+let canvas = null;
+let ctx = null;
+let drawer = null;
+let handBoxes = [];
+let overlayLines = null;
+const keyframe = { canvas: null, ctx: null };
+
+async function createLandmarker(complexity) {
+  let next = await vision.PoseLandmarker.createFromOptions(fileset, {
+    baseOptions: { modelAssetPath: modelUrls[complexity] || modelUrls[0], delegate: "GPU" },
+    runningMode: "VIDEO",
+    numPoses: 1,
+    minPoseDetectionConfidence: 0.5
+  });
+  if (landmarker) landmarker.close();
+  landmarker = next;
+  modelComplexity = complexity;
+}
+
+function render(bitmap, landmarks, width, height) {
+  if (canvas.width !== width) canvas.width = width;
+  if (canvas.height !== height) canvas.height = height;
+  ctx.drawImage(bitmap, 0, 0, width, height);
+  handBoxes.forEach(pred => drawHandBox(ctx, pred));
+  if (landmarks) {
+    drawer.drawConnectors(landmarks, vision.PoseLandmarker.POSE_CONNECTIONS, { color: '#00FF00', lineWidth: 3 });
+    drawer.drawLandmarks(landmarks, { color: '#FF0000', lineWidth: 2, radius: 4 });
+  }
+  if (overlayLines) drawOverlayLines(ctx, overlayLines);
+}
+
+async function onFrame(msg) {
+  let bitmap = msg.bitmap;
+  try {
+    let start = performance.now();
+    let result = landmarker.detectForVideo(bitmap, msg.t);
+    let inferred = performance.now();
+    let landmarks = result.landmarks && result.landmarks.length ? result.landmarks[0] : null;
+    let world = result.worldLandmarks && result.worldLandmarks.length ? result.worldLandmarks[0] : null;
+    render(bitmap, landmarks, msg.width, msg.height);
+    // Packed here so the main thread's 3D angle mode only runs the kernel.
+    let angleLandmarks = null;
+    if (world) angleLandmarks = packAngleLandmarks(world, 1, 1, 1);
+    else if (landmarks) angleLandmarks = packAngleLandmarks(landmarks, msg.width, msg.height, msg.width);
+    self.postMessage({
+      type: "pose", id: msg.id, landmarks: landmarks, worldLandmarks: world, angleLandmarks: angleLandmarks,
+      width: msg.width, height: msg.height,
+      infer_ms: inferred - start, draw_ms: performance.now() - inferred
+    }, angleLandmarks ? [angleLandmarks.buffer] : []);
+  } finally {
+    bitmap.close();
+  }
+}
+
+async function encodeSnapshot(msg) {
+  let blob = await canvas.convertToBlob({ type: "image/jpeg", quality: 0.85 });
+  self.postMessage({ type: "snapshot", id: msg.id, blob: blob });
+}
+
+// Downscaled JPEG of the current frame for the keyframe gallery.
+async function encodeKeyframe(msg) {
+  let scale = Math.min(1, msg.width / canvas.width);
+  let w = Math.round(canvas.width * scale), h = Math.round(canvas.height * scale);
+  if (!keyframe.canvas) {
+    keyframe.canvas = new OffscreenCanvas(w, h);
+    keyframe.ctx = keyframe.canvas.getContext("2d");
+  }
+  if (keyframe.canvas.width !== w) keyframe.canvas.width = w;
+  if (keyframe.canvas.height !== h) keyframe.canvas.height = h;
+  keyframe.ctx.drawImage(canvas, 0, 0, w, h);
+  let blob = await keyframe.canvas.convertToBlob({ type: "image/jpeg", quality: msg.quality });
+  self.postMessage({ type: "snapshot", id: msg.id, blob: blob });
+}
+
+self.onmessage = async ({ data: msg }) => {
+  switch (msg.type) {
+    case "init":
+      canvas = msg.canvas;
+      ctx = canvas.getContext("2d");
+      modelUrls = msg.modelUrls;
+      vision = await import(msg.visionUrl);
+      fileset = await vision.FilesetResolver.forVisionTasks(msg.wasmUrl);
+      drawer = new vision.DrawingUtils(ctx);
+      await createLandmarker(msg.modelComplexity || 0);
+      self.postMessage({ type: "ready" });
+      break;
+    case "frame":
+      await onFrame(msg);
+      break;
+    case "overlay":
+      handBoxes = msg.boxes;
+      overlayLines = msg.lines;
+      break;
+    case "options":
+      if (msg.modelComplexity !== modelComplexity) await createLandmarker(msg.modelComplexity);
+      break;
+    case "keyframe":
+      await encodeKeyframe(msg);
+      break;
+    case "encode":
+      await encodeSnapshot(msg);
+      break;
+  }
+};
@@ -0,0 +1,140 @@
+// Hot-path stage timing.  Each stage keeps a fixed log-spaced histogram of
+// durations (O(1) per sample, no allocation), from which the overlay reads
+// p50 / p95 and the session export takes the raw bucket counts.
+const PROFILER_MIN_MS = 0.01;
+const PROFILER_MAX_MS = 2000;
+const PROFILER_BUCKETS_PER_DECADE = 20;
+const PROFILER_BUCKETS = Math.ceil(Math.log10(PROFILER_MAX_MS / PROFILER_MIN_MS) * PROFILER_BUCKETS_PER_DECADE) + 1;
+// Upper edge of each bucket in ms; the last bucket also holds everything slower.
+const PROFILER_EDGES_MS = Array.from({ length: PROFILER_BUCKETS },
+  (_, i) => PROFILER_MIN_MS * Math.pow(10, (i + 1) / PROFILER_BUCKETS_PER_DECADE));
+// pose_send spans the whole pose.send() call, which includes on_results;
+// pose_infer is the part before MediaPipe invokes the results callback.  In
+// the worker pipeline pose_send is the round trip to the pose worker and
+// pose_infer / draw are measured inside it.  main_lag is how late a timer on
+// the main thread fires: what button clicks wait behind.
+const PROFILER_STAGES = ["pose_send", "pose_infer", "on_results", "detect", "draw", "scoring", "snapshot", "encode", "main_lag"];
+const LAG_PROBE_MS = 50;
+
+class StageHistogram {
+  constructor() {
+    this.counts = new Uint32Array(PROFILER_BUCKETS);
+    this.n = 0;
+    this.sum = 0;
+    this.max = 0;
+  }
+
+  add(ms) {
+    let i = ms <= PROFILER_MIN_MS ? 0 : Math.floor(Math.log10(ms / PROFILER_MIN_MS) * PROFILER_BUCKETS_PER_DECADE);
+    this.counts[Math.min(i, PROFILER_BUCKETS - 1)]++;
+    this.n++;
+    this.sum += ms;
+    if (ms > this.max) this.max = ms;
+  }
+
+  // Upper bucket edge at quantile q: within one bucket (~12%) of the true value.
+  quantile(q) {
+    if (this.n === 0) return 0;
+    let target = Math.ceil(q * this.n), seen = 0;
+    for (let i = 0; i < PROFILER_BUCKETS; i++) {
+      seen += this.counts[i];
+      if (seen >= target) return Math.min(PROFILER_EDGES_MS[i], this.max);
+    }
+    return this.max;
+  }
+
+  toJSON() {
+    return {
+      n: this.n, mean_ms: this.n ? this.sum / this.n : 0, max_ms: this.max,
+      p50_ms: this.quantile(0.5), p95_ms: this.quantile(0.95), counts: Array.from(this.counts)
+    };
+  }
+}
+
+class StageProfiler {
+  constructor(stages = PROFILER_STAGES) {
+    this.stages = stages;
+    this.reset();
+  }
+
+  reset() {
+    this.hist = {};
+    this.stages.forEach(s => { this.hist[s] = new StageHistogram(); });
+    this.frames = 0;
+    this.firstFrame = 0;
+    this.lastFrame = 0;
+  }
+
+  add(stage, ms) {
+    (this.hist[stage] || (this.hist[stage] = new StageHistogram())).add(ms);
+  }
+
+  // Runs fn() and records its wall time under `stage`.
+  time(stage, fn) {
+    let t0 = performance.now();
+    let result = fn();
+    this.add(stage, performance.now() - t0);
+    return result;
+  }
+
+  frame(now) {
+    if (this.frames === 0) this.firstFrame = now;
+    this.lastFrame = now;
+    this.frames++;
+  }
+
+  get fps() {
+    let span = this.lastFrame - this.firstFrame;
+    return this.frames > 1 && span > 0 ? 1000.0 * (this.frames - 1) / span : 0;
+  }
+
+  // Samples how late a LAG_PROBE_MS timer fires on this thread as main_lag.
+  startLagProbe() {
+    let expected = performance.now() + LAG_PROBE_MS;
+    let tick = () => {
+      let now = performance.now();
+      this.add("main_lag", Math.max(0, now - expected));
+      expected = now + LAG_PROBE_MS;
+      setTimeout(tick, LAG_PROBE_MS);
+    };
+    setTimeout(tick, LAG_PROBE_MS);
+  }
+
+  // Overlay text rows ({ text, color }), drawn by drawOverlayLines in render.js
+  // on whichever thread owns the canvas.
+  overlayLines() {
+    let lines = [
+      { text: `FPS ${this.fps.toFixed(1)}   frames ${this.frames}`, color: "#FFFFFF" },
+      { text: "stage          p50 ms   p95 ms", color: "#FFFFFF" }
+    ];
+    this.stages.filter(s => this.hist[s].n > 0).forEach(s => {
+      let h = this.hist[s];
+      let p95 = h.quantile(0.95);
+      lines.push({
+        text: `${s.padEnd(13)} ${h.quantile(0.5).toFixed(2).padStart(7)}  ${p95.toFixed(2).padStart(7)}`,
+        color: p95 > 33 ? "#FF6B6B" : p95 > 16 ? "#FFD93D" : "#FFFFFF"
+      });
+    });
+    return lines;
+  }
+
+  drawOverlay(ctx) {
+    drawOverlayLines(ctx, this.overlayLines());
+  }
+
+  // Histograms plus enough about the machine to compare hardware across plants.
+  export(pipeline = "main") {
+    let stages = {};
+    Object.keys(this.hist).forEach(s => { stages[s] = this.hist[s].toJSON(); });
+    return {
+      pipeline: pipeline,
+      frames: this.frames,
+      fps: this.fps,
+      bucket_edges_ms: PROFILER_EDGES_MS,
+      stages: stages,
+      user_agent: navigator.userAgent,
+      hardware_concurrency: navigator.hardwareConcurrency || null,
+      device_memory_gb: navigator.deviceMemory || null
+    };
+  }
+}
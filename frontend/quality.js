@@ -0,0 +1,140 @@
+// Adaptive capture quality.  Steps through a ladder of settings, from best to
+// cheapest, to keep the per-frame work (pose.send, which includes onResults)
+// inside the budget of a target frame rate.  Hysteresis keeps it from
+// flapping: it steps down only after sustained overload and steps up only
+// after sustained headroom well below the budget.  Every change waits out a
+// cooldown while the new settings settle, and an upgrade that has to be undone
+// soon after doubles the wait before the next one.  Every change is logged
+// against session time so the summary records which quality each stretch of
+// the recording had.
+const QUALITY_LEVELS = [
+  { name: "high", modelComplexity: 1, inputWidth: 640, detectEvery: 2, detectMinScore: 0.25 },
+  { name: "standard", modelComplexity: 0, inputWidth: 640, detectEvery: 3, detectMinScore: 0.25 },
+  { name: "reduced", modelComplexity: 0, inputWidth: 480, detectEvery: 5, detectMinScore: 0.35 },
+  { name: "low", modelComplexity: 0, inputWidth: 320, detectEvery: 10, detectMinScore: 0.45 }
+];
+const QUALITY_START_LEVEL = 1;
+// Work above this share of the frame budget is overload, below UP is headroom.
+const QUALITY_DOWN_LOAD = 1.0;
+const QUALITY_UP_LOAD = 0.6;
+const QUALITY_DOWN_HOLD_MS = 1500;
+const QUALITY_UP_HOLD_MS = 4000;
+const QUALITY_MAX_UP_HOLD_MS = 60000;
+const QUALITY_COOLDOWN_MS = 2000;
+// An upgrade reverted within this time counts as a flap.
+const QUALITY_FLAP_MS = 10000;
+const QUALITY_EMA_ALPHA = 0.1;
+
+function qualityEma(prev, value) {
+  return prev === 0 ? value : prev + QUALITY_EMA_ALPHA * (value - prev);
+}
+
+class QualityController {
+  constructor(levels = QUALITY_LEVELS, startLevel = QUALITY_START_LEVEL) {
+    this.levels = levels;
+    this.level = startLevel;
+    this.targetFps = 0;
+    this.upHoldMs = QUALITY_UP_HOLD_MS;
+    this.lastUpgradeAt = -Infinity;
+    this.upgradePending = false;
+    this.reset(0);
+  }
+
+  get enabled() { return this.targetFps > 0; }
+  get settings() { return this.levels[this.level]; }
+
+  // targetFps <= 0 turns the controller off and goes back to the start level.
+  configure(targetFps, now) {
+    this.targetFps = targetFps;
+    if (!this.enabled && this.level !== QUALITY_START_LEVEL) return this._change(QUALITY_START_LEVEL, "disabled", now);
+    this._settle(now);
+    return null;
+  }
+
+  // Called at session start: clears the log and time-at-level, keeps the level.
+  reset(now) {
+    this.sessionStart = now;
+    this.levelSince = now;
+    this.timeAtLevelMs = {};
+    this.log = [];
+    this._settle(now);
+  }
+
+  _settle(now) {
+    this.workEma = 0;
+    this.intervalEma = 0;
+    this.lastFrame = 0;
+    this.overSince = null;
+    this.underSince = null;
+    this.cooldownUntil = now + QUALITY_COOLDOWN_MS;
+  }
+
+  // One frame's work in ms; returns the new settings when the level changed.
+  observe(now, workMs) {
+    if (this.lastFrame > 0) this.intervalEma = qualityEma(this.intervalEma, now - this.lastFrame);
+    this.lastFrame = now;
+    this.workEma = qualityEma(this.workEma, workMs);
+    if (!this.enabled || now < this.cooldownUntil) return null;
+    // An upgrade that held through the flap window earns back the short wait.
+    if (this.upgradePending && now - this.lastUpgradeAt >= QUALITY_FLAP_MS) {
+      this.upgradePending = false;
+      this.upHoldMs = QUALITY_UP_HOLD_MS;
+    }
+
+    let budget = 1000.0 / this.targetFps;
+    let over = this.workEma > QUALITY_DOWN_LOAD * budget;
+    let under = this.workEma < QUALITY_UP_LOAD * budget;
+    this.overSince = over ? (this.overSince ?? now) : null;
+    this.underSince = under ? (this.underSince ?? now) : null;
+
+    if (over && this.level < this.levels.length - 1 && now - this.overSince >= QUALITY_DOWN_HOLD_MS) {
+      if (this.upgradePending) this.upHoldMs = Math.min(2 * this.upHoldMs, QUALITY_MAX_UP_HOLD_MS);
+      this.upgradePending = false;
+      return this._change(this.level + 1, "overload", now);
+    }
+    if (under && this.level > 0 && now - this.underSince >= this.upHoldMs) {
+      this.lastUpgradeAt = now;
+      this.upgradePending = true;
+      return this._change(this.level - 1, "headroom", now);
+    }
+    return null;
+  }
+
+  _change(level, reason, now) {
+    let from = this.levels[this.level].name;
+    this._accumulate(now);
+    this.level = level;
+    this.log.push({
+      t_s: Number(((now - this.sessionStart) / 1000).toFixed(1)),
+      from: from, to: this.settings.name, reason: reason,
+      work_ms: Number(this.workEma.toFixed(1)),
+      fps: this.intervalEma > 0 ? Number((1000.0 / this.intervalEma).toFixed(1)) : null
+    });
+    this._settle(now);
+    return this.settings;
+  }
+
+  _accumulate(now) {
+    let name = this.settings.name;
+    this.timeAtLevelMs[name] = (this.timeAtLevelMs[name] || 0) + now - this.levelSince;
+    this.levelSince = now;
+  }
+
+  // Session record: the level at start, every change, and time spent per level.
+  summary(now) {
+    this._accumulate(now);
+    let timeAtLevel = {};
+    Object.keys(this.timeAtLevelMs).forEach(k => { timeAtLevel[k] = Number((this.timeAtLevelMs[k] / 1000).toFixed(1)); });
+    let first = this.log.length ? this.log[0].from : this.settings.name;
+    return {
+      target_fps: this.targetFps,
+      start_level: first,
+      adjustments: this.log,
+      time_at_level_s: timeAtLevel
+    };
+  }
+}
+
+if (typeof module !== "undefined") {
+  module.exports = { QUALITY_LEVELS, QualityController };
+}
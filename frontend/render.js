@@ -0,0 +1,56 @@
+// Canvas helpers shared by the main thread and the inference workers; every
+// function takes its 2D context, so it works on a <canvas> or OffscreenCanvas.
+
+function drawHandBox(ctx, pred) {
+  let bbox = pred.bbox;
+  ctx.strokeStyle = '#00FFFF';
+  ctx.lineWidth = 3;
+  ctx.setLineDash(pred.predicted ? [6, 4] : []);
+  ctx.strokeRect(bbox[0], bbox[1], bbox[2], bbox[3]);
+  ctx.setLineDash([]);
+  ctx.fillStyle = '#00FFFF';
+  ctx.font = 'bold 14px Arial';
+  ctx.fillText(`Hand Object: ${pred.class} (${Math.round(pred.score * 100)}%)`, bbox[0], bbox[1] > 10 ? bbox[1] - 5 : 10);
+}
+
+// Timing overlay from StageProfiler.overlayLines(): [{ text, color }].
+function drawOverlayLines(ctx, lines) {
+  let lineH = 16, width = 230, height = lineH * lines.length + 8;
+  ctx.save();
+  ctx.fillStyle = "rgba(0, 0, 0, 0.6)";
+  ctx.fillRect(8, 8, width, height);
+  ctx.font = "12px monospace";
+  lines.forEach((line, i) => {
+    ctx.fillStyle = line.color;
+    ctx.fillText(line.text, 14, 8 + (i + 1) * lineH);
+  });
+  ctx.restore();
+}
+
+// Wrist-region detection: the regions around the wrists are drawn side by
+// side into one tile strip, detected in a single call, and the boxes mapped
+// back to frame pixels by the tile their centre falls in.
+const ROI_TILE_PX = 224;
+
+function drawRoiTiles(ctx, source, rois) {
+  let canvas = ctx.canvas;
+  if (canvas.width !== ROI_TILE_PX * rois.length) canvas.width = ROI_TILE_PX * rois.length;
+  if (canvas.height !== ROI_TILE_PX) canvas.height = ROI_TILE_PX;
+  ctx.fillStyle = "#000000";
+  ctx.fillRect(0, 0, canvas.width, canvas.height);
+  return rois.map((roi, i) => {
+    let scale = ROI_TILE_PX / Math.max(roi[2], roi[3]);
+    ctx.drawImage(source, roi[0], roi[1], roi[2], roi[3], i * ROI_TILE_PX, 0, roi[2] * scale, roi[3] * scale);
+    return scale;
+  });
+}
+
+function roiPredictionsToFrame(predictions, rois, scales) {
+  return predictions.map(pred => {
+    let [x, y, w, h] = pred.bbox;
+    let i = Math.min(rois.length - 1, Math.max(0, Math.floor((x + w / 2) / ROI_TILE_PX)));
+    let x0 = Math.max(x, i * ROI_TILE_PX), x1 = Math.min(x + w, (i + 1) * ROI_TILE_PX);
+    let local = [x0 - i * ROI_TILE_PX, y, x1 - x0, h];
+    return { ...pred, bbox: roiBoxToFrame(local, rois[i], scales[i]) };
+  });
+}
@@ -0,0 +1,466 @@
+// PDF audit report layout and the report queue.  The layout runs in
+// report_worker.js (or on the main thread when workers are unavailable) from a
+// plain report object that the auditor collects when a report is requested,
+// so live scoring never waits for jsPDF.
+//
+// Everything that does not depend on the session (titles, rules, column
+// headers, parameter names, formulas, notes) is recorded once per page load
+// into per-page draw-op templates and replayed into each document; only the
+// session's rows are laid out per report.  The reference diagram is fetched
+// and decoded once, then kept as JPEG bytes that jsPDF embeds as they are.
+const REPORT_DIAGRAM_QUALITY = 0.92;
+
+const RISK_ROWS = [
+  ["1", 1, 1, "None", "Not necessary"],
+  ["2-3", 2, 3, "Low", "May be necessary"],
+  ["4-7", 4, 7, "Medium", "Necessary"],
+  ["8-10", 8, 10, "High", "Necessary and soon"],
+  ["11-15", 11, 15, "Very high", "Necessary urgent"]
+];
+
+const MATRIX_ROWS = {
+  Male: [
+    ["Above Shoulder", "10.0 kg", "5.0 kg"],
+    ["Shoulder to Elbow", "20.0 kg", "10.0 kg"],
+    ["Elbow to Knuckle", "25.0 kg", "15.0 kg"],
+    ["Knuckle to Mid-Leg", "20.0 kg", "10.0 kg"],
+    ["Below Mid-Leg", "10.0 kg", "5.0 kg"]
+  ],
+  Female: [
+    ["Above Shoulder", "7.0 kg", "3.0 kg"],
+    ["Shoulder to Elbow", "13.0 kg", "7.0 kg"],
+    ["Elbow to Knuckle", "16.0 kg", "10.0 kg"],
+    ["Knuckle to Mid-Leg", "13.0 kg", "7.0 kg"],
+    ["Below Mid-Leg", "7.0 kg", "3.0 kg"]
+  ]
+};
+
+// [label, angle key, fallback angle, fallback score]
+const STEP_ROWS = [
+  ["Step 1: Neck", "neck", "121.4", 2],
+  ["Step 2: Trunk", "trunk", "174.9", 2],
+  ["Step 3: Legs", "legs", "178.0", 1],
+  ["Step 7: Upper Arm", "upper_arm", "45.4", 3],
+  ["Step 8: Lower Arm", "lower_arm", "46.6", 2],
+  ["Step 9: Wrist", "wrist", "114.1", 2]
+];
+
+// [parameter, measured-value key, unit, multiplier key, formula]
+const NIOSH_ROWS = [
+  ["Horizontal Multiplier (HM)", "h_cm", "cm", "hm", "25/H"],
+  ["Vertical Multiplier (VM)", "v_cm", "cm", "vm", "1-0.0033|V-75|"],
+  ["Distance Multiplier (DM)", "d_cm", "cm", "dm", "0.82 + (4.5/D)"],
+  ["Asymmetric Multiplier (AM)", "a_deg", "deg", "am", "1-0.0032(A)"],
+  ["Frequency Multiplier (FM)", null, "Moderate", "fm", "Lifting Table"],
+  ["Coupling Multiplier (CM)", null, "Good", "cm", "Container Grip"]
+];
+
+function matrixRows(profile) {
+  return profile === "Male" ? MATRIX_ROWS.Male : MATRIX_ROWS.Female;
+}
+
+// --- STATIC PAGE TEMPLATES ---
+// A template is the list of jsPDF calls its draw function made, plus the row
+// positions it laid out (``at``) for the per-session content.
+const pageTemplates = new Map();
+
+function pageTemplate(key, draw) {
+  let template = pageTemplates.get(key);
+  if (!template) {
+    let ops = [];
+    let recorder = new Proxy({}, { get: (_, name) => (...args) => { ops.push([name, args]); } });
+    let at = {};
+    draw(recorder, at);
+    template = { ops: ops, at: at };
+    pageTemplates.set(key, template);
+  }
+  return template;
+}
+
+function replayTemplate(doc, template) {
+  for (const [name, args] of template.ops) doc[name](...args);
+  return template.at;
+}
+
+function rebaTemplate() {
+  return pageTemplate("reba", (doc, at) => {
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(14);
+    doc.text("REBA POSTURE AUDIT REPORT", 105, 12, { align: "center" });
+
+    let yPos = 32;
+    doc.setFontSize(10);
+    doc.text("Full-Body Posture Duration Breakdown", 10, yPos); yPos += 4;
+    doc.line(10, yPos, 198, yPos); yPos += 5;
+    doc.setFontSize(8);
+    doc.text("Body Part", 12, yPos); doc.text("Score 1-2 (%)", 70, yPos);
+    doc.text("Score 3-4 (%)", 115, yPos); doc.text("Score 5+ (%)", 160, yPos);
+    yPos += 2; doc.line(10, yPos, 198, yPos); yPos += 5;
+    at.parts = yPos; yPos += 5 * 5;
+
+    yPos += 5;
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(10);
+    doc.text("REBA Standard Action & Risk Table", 10, yPos); yPos += 4;
+    doc.line(10, yPos, 198, yPos); yPos += 5;
+    doc.setFontSize(8);
+    doc.text("REBA Score", 12, yPos); doc.text("Risk Level", 70, yPos); doc.text("Action Required", 130, yPos);
+    yPos += 2; doc.line(10, yPos, 198, yPos); yPos += 5;
+    at.risk = yPos; yPos += RISK_ROWS.length * 5;
+
+    yPos += 6;
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(10);
+    doc.text("Peak REBA Posture Snapshot & Step-by-Step Joint Angles", 10, yPos); yPos += 6;
+    at.snapshot = yPos;
+
+    let tableY = yPos;
+    doc.setFontSize(8);
+    doc.text("REBA Step / Joint", 108, tableY); doc.text("Angle (°)", 158, tableY); doc.text("Score", 185, tableY);
+    tableY += 2; doc.line(108, tableY, 198, tableY); tableY += 5;
+    doc.setFont("Helvetica", "normal");
+    STEP_ROWS.forEach(row => { doc.text(row[0], 108, tableY); tableY += 6; });
+    at.steps = at.snapshot + 7;
+  });
+}
+
+function mmhTemplate(profile) {
+  return pageTemplate(`mmh:${profile}`, (doc, at) => {
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(14);
+    doc.text("MANUAL WEIGHT LIFTING AUDIT", 105, 12, { align: "center" });
+
+    let yPos = 28;
+    doc.setFontSize(10);
+    doc.text("Manual Material Handling Evaluation Summary", 10, yPos); yPos += 6;
+    at.summary = yPos; yPos += 3 * 5 + 6 + 10;
+
+    doc.text(`Recommended Weight Matrix Reference (${profile})`, 10, yPos); yPos += 4;
+    doc.line(10, yPos, 198, yPos); yPos += 5;
+    doc.setFontSize(8);
+    doc.text("Height Zone", 12, yPos); doc.text("Close Reach Limit (kg)", 90, yPos); doc.text("Far Reach Limit (kg)", 150, yPos);
+    yPos += 2; doc.line(10, yPos, 198, yPos); yPos += 5;
+    at.matrix = yPos; yPos += matrixRows(profile).length * 5;
+
+    yPos += 6;
+    doc.setFontSize(10);
+    doc.text("Ergonomic Lifting Reference Diagram", 10, yPos); yPos += 6;
+    at.diagram = yPos;
+
+    let recX = 108, recY = yPos + 10;
+    doc.text("Ergonomic Recommendations:", recX, recY); recY += 6;
+    doc.setFont("Helvetica", "normal"); doc.setFontSize(8);
+    doc.text("1. Maintain load close to body to optimize reach leverage.", recX, recY); recY += 5;
+    doc.text("2. Avoid lifting above shoulder height without mechanical support.", recX, recY);
+  });
+}
+
+function nioshTemplate() {
+  return pageTemplate("niosh", (doc, at) => {
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(14);
+    doc.text("NIOSH LIFTING EQUATION ASSESSMENT", 105, 12, { align: "center" });
+
+    let yPos = 28;
+    doc.setFontSize(10);
+    doc.text("1. Object & Load Condition", 10, yPos); yPos += 6;
+    at.load = yPos; yPos += 5 + 8;
+
+    doc.text("2. Live NIOSH Multipliers & Spatial Geometry", 10, yPos); yPos += 4;
+    doc.line(10, yPos, 198, yPos); yPos += 5;
+    doc.setFontSize(8);
+    doc.text("Parameter / Multiplier", 12, yPos); doc.text("Measured Value", 70, yPos);
+    doc.text("Multiplier Factor", 120, yPos); doc.text("Formula / Standard", 160, yPos);
+    yPos += 2; doc.line(10, yPos, 198, yPos); yPos += 5;
+
+    doc.setFont("Helvetica", "normal");
+    doc.text("Load Constant (LC)", 12, yPos); doc.text("23.0 kg", 70, yPos);
+    doc.text("1.00", 120, yPos); doc.text("Baseline Load", 160, yPos);
+    yPos += 5;
+    at.multipliers = yPos;
+    NIOSH_ROWS.forEach(row => { doc.text(row[0], 12, yPos); doc.text(row[4], 160, yPos); yPos += 5; });
+
+    yPos += 8;
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(10);
+    doc.text("3. NIOSH Final Safety Assessment", 10, yPos); yPos += 6;
+    at.assessment = yPos; yPos += 5 + 6 + 6 + 10;
+
+    doc.setFontSize(8);
+    doc.text("Engineering Notes:", 10, yPos); yPos += 5;
+    doc.setFont("Helvetica", "normal");
+    doc.text("- LI <= 1.0 indicates task is safe for most healthy industrial workers.", 12, yPos); yPos += 5;
+    doc.text("- Dynamic spatial tracking continuously evaluates horizontal reach (H) and vertical displacement (D).", 12, yPos);
+  });
+}
+
+function keyframesTemplate() {
+  return pageTemplate("keyframes", (doc, at) => {
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(14);
+    doc.text("WORST-POSTURE KEYFRAMES", 105, 12, { align: "center" });
+    at.grid = 26;
+  });
+}
+
+// --- PER-SESSION CONTENT ---
+function highlightRow(doc, yPos) {
+  doc.setFillColor(255, 255, 0);
+  doc.rect(10, yPos - 3.5, 188, 5, 'F');
+}
+
+function footer(doc, page, total, title) {
+  doc.setFont("Helvetica", "normal"); doc.setFontSize(8);
+  doc.text(`Page ${page} of ${total} - ${title}`, 105, 285, { align: "center" });
+}
+
+function layoutRebaPage(doc, r, snapshot, total) {
+  let at = replayTemplate(doc, rebaTemplate());
+  doc.setFont("Helvetica", "bold"); doc.setFontSize(10);
+  doc.text(`Operator: ${r.operator_id} | Total Duration: ${r.duration_s} sec`, 105, 18, { align: "center" });
+  let sustainedText = r.sustained_reba === null ? "" : ` | Sustained (>= ${r.sustain_s}s): ${r.sustained_reba}`;
+  doc.text(`Peak Evaluated REBA Score: ${r.peak_reba}${sustainedText}`, 105, 24, { align: "center" });
+  if (r.quality_line) {
+    doc.setFont("Helvetica", "normal"); doc.setFontSize(7);
+    doc.text(r.quality_line, 105, 28.5, { align: "center" });
+  }
+
+  let yPos = at.parts;
+  doc.setFont("Helvetica", "normal"); doc.setFontSize(8);
+  r.body_parts.forEach(row => {
+    doc.text(row[0], 12, yPos); doc.text(row[1], 70, yPos);
+    doc.text(row[2], 115, yPos); doc.text(row[3], 160, yPos);
+    yPos += 5;
+  });
+
+  yPos = at.risk;
+  RISK_ROWS.forEach(([label, low, high, level, action]) => {
+    let match = r.peak_reba >= low && (r.peak_reba <= high || high === 15);
+    if (match) highlightRow(doc, yPos);
+    doc.setFont("Helvetica", match ? "bold" : "normal");
+    doc.text(`${match ? '-> ' : ''}${label}`, 12, yPos);
+    doc.text(level, 70, yPos); doc.text(action, 130, yPos);
+    yPos += 5;
+  });
+
+  if (snapshot) {
+    doc.addImage(snapshot, 'JPEG', 10, at.snapshot, 90, 60);
+  } else {
+    doc.rect(10, at.snapshot, 90, 60); doc.setFontSize(8);
+    doc.text("[ Frame Snapshot ]", 55, at.snapshot + 30, { align: "center" });
+  }
+
+  let tableY = at.steps;
+  doc.setFont("Helvetica", "normal"); doc.setFontSize(8);
+  STEP_ROWS.forEach(([, joint, angle, score]) => {
+    let measured = r.angles[joint];
+    doc.text(`${measured ? measured.toFixed(1) : angle}°`, 158, tableY);
+    doc.text(`+${r.angles[joint + "_score"] || score}`, 185, tableY);
+    tableY += 6;
+  });
+  footer(doc, 1, total, "REBA Posture Risk Evaluation");
+}
+
+function layoutMmhPage(doc, r, diagram, total) {
+  doc.addPage();
+  let at = replayTemplate(doc, mmhTemplate(r.profile));
+  doc.setFont("Helvetica", "bold"); doc.setFontSize(10);
+  doc.text(`Operator: ${r.operator_id} | Evaluation Profile: ${r.profile}`, 105, 18, { align: "center" });
+
+  let yPos = at.summary;
+  doc.setFont("Helvetica", "normal"); doc.setFontSize(9);
+  doc.text(`Automatically Evaluated Zone: ${r.mmh_zone} (${r.mmh_reach})`, 12, yPos); yPos += 5;
+  doc.text(`Hand Detected Object: ${r.object}`, 12, yPos); yPos += 5;
+  doc.text(`Actual Weight Lifted: ${r.actual_wt.toFixed(1)} kg`, 12, yPos); yPos += 5;
+  doc.text(`Max Recommended Limit: ${r.max_limit.toFixed(1)} kg`, 12, yPos); yPos += 6;
+  doc.setFont("Helvetica", "bold");
+  let isSafe = r.actual_wt <= r.max_limit;
+  doc.text(`SAFETY STATUS: ${isSafe ? 'WITHIN SAFE ERGONOMIC LIMIT' : 'EXCEEDS SAFE ERGONOMIC LIMIT'}`, 12, yPos);
+
+  yPos = at.matrix;
+  doc.setFontSize(8);
+  matrixRows(r.profile).forEach(row => {
+    let isSelectedZone = row[0] === r.mmh_zone;
+    if (isSelectedZone) highlightRow(doc, yPos);
+    doc.setFont("Helvetica", isSelectedZone ? "bold" : "normal");
+    doc.text(`${isSelectedZone ? '-> ' : ''}${row[0]}`, 12, yPos);
+    doc.text(row[1], 90, yPos); doc.text(row[2], 150, yPos);
+    yPos += 5;
+  });
+
+  if (diagram) {
+    doc.addImage(diagram, 'JPEG', 10, at.diagram, 90, 65, "diagram");
+  } else {
+    doc.rect(10, at.diagram, 90, 65);
+    doc.setFont("Helvetica", "normal"); doc.setFontSize(8);
+    doc.text("[ recommended_weight.png ]", 55, at.diagram + 32, { align: "center" });
+  }
+  footer(doc, 2, total, "Recommended Weight Limits Matrix Standard");
+}
+
+function layoutNioshPage(doc, r, total) {
+  doc.addPage();
+  let at = replayTemplate(doc, nioshTemplate());
+  let n = r.niosh;
+  doc.setFont("Helvetica", "bold"); doc.setFontSize(10);
+  doc.text(`Operator: ${r.operator_id} | Peak Dynamic Spatial Evaluation`, 105, 18, { align: "center" });
+
+  let yPos = at.load;
+  doc.setFont("Helvetica", "normal"); doc.setFontSize(8);
+  doc.text(`Hand Detected Object: ${r.object}`, 12, yPos); yPos += 5;
+  doc.text(`Actual Object Weight: ${r.actual_wt.toFixed(1)} kg`, 12, yPos);
+
+  yPos = at.multipliers;
+  NIOSH_ROWS.forEach(([, key, unit, multiplier]) => {
+    let measured = key === null ? unit : key === "a_deg" ? `${n.a_deg} deg` : `${n[key].toFixed(1)} ${unit}`;
+    let factor = n[multiplier].toFixed(2);
+    // The measured lift rate and FM replace the assumed "Moderate" FM once lifts are segmented.
+    if (multiplier === "fm") {
+      if (r.lifts && r.lifts.lifts && r.lifts.fm !== null) {
+        measured = `${r.lifts.lifts_per_min} lifts/min`; factor = r.lifts.fm.toFixed(2);
+      } else {
+        measured = `${unit} (assumed)`;
+      }
+    }
+    doc.text(measured, 70, yPos); doc.text(factor, 120, yPos);
+    yPos += 5;
+  });
+
+  // The peak frame is scored at the default FM; measured lifts get theirs in the lifts line.
+  yPos = at.assessment;
+  doc.text(`Recommended Weight Limit (RWL, peak frame at default FM ${n.fm.toFixed(2)}): ${n.rwl.toFixed(2)} kg`, 12, yPos); yPos += 5;
+  doc.text(`Lifting Index (LI = Actual Weight / RWL, default FM): ${n.li.toFixed(2)}`, 12, yPos); yPos += 6;
+  doc.setFont("Helvetica", "bold");
+  doc.text(`NIOSH EVALUATION: ${n.status} (LI <= 1.0)`, 12, yPos); yPos += 6;
+  doc.setFont("Helvetica", "normal");
+  doc.text(r.lifts_line, 12, yPos);
+  footer(doc, 3, total, "NIOSH Lifting Equation Assessment Report");
+}
+
+function layoutKeyframesPage(doc, r, images, total) {
+  doc.addPage();
+  let at = replayTemplate(doc, keyframesTemplate());
+  doc.setFontSize(10);
+  doc.text(`Operator: ${r.operator_id} | ${images.length} highest-REBA moments, at least ${r.min_gap_s}s apart`, 105, 18, { align: "center" });
+
+  r.keyframes.forEach((k, i) => {
+    let x = 10 + (i % 2) * 95, y = at.grid + Math.floor(i / 2) * 62;
+    doc.addImage(images[i], 'JPEG', x, y, 60, 45);
+    doc.setFont("Helvetica", "bold"); doc.setFontSize(9);
+    doc.text(`#${i + 1}  REBA ${k.reba}`, x + 62, y + 4);
+    doc.setFont("Helvetica", "normal"); doc.setFontSize(7);
+    [`t = ${k.t_s} s`, `LI ${k.li}`, k.mmh_zone, k.object,
+     `Trunk ${k.trunk}°`, `Neck ${k.neck}°`, `Upper arm ${k.upper_arm}°`, `Wrist ${k.wrist}°`]
+      .forEach((line, j) => doc.text(String(line), x + 62, y + 9 + j * 4.5, { maxWidth: 31 }));
+  });
+  footer(doc, 4, total, "Worst-Posture Keyframes");
+}
+
+async function blobBytes(blob) {
+  return blob ? new Uint8Array(await blob.arrayBuffer()) : null;
+}
+
+// The report for one collected session as a PDF Blob.  ``diagram`` is the
+// cached JPEG bytes of the reference diagram (or null for the placeholder).
+async function buildReportPdf(jsPDF, r, diagram) {
+  let snapshot = await blobBytes(r.snapshot);
+  let images = await Promise.all(r.keyframes.map(k => blobBytes(k.blob)));
+  let total = images.length ? 4 : 3;
+  const doc = new jsPDF();
+  layoutRebaPage(doc, r, snapshot, total);
+  layoutMmhPage(doc, r, diagram, total);
+  layoutNioshPage(doc, r, total);
+  if (images.length) layoutKeyframesPage(doc, r, images, total);
+  return doc.output("blob");
+}
+
+// Fetch and decode the reference diagram once, re-encoded as JPEG on white so
+// every report embeds the same bytes without decoding the PNG again.
+async function loadDiagram(urls) {
+  for (const url of urls) {
+    try {
+      let response = await fetch(url);
+      if (!response.ok) continue;
+      let bitmap = await createImageBitmap(await response.blob());
+      let canvas = new OffscreenCanvas(bitmap.width, bitmap.height);
+      let ctx = canvas.getContext("2d");
+      ctx.fillStyle = "#fff";
+      ctx.fillRect(0, 0, canvas.width, canvas.height);
+      ctx.drawImage(bitmap, 0, 0);
+      bitmap.close();
+      return blobBytes(await canvas.convertToBlob({ type: "image/jpeg", quality: REPORT_DIAGRAM_QUALITY }));
+    } catch (e) {}
+  }
+  return null;
+}
+
+// --- REPORT QUEUE ---
+// Builds reports one after another in report_worker.js; falls back to the
+// main thread (same layout, same caches) if the worker cannot start.
+// ``onChange(pending)`` fires whenever the queue grows or shrinks.
+class ReportQueue {
+  constructor(options) {
+    this.jspdfUrl = options.jspdfUrl;
+    this.diagramUrls = options.diagramUrls;
+    this.onChange = options.onChange || (() => {});
+    this.worker = null;
+    this.jobs = new Map();
+    this.nextId = 0;
+    this.tail = Promise.resolve();
+    this.diagram = null;
+  }
+
+  get pending() {
+    return this.jobs.size;
+  }
+
+  // Queue a collected report; resolves with the PDF Blob.
+  enqueue(report) {
+    let id = ++this.nextId;
+    let job = new Promise((resolve, reject) => this.jobs.set(id, { resolve, reject, report }));
+    this.onChange(this.pending);
+    if (this._startWorker()) this.worker.postMessage({ type: "build", id, report });
+    else this._buildInline(id);
+    return job;
+  }
+
+  _startWorker() {
+    if (this.worker) return true;
+    if (this.worker === false || typeof Worker === "undefined" || typeof OffscreenCanvas === "undefined") return false;
+    try {
+      this.worker = new Worker("report_worker.js");
+    } catch (e) {
+      this.worker = false;
+      return false;
+    }
+    this.worker.onmessage = ({ data: msg }) => this._finish(msg.id, msg.blob, msg.error);
+    this.worker.onerror = event => {
+      // The worker died (e.g. jsPDF failed to load): rebuild what it held here.
+      event.preventDefault();
+      this.worker.terminate();
+      this.worker = false;
+      for (const id of this.jobs.keys()) this._buildInline(id);
+    };
+    this.worker.postMessage({ type: "init", jspdfUrl: this.jspdfUrl, diagramUrls: this.diagramUrls });
+    return true;
+  }
+
+  _buildInline(id) {
+    this.tail = this.tail.then(async () => {
+      let job = this.jobs.get(id);
+      if (!job) return;
+      try {
+        this.diagram = this.diagram || loadDiagram(this.diagramUrls);
+        this._finish(id, await buildReportPdf(window.jspdf.jsPDF, job.report, await this.diagram));
+      } catch (e) {
+        this._finish(id, null, String(e));
+      }
+    });
+  }
+
+  _finish(id, blob, error) {
+    let job = this.jobs.get(id);
+    if (!job) return;
+    this.jobs.delete(id);
+    this.onChange(this.pending);
+    if (blob) job.resolve(blob);
+    else job.reject(new Error(error || "report failed"));
+  }
+}
+
+if (typeof module !== "undefined") {
+  module.exports = { buildReportPdf, pageTemplate, ReportQueue, RISK_ROWS, MATRIX_ROWS };
+}
@@ -0,0 +1,26 @@
+// PDF report builds off the main thread.  Loads jsPDF and the shared layout
+// (report_builder.js) once, decodes the reference diagram on the first build
+// and keeps it for the page's lifetime, and builds queued reports strictly in
+// order so several operators' reports can be requested back-to-back.
+let diagramUrls = [];
+let diagram = null;
+let queue = Promise.resolve();
+
+self.onmessage = ({ data: msg }) => {
+  if (msg.type === "init") {
+    importScripts(msg.jspdfUrl, "report_builder.js");
+    diagramUrls = msg.diagramUrls;
+    return;
+  }
+  if (msg.type !== "build") return;
+  queue = queue.then(async () => {
+    let start = performance.now();
+    try {
+      diagram = diagram || loadDiagram(diagramUrls);
+      let blob = await buildReportPdf(self.jspdf.jsPDF, msg.report, await diagram);
+      self.postMessage({ type: "report", id: msg.id, blob: blob, build_ms: performance.now() - start });
+    } catch (e) {
+      self.postMessage({ type: "report", id: msg.id, error: String(e) });
+    }
+  });
+};
@@ -0,0 +1,355 @@
+// Pure REBA / NIOSH / MMH scoring shared by the live view, its workers and the
+// Node benchmark runner.  No DOM access: everything here is a function of its inputs.
+
+const NO_OBJECT = "No object detected";
+
+// --- OFFICIAL REBA LOOKUP TABLES ---
+const TABLE_A = [
+  [[1, 2, 3, 4], [2, 3, 4, 5], [2, 4, 5, 6]],
+  [[2, 3, 4, 5], [3, 4, 5, 6], [4, 5, 6, 7]],
+  [[2, 4, 5, 6], [4, 5, 6, 7], [5, 6, 7, 8]],
+  [[3, 5, 6, 7], [5, 6, 7, 8], [6, 7, 8, 9]],
+  [[4, 6, 7, 8], [6, 7, 8, 9], [7, 8, 9, 9]]
+];
+
+const TABLE_B = [
+  [[1, 2, 2], [1, 2, 3]],
+  [[1, 2, 3], [2, 3, 4]],
+  [[3, 4, 5], [4, 5, 5]],
+  [[4, 5, 5], [5, 6, 7]],
+  [[6, 7, 8], [7, 8, 8]],
+  [[7, 8, 8], [8, 9, 9]]
+];
+
+const TABLE_C = [
+  [1, 1, 1, 2, 3, 3, 4, 5, 6, 7, 7, 7],
+  [1, 2, 2, 3, 4, 4, 5, 6, 6, 7, 7, 8],
+  [2, 3, 3, 3, 4, 5, 6, 7, 7, 8, 8, 8],
+  [3, 4, 4, 4, 5, 6, 7, 8, 8, 9, 9, 9],
+  [4, 4, 5, 6, 7, 7, 8, 9, 9, 10, 10, 11],
+  [6, 6, 7, 8, 8, 9, 9, 10, 10, 11, 11, 11],
+  [7, 7, 8, 8, 9, 9, 10, 11, 11, 11, 12, 12],
+  [8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 12, 12],
+  [9, 9, 10, 10, 11, 11, 12, 12, 12, 12, 12, 12],
+  [10, 10, 11, 11, 11, 12, 12, 12, 12, 12, 12, 12],
+  [11, 11, 11, 12, 12, 12, 12, 12, 12, 12, 12, 12],
+  [12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12]
+];
+
+function calculateOfficialREBA(trunk, neck, legs, upperArm, lowerArm, wrist, loadKg, objectName) {
+  let t = Math.min(Math.max(trunk, 1), 5) - 1;
+  let n = Math.min(Math.max(neck, 1), 3) - 1;
+  let l = Math.min(Math.max(legs, 1), 4) - 1;
+
+  let u = Math.min(Math.max(upperArm, 1), 6) - 1;
+  let la = Math.min(Math.max(lowerArm, 1), 2) - 1;
+  let w = Math.min(Math.max(wrist, 1), 3) - 1;
+
+  let postureScoreA = TABLE_A[t][n][l];
+  let loadScore = loadKg < 5.0 ? 0 : loadKg <= 10.0 ? 1 : 2;
+  let scoreA = postureScoreA + loadScore;
+
+  let postureScoreB = TABLE_B[u][la][w];
+  let couplingScore = objectName !== "No object detected" ? 1 : 0;
+  let scoreB = postureScoreB + couplingScore;
+
+  let idxA = Math.min(Math.max(scoreA, 1), 12) - 1;
+  let idxB = Math.min(Math.max(scoreB, 1), 12) - 1;
+  let scoreC = TABLE_C[idxA][idxB];
+
+  let activityScore = 1;
+  let finalREBA = scoreC + activityScore;
+  return Math.min(Math.max(finalREBA, 1), 15);
+}
+
+// DYNAMIC MMH RECOMMENDED WEIGHT MATRIX LOOKUP FIX
+function getDynamicMmhLimit(profile, zone, reach) {
+  const limits = {
+    "Male": {
+      "Above Shoulder":    { "Close Reach": 10.0, "Far Reach": 5.0 },
+      "Shoulder to Elbow": { "Close Reach": 20.0, "Far Reach": 10.0 },
+      "Elbow to Knuckle":  { "Close Reach": 25.0, "Far Reach": 15.0 },
+      "Knuckle to Mid-Leg":{ "Close Reach": 20.0, "Far Reach": 10.0 },
+      "Below Mid-Leg":     { "Close Reach": 10.0, "Far Reach": 5.0 }
+    },
+    "Female": {
+      "Above Shoulder":    { "Close Reach": 7.0,  "Far Reach": 3.0 },
+      "Shoulder to Elbow": { "Close Reach": 13.0, "Far Reach": 7.0 },
+      "Elbow to Knuckle":  { "Close Reach": 16.0, "Far Reach": 10.0 },
+      "Knuckle to Mid-Leg":{ "Close Reach": 13.0, "Far Reach": 7.0 },
+      "Below Mid-Leg":     { "Close Reach": 7.0,  "Far Reach": 3.0 }
+    }
+  };
+  
+  let userProfile = limits[profile] || limits["Male"];
+  let zoneLimits = userProfile[zone] || userProfile["Shoulder to Elbow"];
+  return zoneLimits[reach] !== undefined ? zoneLimits[reach] : zoneLimits["Close Reach"];
+}
+
+function calcAngle(a, b, c) {
+  let radians = Math.atan2(c.y - b.y, c.x - b.x) - Math.atan2(a.y - b.y, a.x - b.x);
+  let angle = Math.abs(radians * 180.0 / Math.PI);
+  return angle > 180.0 ? 360.0 - angle : angle;
+}
+
+// --- BILATERAL 3D JOINT ANGLES ---
+const ANGLE_JOINTS = ["neck", "trunk", "legs", "upper_arm", "lower_arm", "wrist"];
+
+const RAD_TO_DEG = 180.0 / Math.PI;
+
+// arccos in degrees from a 7th-order polynomial (Abramowitz & Stegun 4.4.46,
+// |error| < 2e-8 rad): about twice as fast as Math.acos and far below
+// landmark noise.
+function acosDeg(x) {
+  let ax = x < 0 ? -x : x;
+  if (ax > 1) ax = 1;
+  let p = ((((((-0.0012624911 * ax + 0.0066700901) * ax - 0.0170881256) * ax + 0.0308918810) * ax
+    - 0.0501743046) * ax + 0.0889789874) * ax - 0.2145988016) * ax + 1.5707963050;
+  let r = Math.sqrt(1 - ax) * p;
+  return (x < 0 ? Math.PI - r : r) * RAD_TO_DEG;
+}
+
+// The 15 landmarks the joint angles use, packed as a flat Float32Array of
+// scaled [x, y, z]: the nose (0), then shoulder, elbow, wrist, index, hip,
+// knee and ankle on the left (11, 13, 15, 19, 23, 25, 27), then the same on
+// the right (every body landmark from 11 on has its mirror at +1).
+const ANGLE_BUFFER_LENGTH = 45;
+const ANGLE_SIDE_LEFT = 3;
+const ANGLE_SIDE_RIGHT = 24;
+// Joints whose wider angle is worse (neck, upper arm); for trunk, legs and
+// wrist the angle further from straight is worse.
+const ANGLE_WIDER_WORSE = new Uint8Array([1, 0, 0, 1, 0, 0]);
+const LOWER_ARM = 4;
+// Dot product and product of squared lengths of the two segments at each
+// joint of one side, as [dot, norm2] pairs in ANGLE_JOINTS order; reused so
+// the kernel allocates nothing.
+const sideL = new Float64Array(12);
+const sideR = new Float64Array(12);
+
+function packPoint(buf, o, p, sx, sy, sz) {
+  buf[o] = p.x * sx; buf[o + 1] = p.y * sy; buf[o + 2] = p.z * sz;
+}
+
+// Scale is (width, height, width) for image landmarks, (1, 1, 1) for world
+// landmarks.  The pose worker packs each frame before posting it, so the
+// main thread only runs jointAngles3D.  Unrolled: with constant indices the
+// copy costs about half as much as a loop over an index table.
+function packAngleLandmarks(lm, sx, sy, sz, buf = new Float32Array(ANGLE_BUFFER_LENGTH)) {
+  packPoint(buf, 0, lm[0], sx, sy, sz);
+  packPoint(buf, 3, lm[11], sx, sy, sz); packPoint(buf, 6, lm[13], sx, sy, sz);
+  packPoint(buf, 9, lm[15], sx, sy, sz); packPoint(buf, 12, lm[19], sx, sy, sz);
+  packPoint(buf, 15, lm[23], sx, sy, sz); packPoint(buf, 18, lm[25], sx, sy, sz);
+  packPoint(buf, 21, lm[27], sx, sy, sz);
+  packPoint(buf, 24, lm[12], sx, sy, sz); packPoint(buf, 27, lm[14], sx, sy, sz);
+  packPoint(buf, 30, lm[16], sx, sy, sz); packPoint(buf, 33, lm[20], sx, sy, sz);
+  packPoint(buf, 36, lm[24], sx, sy, sz); packPoint(buf, 39, lm[26], sx, sy, sz);
+  packPoint(buf, 42, lm[28], sx, sy, sz);
+  return buf;
+}
+
+// One side's six joints from the seven segments they share: shoulder to nose,
+// shoulder to hip, hip to knee, knee to ankle, shoulder to elbow, elbow to
+// wrist and wrist to index.  A joint whose segments run through it (trunk,
+// legs, lower arm, wrist) negates their dot product.
+function angleTerms(b, o, t) {
+  let shx = b[o], shy = b[o + 1], shz = b[o + 2];
+  let ex = b[o + 3], ey = b[o + 4], ez = b[o + 5];
+  let wx = b[o + 6], wy = b[o + 7], wz = b[o + 8];
+  let hx = b[o + 12], hy = b[o + 13], hz = b[o + 14];
+  let kx = b[o + 15], ky = b[o + 16], kz = b[o + 17];
+  let nx = b[0] - shx, ny = b[1] - shy, nz = b[2] - shz;
+  let tx = hx - shx, ty = hy - shy, tz = hz - shz;
+  let thx = kx - hx, thy = ky - hy, thz = kz - hz;
+  let sx = b[o + 18] - kx, sy = b[o + 19] - ky, sz = b[o + 20] - kz;
+  let ux = ex - shx, uy = ey - shy, uz = ez - shz;
+  let fx = wx - ex, fy = wy - ey, fz = wz - ez;
+  let hdx = b[o + 9] - wx, hdy = b[o + 10] - wy, hdz = b[o + 11] - wz;
+  let torso = tx * tx + ty * ty + tz * tz, thigh = thx * thx + thy * thy + thz * thz;
+  let upper = ux * ux + uy * uy + uz * uz, fore = fx * fx + fy * fy + fz * fz;
+  t[0] = nx * tx + ny * ty + nz * tz;       t[1] = (nx * nx + ny * ny + nz * nz) * torso;
+  t[2] = -(tx * thx + ty * thy + tz * thz); t[3] = torso * thigh;
+  t[4] = -(thx * sx + thy * sy + thz * sz); t[5] = thigh * (sx * sx + sy * sy + sz * sz);
+  t[6] = tx * ux + ty * uy + tz * uz;       t[7] = torso * upper;
+  t[8] = -(ux * fx + uy * fy + uz * fz);    t[9] = upper * fore;
+  t[10] = -(fx * hdx + fy * hdy + fz * hdz); t[11] = fore * (hdx * hdx + hdy * hdy + hdz * hdz);
+}
+
+function angleFromTerms(dot, norm2) {
+  let norm = Math.sqrt(norm2);
+  return acosDeg(dot / (norm > 1e-12 ? norm : 1e-12));
+}
+
+// All twelve REBA joint angles (both sides) in 3D in one pass over a
+// packAngleLandmarks buffer, writing the worse side of each joint into `out`
+// (ANGLE_JOINTS order).  Sides are compared on cos * |cos| cross-multiplied
+// by the other side's squared lengths, so only the chosen side pays for a
+// square root and an arccos; the lower arm, worse further from its 60-100
+// degree band, needs both angles.  Ties keep the left side.  Matches
+// reba_engine.joint_angles_3d.
+function jointAngles3D(buf, out = new Float64Array(6)) {
+  angleTerms(buf, ANGLE_SIDE_LEFT, sideL);
+  angleTerms(buf, ANGLE_SIDE_RIGHT, sideR);
+  for (let j = 0, k = 0; j < 6; j++, k += 2) {
+    let dl = sideL[k], nl = sideL[k + 1], dr = sideR[k], nr = sideR[k + 1];
+    if (j === LOWER_ARM) {
+      let al = angleFromTerms(dl, nl), ar = angleFromTerms(dr, nr);
+      out[j] = Math.abs(ar - 80) > Math.abs(al - 80) ? ar : al;
+      continue;
+    }
+    let keyL = dl * Math.abs(dl) * nr, keyR = dr * Math.abs(dr) * nl;
+    let right = ANGLE_WIDER_WORSE[j] ? keyR < keyL : keyR > keyL;
+    out[j] = right ? angleFromTerms(dr, nr) : angleFromTerms(dl, nl);
+  }
+  return out;
+}
+
+function isHandNearBox(handX, handY, bbox, threshold = 60) {
+  let [x, y, width, height] = bbox;
+  return (
+    handX >= (x - threshold) &&
+    handX <= (x + width + threshold) &&
+    handY >= (y - threshold) &&
+    handY <= (y + height + threshold)
+  );
+}
+
+// --- WRIST-CENTRED DETECTION REGIONS ---
+// A held object has to come within isHandNearBox's 60 px of a wrist, so the
+// detector only needs to see a square around each visible wrist, sized from
+// the forearm so it scales with distance to the camera.  Overlapping squares
+// (hands together, e.g. carrying a box) merge into one region.
+const ROI_MIN_HALF_PX = 80;
+const ROI_MAX_HALF_PX = 200;
+const ROI_FOREARM_SCALE = 1.5;
+const ROI_MIN_VISIBILITY = 0.5;
+
+function wristRois(lm, width, height) {
+  let rois = [];
+  [[15, 13], [16, 14]].forEach(([w, e]) => {
+    let wrist = lm[w], elbow = lm[e];
+    if (!wrist || (wrist.visibility !== undefined && wrist.visibility < ROI_MIN_VISIBILITY)) return;
+    let x = wrist.x * width, y = wrist.y * height;
+    if (x < 0 || y < 0 || x >= width || y >= height) return;
+    let forearm = elbow ? Math.hypot(x - elbow.x * width, y - elbow.y * height) : 0;
+    let half = Math.min(ROI_MAX_HALF_PX, Math.max(ROI_MIN_HALF_PX, ROI_FOREARM_SCALE * forearm));
+    let x0 = Math.max(0, Math.floor(x - half)), y0 = Math.max(0, Math.floor(y - half));
+    let x1 = Math.min(width, Math.ceil(x + half)), y1 = Math.min(height, Math.ceil(y + half));
+    rois.push([x0, y0, x1 - x0, y1 - y0]);
+  });
+  if (rois.length === 2) {
+    let [a, b] = rois;
+    if (a[0] < b[0] + b[2] && b[0] < a[0] + a[2] && a[1] < b[1] + b[3] && b[1] < a[1] + a[3]) {
+      let x0 = Math.min(a[0], b[0]), y0 = Math.min(a[1], b[1]);
+      rois = [[x0, y0, Math.max(a[0] + a[2], b[0] + b[2]) - x0, Math.max(a[1] + a[3], b[1] + b[3]) - y0]];
+    }
+  }
+  return rois;
+}
+
+// A box detected inside a region drawn at `scale` (tile px per frame px) back
+// in frame pixels.
+function roiBoxToFrame(bbox, roi, scale) {
+  return [roi[0] + bbox[0] / scale, roi[1] + bbox[1] / scale, bbox[2] / scale, bbox[3] / scale];
+}
+
+function mmhZoneFor(lm) {
+  let wristY = (lm[15].y + lm[16].y) / 2.0;
+  if (wristY < lm[11].y) return "Above Shoulder";
+  if (wristY < lm[13].y) return "Shoulder to Elbow";
+  if (wristY < lm[23].y) return "Elbow to Knuckle";
+  if (wristY < lm[25].y) return "Knuckle to Mid-Leg";
+  return "Below Mid-Leg";
+}
+
+// NIOSH lifting equation multipliers from the frame's spatial geometry.
+function nioshFor(lm, width, height, angTrunk, actualWeight, objectName, initialWristV) {
+  let nose = lm[0], ankle = lm[27];
+  let bodyPixelHeight = Math.hypot(nose.x - ankle.x, nose.y - ankle.y) * height;
+  let scaleFactor = 170.0 / Math.max(100.0, bodyPixelHeight); // cm per pixel
+
+  let avgWristY = (lm[15].y + lm[16].y) / 2.0;
+  let avgAnkleY = (lm[27].y + lm[28].y) / 2.0;
+  let avgAnkleX = (lm[27].x + lm[28].x) / 2.0;
+  let avgWristX = (lm[15].x + lm[16].x) / 2.0;
+
+  // 1. Horizontal Distance H (cm)
+  let hPixel = Math.hypot(avgWristX - avgAnkleX, avgWristY - avgAnkleY) * width;
+  let H_cm = Math.max(25.0, hPixel * scaleFactor);
+  let HM = Math.min(1.0, 25.0 / H_cm);
+
+  // 2. Vertical Height V (cm)
+  let vPixel = Math.abs(avgAnkleY - avgWristY) * height;
+  let V_cm = Math.max(0.0, vPixel * scaleFactor);
+  let VM = Math.max(0.0, 1.0 - (0.0033 * Math.abs(V_cm - 75.0)));
+
+  // 3. Travel Distance D (cm)
+  let D_cm = Math.max(25.0, Math.abs(V_cm - (initialWristV || V_cm)));
+  let DM = Math.min(1.0, 0.82 + (4.5 / D_cm));
+
+  // 4. Asymmetric Angle A (degrees)
+  let trunkDev = Math.abs(180 - angTrunk);
+  let AM = Math.max(0.0, 1.0 - (0.0032 * trunkDev));
+
+  // 5. Multipliers (Frequency & Coupling)
+  let FM = 0.95;
+  let CM = objectName !== NO_OBJECT ? 1.00 : 0.95;
+
+  let RWL = 23.0 * HM * VM * DM * AM * FM * CM;
+  let LI = actualWeight / Math.max(0.1, RWL);
+  let status = LI <= 1.0 ? "SAFE" : "HIGH RISK";
+
+  return { rwl: RWL, li: LI, status: status, am: AM, hm: HM, vm: VM, dm: DM, fm: FM, cm: CM, h_cm: H_cm, v_cm: V_cm, d_cm: D_cm, a_deg: trunkDev.toFixed(1) };
+}
+
+// Scores one frame of pose landmarks.  `initialWristV` is the NIOSH travel
+// baseline (null until the session records its first frame).  `angles`, when
+// given, holds precomputed joint angles in ANGLE_JOINTS order (jointAngles3D);
+// otherwise the left-side 2D angles are used.
+function scoreFrame(lm, width, height, actualWeight, objectName, initialWristV, angles = null) {
+  let angNeck, angTrunk, angLegs, angUArm, angLArm, angWrist;
+  if (angles) {
+    angNeck = angles[0]; angTrunk = angles[1]; angLegs = angles[2];
+    angUArm = angles[3]; angLArm = angles[4]; angWrist = angles[5];
+  } else {
+    let shld = lm[11], hip = lm[23], elbw = lm[13], nose = lm[0];
+    let wrist = lm[15], index = lm[19], knee = lm[25], ankle = lm[27];
+    angTrunk = calcAngle(shld, hip, knee);
+    angNeck = calcAngle(nose, shld, hip);
+    angUArm = calcAngle(hip, shld, elbw);
+    angLArm = calcAngle(shld, elbw, wrist);
+    angLegs = calcAngle(hip, knee, ankle);
+    angWrist = calcAngle(elbw, wrist, index);
+  }
+
+  let tScore = Math.abs(180 - angTrunk) <= 5 ? 1 : Math.abs(180 - angTrunk) <= 20 ? 2 : 3;
+  let nScore = angNeck <= 20 ? 1 : 2;
+  let aScore = angUArm <= 20 ? 1 : angUArm <= 45 ? 2 : 3;
+  let laScore = (angLArm >= 60 && angLArm <= 100) ? 1 : 2;
+  let lScore = Math.abs(180 - angLegs) <= 30 ? 1 : 2;
+  let wScore = Math.abs(180 - angWrist) <= 15 ? 1 : 2;
+
+  let totalReba = calculateOfficialREBA(tScore, nScore, lScore, aScore, laScore, wScore, actualWeight, objectName);
+
+  let niosh = nioshFor(lm, width, height, angTrunk, actualWeight, objectName, initialWristV);
+
+  return {
+    neck: angNeck, neck_score: nScore,
+    trunk: angTrunk, trunk_score: tScore,
+    legs: angLegs, legs_score: lScore,
+    upper_arm: angUArm, upper_arm_score: aScore,
+    lower_arm: angLArm, lower_arm_score: laScore,
+    wrist: angWrist, wrist_score: wScore,
+    reba: totalReba,
+    niosh: niosh,
+    mmhZone: mmhZoneFor(lm),
+    mmhReach: niosh.h_cm > 40.0 ? "Far Reach" : "Close Reach"
+  };
+}
+
+if (typeof module !== "undefined") {
+  module.exports = {
+    NO_OBJECT, TABLE_A, TABLE_B, TABLE_C,
+    calculateOfficialREBA, getDynamicMmhLimit, calcAngle, isHandNearBox, mmhZoneFor, nioshFor, scoreFrame,
+    ANGLE_JOINTS, ANGLE_BUFFER_LENGTH, packAngleLandmarks, jointAngles3D, wristRois, roiBoxToFrame
+  };
+}
@@ -0,0 +1,21 @@
+// Minimal Streamlit custom-component protocol, so the frontend needs no build step.
+const Streamlit = (() => {
+  const renderListeners = [];
+
+  function send(type, data) {
+    window.parent.postMessage({ isStreamlitMessage: true, type: type, ...data }, "*");
+  }
+
+  window.addEventListener("message", event => {
+    if (event.data && event.data.type === "streamlit:render") {
+      renderListeners.forEach(fn => fn(event.data.args || {}));
+    }
+  });
+
+  return {
+    onRender: fn => renderListeners.push(fn),
+    setComponentReady: () => send("streamlit:componentReady", { apiVersion: 1 }),
+    setFrameHeight: height => send("streamlit:setFrameHeight", { height: height === undefined ? document.body.scrollHeight : height }),
+    setComponentValue: value => send("streamlit:setComponentValue", { value: value, dataType: "json" })
+  };
+})();
@@ -0,0 +1,28 @@
+// Cache-first service worker for the offline bundle and the version-pinned CDN
+// assets: after the first load every script, WASM file and model shard is
+// served from Cache Storage without touching the network.
+const CACHE_NAME = "reba-assets-v1";
+const CACHEABLE_PREFIXES = [
+  "https://cdn.jsdelivr.net/npm/",
+  "https://cdnjs.cloudflare.com/ajax/libs/",
+  "https://storage.googleapis.com/tfjs-models/",
+  "https://storage.googleapis.com/mediapipe-models/"
+];
+
+function isCacheable(url) {
+  return url.includes("/vendor/") || CACHEABLE_PREFIXES.some(prefix => url.startsWith(prefix));
+}
+
+self.addEventListener("install", event => self.skipWaiting());
+self.addEventListener("activate", event => event.waitUntil(self.clients.claim()));
+
+self.addEventListener("fetch", event => {
+  if (event.request.method !== "GET" || !isCacheable(event.request.url)) return;
+  event.respondWith(caches.open(CACHE_NAME).then(async cache => {
+    const hit = await cache.match(event.request);
+    if (hit) return hit;
+    const response = await fetch(event.request);
+    if (response.ok || response.type === "opaque") cache.put(event.request, response.clone());
+    return response;
+  }));
+});
@@ -0,0 +1,221 @@
+// Per-frame session telemetry.  Frames are written into fixed-size column
+// buffers that are reused for every chunk; full chunks are gzip-compressed and
+// handed to Python (telemetry.py), so browser memory stays flat on long shifts.
+// A column is [name, dtype code, ArrayType, values per frame (default 1)].
+const TELEMETRY_CHUNK_FRAMES = 256;
+const TELEMETRY_MAX_PENDING = 16;
+const TELEMETRY_COLUMNS = [
+  ["t_ms", "f8", Float64Array],
+  ["trunk", "f4", Float32Array], ["neck", "f4", Float32Array], ["legs", "f4", Float32Array],
+  ["upper_arm", "f4", Float32Array], ["lower_arm", "f4", Float32Array], ["wrist", "f4", Float32Array],
+  ["trunk_score", "u1", Uint8Array], ["neck_score", "u1", Uint8Array], ["legs_score", "u1", Uint8Array],
+  ["upper_arm_score", "u1", Uint8Array], ["lower_arm_score", "u1", Uint8Array], ["wrist_score", "u1", Uint8Array],
+  ["reba", "u1", Uint8Array], ["rwl", "f4", Float32Array], ["li", "f4", Float32Array],
+  ["mmh_zone", "u1", Uint8Array], ["mmh_reach", "u1", Uint8Array], ["object", "u1", Uint8Array]
+];
+const MMH_ZONE_INDEX = ["Above Shoulder", "Shoulder to Elbow", "Elbow to Knuckle", "Knuckle to Mid-Leg", "Below Mid-Leg"];
+
+function bytesToBase64(bytes) {
+  let binary = "";
+  for (let i = 0; i < bytes.length; i += 0x8000) {
+    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+  }
+  return btoa(binary);
+}
+
+async function gzipBytes(bytes) {
+  if (typeof CompressionStream === "undefined") return { encoding: "raw", bytes: bytes };
+  const stream = new Blob([bytes]).stream().pipeThrough(new CompressionStream("gzip"));
+  return { encoding: "gzip", bytes: new Uint8Array(await new Response(stream).arrayBuffer()) };
+}
+
+// float32 -> IEEE half bits (round to nearest), for "f2" columns.
+const halfF32 = new Float32Array(1);
+const halfU32 = new Uint32Array(halfF32.buffer);
+
+function toHalf(value) {
+  halfF32[0] = value;
+  let x = halfU32[0];
+  let sign = (x >>> 16) & 0x8000;
+  let exp = (x >>> 23) & 0xff;
+  let mant = x & 0x7fffff;
+  if (exp === 0xff) return sign | 0x7c00 | (mant ? 0x200 : 0);
+  let e = exp - 112;
+  if (e >= 31) return sign | 0x7c00;
+  if (e <= 0) {
+    if (e < -10) return sign;
+    mant |= 0x800000;
+    let shift = 14 - e;
+    let half = mant >>> shift;
+    let rest = mant & ((1 << shift) - 1), mid = 1 << (shift - 1);
+    if (rest > mid || (rest === mid && (half & 1))) half++;
+    return sign | half;
+  }
+  let half = sign | (e << 10) | (mant >>> 13);
+  let rest = mant & 0x1fff;
+  if (rest > 0x1000 || (rest === 0x1000 && (half & 1))) half++;
+  return half;
+}
+
+class TelemetryRecorder {
+  constructor(columns = TELEMETRY_COLUMNS, chunkFrames = TELEMETRY_CHUNK_FRAMES, kind = "telemetry") {
+    this.columns = columns;
+    this.chunkFrames = chunkFrames;
+    this.kind = kind;
+    this.buffers = columns.map(([name, code, ArrayType, width = 1]) => new ArrayType(chunkFrames * width));
+    this.sessionId = null;
+    this.length = 0;
+    this.chunkSeq = 0;
+    this.dropped = 0;
+    this.pending = Promise.resolve();
+  }
+
+  start(sessionId) {
+    this.sessionId = sessionId;
+    this.length = 0;
+    this.chunkSeq = 0;
+    this.dropped = 0;
+  }
+
+  push(row) {
+    if (this.sessionId === null) return;
+    for (let i = 0; i < this.columns.length; i++) this.buffers[i][this.length] = row[this.columns[i][0]];
+    if (++this.length === this.chunkFrames) this.flush();
+  }
+
+  flush() {
+    if (this.length === 0) return;
+    const n = this.length;
+    let size = 0;
+    this.buffers.forEach((buf, i) => { size += n * (this.columns[i][3] || 1) * buf.BYTES_PER_ELEMENT; });
+    const packed = new Uint8Array(size);
+    let offset = 0;
+    this.buffers.forEach((buf, i) => {
+      let bytes = n * (this.columns[i][3] || 1) * buf.BYTES_PER_ELEMENT;
+      packed.set(new Uint8Array(buf.buffer, 0, bytes), offset);
+      offset += bytes;
+    });
+    this.length = 0;
+
+    const header = {
+      ...this.header(),
+      session_id: this.sessionId,
+      chunk: this.chunkSeq++,
+      frames: n,
+      columns: this.columns.map(([name, code, ArrayType, width = 1]) => [name, code, width])
+    };
+    // Chained so chunks reach Python in order even though compression is async.
+    this.pending = this.pending.then(() => gzipBytes(packed)).then(({ encoding, bytes }) => {
+      // Python may be slow to acknowledge; never let pending chunks pile up.
+      let pending = outbox.filter(e => e.kind === this.kind);
+      if (pending.length >= TELEMETRY_MAX_PENDING) {
+        outbox = outbox.filter(e => e !== pending[0]);
+        this.dropped++;
+      }
+      postEvent(this.kind, { ...header, encoding: encoding, dropped: this.dropped, data: bytesToBase64(bytes) });
+    });
+  }
+
+  // Extra chunk header fields.
+  header() {
+    return {};
+  }
+
+  stop() {
+    this.flush();
+    this.sessionId = null;
+  }
+}
+
+// Raw inputs of the scoring, for re-scoring a session offline with other
+// thresholds (replay.py): per frame the pose landmarks (x, y, z, visibility)
+// and world landmarks as float16, plus the raw detections that arrived since
+// the previous frame, before any score cut-off.  Detection classes are
+// indices into a per-session name list sent with every chunk.  Image x / y
+// are stored relative to the frame centre, where float16 is several times
+// finer than around 1.0.
+const RECORDER_LANDMARKS = 33;
+const RECORDER_CENTRE = 0.5;
+const RECORDER_DET_SLOTS = 6;
+const LANDMARK_COLUMNS = [
+  ["t_ms", "f8", Float64Array],
+  ["landmarks", "f2", Uint16Array, RECORDER_LANDMARKS * 4],
+  ["world", "f2", Uint16Array, RECORDER_LANDMARKS * 3],
+  ["det_t_ms", "f8", Float64Array],
+  ["det_n", "u1", Uint8Array],
+  ["det_class", "u1", Uint8Array, RECORDER_DET_SLOTS],
+  ["det_score", "f2", Uint16Array, RECORDER_DET_SLOTS],
+  ["det_bbox", "f2", Uint16Array, RECORDER_DET_SLOTS * 4]
+];
+const HALF_NAN = 0x7e00;
+
+class LandmarkRecorder extends TelemetryRecorder {
+  constructor(chunkFrames = TELEMETRY_CHUNK_FRAMES) {
+    super(LANDMARK_COLUMNS, chunkFrames, "landmarks");
+    this.cols = {};
+    LANDMARK_COLUMNS.forEach(([name], i) => { this.cols[name] = this.buffers[i]; });
+    this.classes = [];
+    this.pendingDetections = null;
+    this.settings = {};
+  }
+
+  // settings: frame size and the scoring inputs that are not per frame.
+  start(sessionId, settings = {}) {
+    super.start(sessionId);
+    this.classes = [];
+    this.pendingDetections = null;
+    this.settings = settings;
+  }
+
+  header() {
+    return { classes: this.classes, ...this.settings };
+  }
+
+  noteDetections(predictions, tMs) {
+    if (this.sessionId !== null) this.pendingDetections = { predictions: predictions, t_ms: tMs };
+  }
+
+  pushFrame(tMs, lm, worldLm) {
+    if (this.sessionId === null) return;
+    let i = this.length, c = this.cols;
+    c.t_ms[i] = tMs;
+    let base = i * RECORDER_LANDMARKS * 4;
+    for (let k = 0; k < RECORDER_LANDMARKS; k++) {
+      let p = lm[k], o = base + k * 4;
+      c.landmarks[o] = toHalf(p.x - RECORDER_CENTRE);
+      c.landmarks[o + 1] = toHalf(p.y - RECORDER_CENTRE);
+      c.landmarks[o + 2] = toHalf(p.z || 0);
+      c.landmarks[o + 3] = toHalf(p.visibility ?? 1);
+    }
+    base = i * RECORDER_LANDMARKS * 3;
+    for (let k = 0; k < RECORDER_LANDMARKS; k++) {
+      let p = worldLm ? worldLm[k] : null, o = base + k * 3;
+      c.world[o] = p ? toHalf(p.x) : HALF_NAN;
+      c.world[o + 1] = p ? toHalf(p.y) : HALF_NAN;
+      c.world[o + 2] = p ? toHalf(p.z) : HALF_NAN;
+    }
+
+    let det = this.pendingDetections;
+    this.pendingDetections = null;
+    let n = det ? Math.min(det.predictions.length, RECORDER_DET_SLOTS) : 0;
+    c.det_t_ms[i] = det ? det.t_ms : NaN;
+    c.det_n[i] = n;
+    for (let k = 0; k < RECORDER_DET_SLOTS; k++) {
+      let slot = i * RECORDER_DET_SLOTS + k;
+      let pred = k < n ? det.predictions[k] : null;
+      c.det_class[slot] = pred ? this.classIndex(pred.class) : 0;
+      c.det_score[slot] = pred ? toHalf(pred.score) : 0;
+      for (let j = 0; j < 4; j++) c.det_bbox[slot * 4 + j] = pred ? toHalf(pred.bbox[j]) : 0;
+    }
+    if (++this.length === this.chunkFrames) this.flush();
+  }
+
+  classIndex(name) {
+    let k = this.classes.indexOf(name);
+    if (k < 0) {
+      k = this.classes.length;
+      this.classes.push(name);
+    }
+    return k;
+  }
+}
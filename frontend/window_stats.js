@@ -0,0 +1,166 @@
+// Incremental sliding-window statistics over time-stamped samples.  Every
+// structure is a preallocated ring buffer, so a push is O(1) amortised with no
+// allocation: running sum for the mean, monotonic deques for max / min, and a
+// fixed-bin histogram for percentiles.
+class RingDeque {
+  constructor(capacity) {
+    this.buf = new Int32Array(capacity);
+    this.head = 0;
+    this.size = 0;
+  }
+  get length() { return this.size; }
+  front() { return this.buf[this.head]; }
+  back() { return this.buf[(this.head + this.size - 1) % this.buf.length]; }
+  pushBack(v) { this.buf[(this.head + this.size++) % this.buf.length] = v; }
+  popFront() { this.head = (this.head + 1) % this.buf.length; this.size--; }
+  popBack() { this.size--; }
+  clear() { this.head = 0; this.size = 0; }
+}
+
+// Highest frame rate a window keeps every sample of; its buffers hold
+// windowMs * MAX_FPS / 1000 samples, beyond which the oldest are dropped.
+const MAX_FPS = 120;
+
+class SlidingWindow {
+  // `bins` maps values onto [0, bins.count) for percentiles; a value is
+  // recovered as bins.lo + (bin + 0.5) * bins.width (integers: width 1, lo -0.5).
+  constructor(windowMs, { capacity = Math.ceil(windowMs / 1000 * MAX_FPS) + 1, bins = { lo: 0, width: 1, count: 16 } } = {}) {
+    this.windowMs = windowMs;
+    this.capacity = capacity;
+    this.bins = bins;
+    this.t = new Float64Array(capacity);
+    this.v = new Float64Array(capacity);
+    this.bin = new Uint16Array(capacity);
+    this.hist = new Uint32Array(bins.count);
+    this.maxQ = new RingDeque(capacity);
+    this.minQ = new RingDeque(capacity);
+    this.reset();
+  }
+
+  reset() {
+    this.start = 0;   // absolute sample index of the oldest sample in the window
+    this.end = 0;     // absolute index one past the newest sample
+    this.sum = 0;
+    this.hist.fill(0);
+    this.maxQ.clear();
+    this.minQ.clear();
+  }
+
+  get count() { return this.end - this.start; }
+
+  _slot(i) { return i % this.capacity; }
+
+  _evictOldest() {
+    let s = this._slot(this.start);
+    this.sum -= this.v[s];
+    this.hist[this.bin[s]]--;
+    if (this.maxQ.length && this.maxQ.front() === this.start) this.maxQ.popFront();
+    if (this.minQ.length && this.minQ.front() === this.start) this.minQ.popFront();
+    this.start++;
+  }
+
+  push(tMs, value) {
+    while (this.count > 0 && tMs - this.t[this._slot(this.start)] > this.windowMs) this._evictOldest();
+    if (this.count === this.capacity) this._evictOldest();
+
+    let i = this.end++, s = this._slot(i);
+    let b = Math.floor((value - this.bins.lo) / this.bins.width);
+    this.t[s] = tMs;
+    this.v[s] = value;
+    this.bin[s] = Math.min(Math.max(b, 0), this.bins.count - 1);
+    this.sum += value;
+    this.hist[this.bin[s]]++;
+    while (this.maxQ.length && this.v[this._slot(this.maxQ.back())] <= value) this.maxQ.popBack();
+    this.maxQ.pushBack(i);
+    while (this.minQ.length && this.v[this._slot(this.minQ.back())] >= value) this.minQ.popBack();
+    this.minQ.pushBack(i);
+  }
+
+  // Time covered by the samples in the window.
+  get spanMs() { return this.count ? this.t[this._slot(this.end - 1)] - this.t[this._slot(this.start)] : 0; }
+  get mean() { return this.count ? this.sum / this.count : 0; }
+  get max() { return this.count ? this.v[this._slot(this.maxQ.front())] : 0; }
+  get min() { return this.count ? this.v[this._slot(this.minQ.front())] : 0; }
+
+  percentile(q) {
+    if (this.count === 0) return 0;
+    let target = Math.max(1, Math.ceil(q * this.count)), seen = 0;
+    for (let b = 0; b < this.bins.count; b++) {
+      seen += this.hist[b];
+      if (seen >= target) return Math.min(this.bins.lo + (b + 0.5) * this.bins.width, this.max);
+    }
+    return this.max;
+  }
+}
+
+const REBA_BINS = { lo: -0.5, width: 1, count: 16 };
+const LI_BINS = { lo: 0, width: 0.05, count: 200 };
+// A held window counts once its samples span this share of the sustain time.
+const SUSTAIN_COVERAGE = 0.9;
+// Longest time between frames that a held window bridges; longer gaps (lost
+// tracking, a paused camera) restart it, as nothing is known about the posture.
+const MAX_GAP_MS = 500;
+
+// Rolling REBA / LI statistics plus the sustained level: the worst value held
+// for at least `sustainMs` (the minimum over a window of that length), with a
+// peak that only moves when that sustained value strictly improves.
+class PostureWindows {
+  constructor(rollingMs = 10000, sustainMs = 3000) {
+    this.configure(rollingMs, sustainMs);
+    this.reset();
+  }
+
+  // New window lengths start empty windows but keep the session's sustained peak.
+  configure(rollingMs, sustainMs) {
+    this.rollingMs = rollingMs;
+    this.sustainMs = sustainMs;
+    this.rebaRolling = new SlidingWindow(rollingMs, { bins: REBA_BINS });
+    this.liRolling = new SlidingWindow(rollingMs, { bins: LI_BINS });
+    this.rebaHeld = new SlidingWindow(sustainMs, { bins: REBA_BINS });
+    this.liHeld = new SlidingWindow(sustainMs, { bins: LI_BINS });
+    this.lastMs = null;
+  }
+
+  reset() {
+    [this.rebaRolling, this.liRolling, this.rebaHeld, this.liHeld].forEach(w => w.reset());
+    this.lastMs = null;
+    this.sustainedReba = null;
+    this.sustainedLi = null;
+    this.sustainedRebaAtMs = null;
+  }
+
+  // Returns true when the sustained REBA peak improved on this frame.
+  push(tMs, reba, li) {
+    if (this.lastMs !== null && tMs - this.lastMs > MAX_GAP_MS) {
+      this.rebaHeld.reset();
+      this.liHeld.reset();
+    }
+    this.lastMs = tMs;
+    this.rebaRolling.push(tMs, reba);
+    this.liRolling.push(tMs, li);
+    this.rebaHeld.push(tMs, reba);
+    this.liHeld.push(tMs, li);
+    if (this.rebaHeld.spanMs < SUSTAIN_COVERAGE * this.sustainMs) return false;
+
+    let heldLi = this.liHeld.min;
+    if (this.sustainedLi === null || heldLi > this.sustainedLi) this.sustainedLi = heldLi;
+    let heldReba = this.rebaHeld.min;
+    if (this.sustainedReba === null || heldReba > this.sustainedReba) {
+      this.sustainedReba = heldReba;
+      this.sustainedRebaAtMs = tMs;
+      return true;
+    }
+    return false;
+  }
+
+  rolling() {
+    return {
+      reba_mean: this.rebaRolling.mean, reba_max: this.rebaRolling.max, reba_p95: this.rebaRolling.percentile(0.95),
+      li_mean: this.liRolling.mean, li_max: this.liRolling.max, li_p95: this.liRolling.percentile(0.95)
+    };
+  }
+}
+
+if (typeof module !== "undefined") {
+  module.exports = { RingDeque, SlidingWindow, PostureWindows, REBA_BINS, LI_BINS, SUSTAIN_COVERAGE, MAX_GAP_MS, MAX_FPS };
+}
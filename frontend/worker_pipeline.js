@@ -0,0 +1,120 @@
+// Worker inference pipeline.  The main thread only grabs camera frames as
+// ImageBitmaps (transferred, not copied), keeps at most one frame in flight
+// per worker, dropping newer frames rather than queueing them, and handles the
+// small result messages: landmarks from the pose worker, which also renders
+// into the transferred OffscreenCanvas, and predictions from the detection
+// worker.
+const PIPELINE_MODES = ["main", "worker"];
+
+class WorkerPipeline {
+  constructor({ video, canvas, onPose, onDetections, onReady }) {
+    this.video = video;
+    this.canvas = canvas;
+    this.onPose = onPose;
+    this.onDetections = onDetections;
+    this.onReady = onReady;
+    this.poseReady = false;
+    this.detectReady = false;
+    this.poseBusy = false;
+    this.detectBusy = false;
+    this.frameId = 0;
+    this.poseSentAt = 0;
+    this.detectSentAt = 0;
+    this.droppedFrames = 0;
+    this.pendingSnapshots = new Map();
+  }
+
+  start({ visionUrl, wasmUrl, modelUrls, modelComplexity, detectorScripts, detectorOptions }) {
+    let offscreen = this.canvas.transferControlToOffscreen();
+    this.poseWorker = new Worker("pose_worker.js");
+    this.poseWorker.onmessage = ({ data }) => this._onPoseMessage(data);
+    this.poseWorker.postMessage({ type: "init", canvas: offscreen, visionUrl, wasmUrl, modelUrls, modelComplexity }, [offscreen]);
+
+    this.detectWorker = new Worker("detect_worker.js");
+    this.detectWorker.onmessage = ({ data }) => this._onDetectMessage(data);
+    this.detectWorker.postMessage({ type: "init", scripts: detectorScripts, options: detectorOptions });
+  }
+
+  _onPoseMessage(msg) {
+    if (msg.type === "ready") {
+      this.poseReady = true;
+      this.onReady("pose");
+    } else if (msg.type === "pose") {
+      this.poseBusy = false;
+      this.onPose(msg, performance.now() - this.poseSentAt);
+    } else if (msg.type === "snapshot") {
+      let resolve = this.pendingSnapshots.get(msg.id);
+      this.pendingSnapshots.delete(msg.id);
+      if (resolve) resolve(msg.blob);
+    }
+  }
+
+  _onDetectMessage(msg) {
+    if (msg.type === "ready") {
+      this.detectReady = true;
+      this.onReady("detector");
+    } else if (msg.type === "detections") {
+      this.detectBusy = false;
+      this.onDetections(msg, performance.now() - this.detectSentAt);
+    }
+  }
+
+  // Camera frame callback: send the frame unless the pose worker is still busy.
+  async sendFrame(inputWidth) {
+    if (!this.poseReady || this.video.readyState < 2) return;
+    if (this.poseBusy) { this.droppedFrames++; return; }
+    let width = this.video.videoWidth || 640, height = this.video.videoHeight || 480;
+    let options = inputWidth && inputWidth < width
+      ? { resizeWidth: inputWidth, resizeHeight: Math.round(height * inputWidth / width), resizeQuality: "low" }
+      : {};
+    this.poseBusy = true;
+    try {
+      let bitmap = await createImageBitmap(this.video, options);
+      this.poseSentAt = performance.now();
+      this.poseWorker.postMessage({ type: "frame", id: ++this.frameId, bitmap, t: this.poseSentAt, width, height }, [bitmap]);
+    } catch (e) {
+      this.poseBusy = false;
+    }
+  }
+
+  // Returns false when the detector is loading or busy.
+  async detect(rois) {
+    if (!this.detectReady || this.detectBusy || this.video.readyState < 2) return false;
+    this.detectBusy = true;
+    try {
+      let bitmap = await createImageBitmap(this.video);
+      this.detectSentAt = performance.now();
+      this.detectWorker.postMessage({ type: "detect", id: this.frameId, bitmap, rois }, [bitmap]);
+      return true;
+    } catch (e) {
+      this.detectBusy = false;
+      return false;
+    }
+  }
+
+  setOverlay(boxes, lines) {
+    if (this.poseWorker) this.poseWorker.postMessage({ type: "overlay", boxes, lines });
+  }
+
+  setModelComplexity(modelComplexity) {
+    if (this.poseWorker) this.poseWorker.postMessage({ type: "options", modelComplexity });
+  }
+
+  // JPEG Blob of the current frame, at most ``width`` pixels wide.
+  captureKeyframe(width, quality) {
+    let id = ++this.frameId;
+    return new Promise(resolve => {
+      this.pendingSnapshots.set(id, resolve);
+      this.poseWorker.postMessage({ type: "keyframe", id, width, quality });
+    });
+  }
+
+  // JPEG Blob of the current frame.
+  encodeSnapshot() {
+    let id = ++this.frameId;
+    return new Promise(resolve => {
+      this.pendingSnapshots.set(id, resolve);
+      this.poseWorker.postMessage({ type: "encode", id });
+    });
+  }
+}
@@ -0,0 +1,231 @@
+"""Streaming lift-cycle segmentation, mirroring ``frontend/lifting.js``.
+
+``LiftSegmenter`` is fed one frame at a time (wrist height V, reach H,
+asymmetry A, MMH zone and whether an object is held) and finds lifts with a
+grasp / release state machine: a lift starts once an object has been held for
+``LIFT_GRASP_S`` and ends after ``LIFT_RELEASE_S`` without it; holds whose wrist
+travel stays under ``LIFT_MIN_TRAVEL_CM`` are not lifts.  Each lift gets its
+own travel distance D, a frequency multiplier from the NIOSH table at the
+current lift rate, and RWL / LI at its worse end.  Lifts are grouped by origin
+and destination zone into tasks for the composite lifting index.  Each push is
+O(1) and memory stays bounded however long the shift.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+from reba_engine import LOAD_CONSTANT
+
+LIFT_GRASP_S = 0.25
+LIFT_RELEASE_S = 0.4
+LIFT_MIN_TRAVEL_CM = 10.0
+LIFT_SMOOTH_ALPHA = 0.3
+# NIOSH averages the lifting frequency over a 15 minute sample.
+LIFT_RATE_WINDOW_S = 15 * 60.0
+# Lifts end at least a grasp plus a release apart: room for every lift in the window.
+LIFT_RATE_CAPACITY = math.ceil(LIFT_RATE_WINDOW_S / (LIFT_GRASP_S + LIFT_RELEASE_S)) + 1
+LIFT_LOG_SIZE = 32
+
+# Work duration categories: <= 1 h, <= 2 h, <= 8 h.
+LIFT_DURATIONS = ("short", "moderate", "long")
+FM_FREQUENCIES = np.array([0.2, 0.5, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15], dtype=np.float64)
+# Rows follow FM_FREQUENCIES; columns are duration x vertical origin (V < 75 cm, V >= 75 cm).
+FM_TABLE = np.array([
+    [1.00, 1.00, 0.95, 0.95, 0.85, 0.85],
+    [0.97, 0.97, 0.92, 0.92, 0.81, 0.81],
+    [0.94, 0.94, 0.88, 0.88, 0.75, 0.75],
+    [0.91, 0.91, 0.84, 0.84, 0.65, 0.65],
+    [0.88, 0.88, 0.79, 0.79, 0.55, 0.55],
+    [0.84, 0.84, 0.72, 0.72, 0.45, 0.45],
+    [0.80, 0.80, 0.60, 0.60, 0.35, 0.35],
+    [0.75, 0.75, 0.50, 0.50, 0.27, 0.27],
+    [0.70, 0.70, 0.42, 0.42, 0.22, 0.22],
+    [0.60, 0.60, 0.35, 0.35, 0.18, 0.18],
+    [0.52, 0.52, 0.30, 0.30, 0.00, 0.15],
+    [0.45, 0.45, 0.26, 0.26, 0.00, 0.13],
+    [0.41, 0.41, 0.00, 0.23, 0.00, 0.00],
+    [0.37, 0.37, 0.00, 0.21, 0.00, 0.00],
+    [0.00, 0.34, 0.00, 0.00, 0.00, 0.00],
+    [0.00, 0.31, 0.00, 0.00, 0.00, 0.00],
+    [0.00, 0.28, 0.00, 0.00, 0.00, 0.00],
+])
+
+
+def frequency_multiplier(lifts_per_min, duration, v_cm):
+    """FM for a lift rate; linear between table rows, 0 past the last non-zero row."""
+    col = 2 * (LIFT_DURATIONS.index(duration) if duration in LIFT_DURATIONS else 0) + (1 if v_cm >= 75 else 0)
+    if lifts_per_min <= FM_FREQUENCIES[0]:
+        return float(FM_TABLE[0, col])
+    if lifts_per_min > FM_FREQUENCIES[-1]:
+        return 0.0
+    # FM_FREQUENCIES[i - 1] < lifts_per_min <= FM_FREQUENCIES[i]
+    i = int(np.searchsorted(FM_FREQUENCIES, lifts_per_min))
+    lo, hi = FM_TABLE[i - 1, col], FM_TABLE[i, col]
+    if hi == 0:
+        return 0.0
+    f = (lifts_per_min - FM_FREQUENCIES[i - 1]) / (FM_FREQUENCIES[i] - FM_FREQUENCIES[i - 1])
+    return float(lo + f * (hi - lo))
+
+
+def frequency_independent_rwl(h_cm, v_cm, d_cm, a_deg):
+    """RWL without FM at one end of a lift; the object is held, so CM is 1.0."""
+    hm = min(1.0, 25.0 / max(25.0, h_cm))
+    vm = max(0.0, 1.0 - 0.0033 * abs(v_cm - 75.0))
+    dm = min(1.0, 0.82 + 4.5 / max(25.0, d_cm))
+    am = max(0.0, 1.0 - 0.0032 * a_deg)
+    return LOAD_CONSTANT * hm * vm * dm * am
+
+
+def lifting_index(load, rwl):
+    return load / max(0.1, rwl)
+
+
+class LiftSegmenter:
+    def __init__(self, duration="long", load=8.0):
+        self.duration = duration if duration in LIFT_DURATIONS else "long"
+        self.load = float(load)
+        self.reset()
+
+    def reset(self):
+        self.state = "idle"
+        self.v = None
+        self.start_t = None
+        self.last_t = None
+        self.grasp_t = None
+        self.release_t = None
+        self.origin = None
+        self.last = None
+        self.v_min = self.v_max = 0.0
+        self.rate_times = deque(maxlen=LIFT_RATE_CAPACITY)
+        self.count = 0
+        self.sum_d = 0.0
+        self.max_li = 0.0
+        self.log = deque(maxlen=LIFT_LOG_SIZE)
+        # (origin zone, destination zone) -> lifts and the worst lift's FIRWL.
+        self.categories = {}
+
+    def push(self, t, h_cm, v_cm, a_deg, zone, held):
+        """One frame (time in seconds, MMH zone name); returns the lift it completes, else ``None``."""
+        if self.start_t is None:
+            self.start_t = t
+        self.last_t = t
+        self.v = v_cm if self.v is None else self.v + LIFT_SMOOTH_ALPHA * (v_cm - self.v)
+
+        if self.state == "idle":
+            if not held:
+                self.grasp_t = None
+                return None
+            if self.grasp_t is None:
+                self.grasp_t = t
+                self.origin = (t, h_cm, self.v, a_deg, zone)
+                self.v_min = self.v_max = self.v
+            self._hold(t, h_cm, a_deg, zone)
+            if t - self.grasp_t >= LIFT_GRASP_S:
+                self.state = "holding"
+            return None
+
+        if held:
+            self.release_t = None
+            self._hold(t, h_cm, a_deg, zone)
+            return None
+        if self.release_t is None:
+            self.release_t = t
+        if t - self.release_t < LIFT_RELEASE_S:
+            return None
+        self.state = "idle"
+        self.grasp_t = None
+        self.release_t = None
+        return self._finish() if self.v_max - self.v_min >= LIFT_MIN_TRAVEL_CM else None
+
+    def _hold(self, t, h_cm, a_deg, zone):
+        self.v_min = min(self.v_min, self.v)
+        self.v_max = max(self.v_max, self.v)
+        self.last = (t, h_cm, self.v, a_deg, zone)
+
+    def _finish(self):
+        o_t, o_h, o_v, o_a, o_zone = self.origin
+        d_t, d_h, d_v, d_a, d_zone = self.last
+        d_cm = abs(d_v - o_v)
+        self.rate_times.append(d_t)
+        rate = self.lifts_per_min(d_t)
+        fm = frequency_multiplier(rate, self.duration, o_v)
+
+        # The worse end of the lift governs.
+        firwl = min(frequency_independent_rwl(o_h, o_v, d_cm, o_a), frequency_independent_rwl(d_h, d_v, d_cm, d_a))
+        rwl = firwl * fm
+        li = lifting_index(self.load, rwl)
+        lift = {
+            "start_s": round(o_t - self.start_t, 1),
+            "duration_s": round(d_t - o_t, 1),
+            "v_origin_cm": round(o_v, 1), "v_dest_cm": round(d_v, 1), "d_cm": round(d_cm, 1),
+            "origin_zone": o_zone, "dest_zone": d_zone,
+            "lifts_per_min": round(rate, 2), "fm": round(fm, 2),
+            "rwl": round(rwl, 2), "li": round(li, 2),
+        }
+        self.count += 1
+        self.sum_d += d_cm
+        self.max_li = max(self.max_li, li)
+        self.log.append(lift)
+
+        cat = self.categories.get((o_zone, d_zone))
+        if cat is None:
+            self.categories[(o_zone, d_zone)] = {"lifts": 1, "firwl": firwl, "v_origin_cm": o_v}
+        else:
+            cat["lifts"] += 1
+            if firwl < cat["firwl"]:
+                cat["firwl"], cat["v_origin_cm"] = firwl, o_v
+        return lift
+
+    def lifts_per_min(self, now):
+        """Lifts per minute over the last ``LIFT_RATE_WINDOW_S``, over at least one minute."""
+        while self.rate_times and now - self.rate_times[0] > LIFT_RATE_WINDOW_S:
+            self.rate_times.popleft()
+        span = min(LIFT_RATE_WINDOW_S, max(60.0, now - self.start_t))
+        return len(self.rate_times) * 60.0 / span
+
+    def composite_index(self, minutes):
+        """NIOSH composite lifting index over the task categories at their session frequency.
+
+        CLI = STLI_1 plus, for each further task in order of decreasing STLI,
+        the rise of its LI from FM(F_1..i-1) to FM(F_1..i).
+        """
+        tasks = []
+        for (origin, dest), c in self.categories.items():
+            freq = c["lifts"] / minutes
+            fm = frequency_multiplier(freq, self.duration, c["v_origin_cm"])
+            tasks.append({"origin_zone": origin, "dest_zone": dest, **c, "freq": freq,
+                          "fili": lifting_index(self.load, c["firwl"]),
+                          "stli": lifting_index(self.load, c["firwl"] * fm)})
+        tasks.sort(key=lambda task: -task["stli"])
+        if not tasks:
+            return None, []
+        cli, freq = tasks[0]["stli"], tasks[0]["freq"]
+        for task in tasks[1:]:
+            before = frequency_multiplier(freq, self.duration, task["v_origin_cm"])
+            freq += task["freq"]
+            after = frequency_multiplier(freq, self.duration, task["v_origin_cm"])
+            cli += lifting_index(self.load, task["firwl"] * after) - lifting_index(self.load, task["firwl"] * before)
+        return cli, tasks
+
+    def summary(self):
+        minutes = 1.0 if self.start_t is None else max(1.0, (self.last_t - self.start_t) / 60.0)
+        cli, tasks = self.composite_index(minutes)
+        # Session FM: the table at the session lift rate, from the worst task's origin height.
+        fm = frequency_multiplier(self.count / minutes, self.duration, tasks[0]["v_origin_cm"]) if tasks else None
+        return {
+            "duration": self.duration,
+            "lifts": self.count,
+            "lifts_per_min": round(self.count / minutes, 2),
+            "fm": None if fm is None else round(fm, 2),
+            "mean_d_cm": round(self.sum_d / self.count, 1) if self.count else None,
+            "max_li": round(self.max_li, 2) if self.count else None,
+            "composite_li": None if cli is None else round(cli, 2),
+            "tasks": [
+                {"origin_zone": t["origin_zone"], "dest_zone": t["dest_zone"], "lifts": t["lifts"],
+                 "lifts_per_min": round(t["freq"], 2), "fili": round(t["fili"], 2), "stli": round(t["stli"], 2)}
+                for t in tasks
+            ],
+            "recent": list(self.log),
+        }
@@ -0,0 +1,144 @@
+"""Offline asset bundle for the live auditor.
+
+Downloads every third-party script, the MediaPipe Pose WASM / model files, the
+MediaPipe Tasks bundle and pose models used by the worker pipeline, and the
+coco-ssd weights listed in ``frontend/asset_manifest.json`` into
+``frontend/vendor/`` so the component can start with no internet access, and
+copies the bundled ``assets/recommended_weight.png`` next to them.
+
+    python offline_assets.py download
+    python offline_assets.py status
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+FRONTEND_DIR = ROOT / "frontend"
+VENDOR_DIR = FRONTEND_DIR / "vendor"
+MANIFEST_PATH = FRONTEND_DIR / "asset_manifest.json"
+
+JSDELIVR_FLAT_API = "https://data.jsdelivr.com/v1/package/npm/{package}/flat"
+# Files the Pose solution fetches through ``locateFile`` at initialisation.
+POSE_FILE_SUFFIXES = (".js", ".wasm", ".data", ".tflite", ".binarypb")
+
+
+def load_manifest():
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def _local(path):
+    return FRONTEND_DIR / path
+
+
+def ensure_diagram(manifest=None):
+    """Copy the repo's reference diagram into the component's static files."""
+    diagram = (manifest or load_manifest())["diagram"]
+    dest = _local(diagram["local"])
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(ROOT / diagram["source"], dest)
+    return dest
+
+
+def _fetch(url, dest, force=False):
+    if dest.exists() and not force:
+        return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(dest.suffix + ".part")
+    with urllib.request.urlopen(url, timeout=60) as response, open(tmp, "wb") as f:
+        shutil.copyfileobj(response, f)
+    tmp.replace(dest)
+    return True
+
+
+def _pose_file_names(package):
+    with urllib.request.urlopen(JSDELIVR_FLAT_API.format(package=package), timeout=30) as response:
+        listing = json.load(response)
+    return [f["name"].lstrip("/") for f in listing["files"] if f["name"].endswith(POSE_FILE_SUFFIXES)]
+
+
+def _coco_shards(model_json_path):
+    model = json.loads(model_json_path.read_text())
+    return [path for group in model["weightsManifest"] for path in group["paths"]]
+
+
+def _pose_worker_files(manifest):
+    tasks = manifest["pose_worker"]
+    jobs = [(tasks["cdn"] + name, _local(tasks["local"]) / name) for name in tasks["files"]]
+    return jobs + [(model["cdn"], _local(model["local"])) for model in tasks["models"].values()]
+
+
+def download(force=False):
+    manifest = load_manifest()
+    jobs = [(entry["cdn"], _local(entry["local"])) for entry in manifest["scripts"]]
+
+    pose = manifest["pose_files"]
+    pose_names = _pose_file_names(pose["package"])
+    jobs += [(pose["cdn"] + name, _local(pose["local"]) / name) for name in pose_names]
+    (_local(pose["local"])).mkdir(parents=True, exist_ok=True)
+    (_local(pose["local"]) / "files.json").write_text(json.dumps(pose_names))
+    jobs += _pose_worker_files(manifest)
+
+    for url, dest in jobs:
+        if _fetch(url, dest, force):
+            print(f"downloaded {dest.relative_to(FRONTEND_DIR)}")
+
+    coco = manifest["coco_ssd_model"]
+    model_json = _local(coco["local"])
+    _fetch(coco["cdn"], model_json, force)
+    base_url = coco["cdn"].rsplit("/", 1)[0]
+    for shard in _coco_shards(model_json):
+        if _fetch(f"{base_url}/{shard}", model_json.parent / shard, force):
+            print(f"downloaded {(model_json.parent / shard).relative_to(FRONTEND_DIR)}")
+
+    ensure_diagram(manifest)
+
+
+def missing_assets():
+    """Local paths of the offline bundle that are not on disk yet."""
+    manifest = load_manifest()
+    paths = [_local(entry["local"]) for entry in manifest["scripts"]]
+
+    pose_dir = _local(manifest["pose_files"]["local"])
+    listing = pose_dir / "files.json"
+    paths.append(listing)
+    if listing.exists():
+        paths += [pose_dir / name for name in json.loads(listing.read_text())]
+
+    paths += [dest for _, dest in _pose_worker_files(manifest)]
+
+    model_json = _local(manifest["coco_ssd_model"]["local"])
+    paths.append(model_json)
+    if model_json.exists():
+        paths += [model_json.parent / shard for shard in _coco_shards(model_json)]
+
+    paths.append(_local(manifest["diagram"]["local"]))
+    return [p for p in paths if not p.exists()]
+
+
+def is_bundled():
+    return not missing_assets()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=("download", "status"))
+    parser.add_argument("--force", action="store_true", help="re-download files that already exist")
+    args = parser.parse_args(argv)
+
+    if args.command == "download":
+        download(args.force)
+    missing = missing_assets()
+    for path in missing:
+        print(f"missing {path.relative_to(FRONTEND_DIR)}")
+    print("offline bundle complete" if not missing else f"{len(missing)} asset(s) missing")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import datetime
+
+import streamlit as st
+
+from audit_store import RISK_TIERS, AuditStore
+
+st.set_page_config(page_title="Audit History", layout="wide")
+st.title("📊 Audit History")
+st.caption("Sessions stored by the live auditor and batch_audit.py --db, read from the daily / weekly rollups")
+
+store = AuditStore()
+sidebar = st.sidebar
+today = datetime.datetime.now(datetime.timezone.utc).date()
+period = sidebar.date_input("Period (UTC)", (today - datetime.timedelta(days=30), today))
+# While a range is being picked the widget holds only its first day.
+since, until = (period[0], period[-1]) if period else (None, None)
+granularity = sidebar.radio("Trend By", ["day", "week"], horizontal=True)
+li_threshold = sidebar.number_input("Lifting Index Above", min_value=0.0, max_value=5.0, value=1.0, step=0.1)
+workstation = sidebar.selectbox("Workstation", [None, *store.distinct("workstation")],
+                                format_func=lambda w: "All" if w is None else (w or "(unnamed)"))
+
+trend = store.trend(granularity, since, until, workstation=workstation)
+if not trend:
+    st.info("No sessions stored for this period.")
+    store.close()
+    st.stop()
+
+sessions = sum(t["sessions"] for t in trend)
+cols = st.columns(4)
+cols[0].metric("Sessions", sessions)
+cols[1].metric("High / Very High REBA", sum(t["high_risk_sessions"] for t in trend))
+cols[2].metric("Sessions with LI > 1.0", sum(t["li_over_1_sessions"] for t in trend))
+cols[3].metric("Mean Peak REBA", round(sum(t["mean_peak_reba"] * t["sessions"] for t in trend) / sessions, 2))
+
+st.subheader(f"Per {granularity}")
+st.bar_chart({"period": [t["period_start"] for t in trend],
+              "High risk": [t["high_risk_sessions"] for t in trend],
+              "Other": [t["sessions"] - t["high_risk_sessions"] for t in trend]},
+             x="period", y=["High risk", "Other"])
+
+left, right = st.columns(2)
+with left:
+    st.subheader("Worst Workstations")
+    st.dataframe(
+        [
+            {
+                "Workstation": w["workstation"] or "(unnamed)",
+                "Sessions": w["sessions"],
+                "Mean Peak REBA": w["mean_peak_reba"],
+                "Max Peak REBA": w["max_peak_reba"],
+                "Max Peak LI": w["max_peak_li"],
+                "High Risk": w["high_risk_sessions"],
+                "Hours": w["hours"],
+            }
+            for w in store.worst_workstations(since, until)
+        ],
+        use_container_width=True,
+    )
+with right:
+    st.subheader(f"Operators Above LI {li_threshold:g}")
+    st.dataframe(
+        [
+            {
+                "Operator": o["operator_id"],
+                "Sessions": o["sessions"],
+                "Max Peak LI": o["max_peak_li"],
+                "Workstations": o["workstations"],
+                "Last": o["last_day"],
+            }
+            for o in store.operators_above_li(li_threshold, since, until)
+        ],
+        use_container_width=True,
+    )
+
+st.subheader("Recent High-Risk Sessions")
+st.dataframe(
+    [
+        {
+            "Day": s["day"],
+            "Operator": s["operator_id"],
+            "Workstation": s["workstation"],
+            "Duration (s)": s["duration_s"],
+            "Peak REBA": s["peak_reba"],
+            "Risk": RISK_TIERS[s["risk_tier"]][0],
+            "Sustained REBA": s["sustained_reba"],
+            "Peak LI": s["peak_li"],
+            "Lifts": s["lifts"],
+            "Composite LI": s["composite_li"],
+        }
+        for s in store.sessions(since, until, workstation, min_tier=3, limit=50)
+    ],
+    use_container_width=True,
+)
+store.close()
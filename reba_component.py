@@ -0,0 +1,60 @@
+"""Persistent bidirectional Streamlit component for the live auditor.
+
+The iframe in ``frontend/`` loads Pose and coco-ssd once.  Sidebar values are
+delivered as render args to the running iframe instead of regenerating it, and
+the iframe sends events back (session summaries, ...) through an outbox that
+Python acknowledges by sequence number.
+"""
+
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import offline_assets
+
+FRONTEND_DIR = Path(__file__).parent / "frontend"
+COMPONENT_KEY = "reba_auditor"
+_STATE_KEY = "_reba_bridge"
+
+ASSET_MODES = {"Auto": None, "CDN": "cdn", "Offline bundle": "offline"}
+
+_component = components.declare_component("reba_auditor", path=str(FRONTEND_DIR))
+
+
+def resolve_asset_mode(choice):
+    """Map the sidebar choice to ``"cdn"`` or ``"offline"``; Auto prefers a complete local bundle."""
+    mode = ASSET_MODES.get(choice)
+    if mode is None:
+        mode = "offline" if offline_assets.is_bundled() else "cdn"
+    return mode
+
+
+def _take_new_events(value):
+    state = st.session_state.setdefault(_STATE_KEY, {"client_id": None, "seq": 0})
+    if not value or not value.get("events"):
+        return []
+    if value.get("client_id") != state["client_id"]:
+        # The iframe was reloaded: its sequence numbers restart at 1.
+        state["client_id"] = value.get("client_id")
+        state["seq"] = 0
+    events = [e for e in value["events"] if e["seq"] > state["seq"]]
+    if events:
+        state["seq"] = max(e["seq"] for e in events)
+    return events
+
+
+def reba_auditor(**args):
+    """Render the live auditor and return events received since the last run.
+
+    Keyword arguments are passed to the iframe as render args; changing them
+    updates the running session without reloading the models.
+    """
+    # Copied on render rather than at import, so importing this module writes nothing.
+    offline_assets.ensure_diagram()
+    # The widget value is readable before the component is rendered, so the
+    # ack sent with this run already covers the events processed here.
+    events = _take_new_events(st.session_state.get(COMPONENT_KEY))
+    ack = dict(st.session_state[_STATE_KEY])
+    value = _component(**args, ack=ack, key=COMPONENT_KEY, default=None)
+    return events + _take_new_events(value)
@@ -0,0 +1,407 @@
+"""Vectorized REBA / NIOSH / MMH scoring engine.
+
+Python port of the scoring rules that run per frame inside ``onResults`` in
+``reba_app.py``.  Every function works on whole arrays of frames at once so
+hours of recorded MediaPipe landmarks can be re-scored in one call.
+
+Landmarks are MediaPipe Pose normalised coordinates with shape ``(N, 33, 3)``
+(``x``, ``y``, ``z``); a trailing visibility channel is ignored.
+"""
+
+import numpy as np
+
+NO_OBJECT = "No object detected"
+
+# --- OFFICIAL REBA LOOKUP TABLES ---
+TABLE_A = np.array([
+    [[1, 2, 3, 4], [2, 3, 4, 5], [2, 4, 5, 6]],
+    [[2, 3, 4, 5], [3, 4, 5, 6], [4, 5, 6, 7]],
+    [[2, 4, 5, 6], [4, 5, 6, 7], [5, 6, 7, 8]],
+    [[3, 5, 6, 7], [5, 6, 7, 8], [6, 7, 8, 9]],
+    [[4, 6, 7, 8], [6, 7, 8, 9], [7, 8, 9, 9]],
+], dtype=np.int16)
+
+TABLE_B = np.array([
+    [[1, 2, 2], [1, 2, 3]],
+    [[1, 2, 3], [2, 3, 4]],
+    [[3, 4, 5], [4, 5, 5]],
+    [[4, 5, 5], [5, 6, 7]],
+    [[6, 7, 8], [7, 8, 8]],
+    [[7, 8, 8], [8, 9, 9]],
+], dtype=np.int16)
+
+TABLE_C = np.array([
+    [1, 1, 1, 2, 3, 3, 4, 5, 6, 7, 7, 7],
+    [1, 2, 2, 3, 4, 4, 5, 6, 6, 7, 7, 8],
+    [2, 3, 3, 3, 4, 5, 6, 7, 7, 8, 8, 8],
+    [3, 4, 4, 4, 5, 6, 7, 8, 8, 9, 9, 9],
+    [4, 4, 5, 6, 7, 7, 8, 9, 9, 10, 10, 11],
+    [6, 6, 7, 8, 8, 9, 9, 10, 10, 11, 11, 11],
+    [7, 7, 8, 8, 9, 9, 10, 11, 11, 11, 12, 12],
+    [8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 12, 12],
+    [9, 9, 10, 10, 11, 11, 12, 12, 12, 12, 12, 12],
+    [10, 10, 11, 11, 11, 12, 12, 12, 12, 12, 12, 12],
+    [11, 11, 11, 12, 12, 12, 12, 12, 12, 12, 12, 12],
+    [12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12, 12],
+], dtype=np.int16)
+
+ACTIVITY_SCORE = 1
+
+
+def _build_reba_lut():
+    # Axes: trunk(5), neck(3), legs(4), upper_arm(6), lower_arm(2), wrist(3), load(3), coupling(2)
+    score_a = TABLE_A[:, :, :, None, None, None, None, None] + np.arange(3)[:, None]
+    score_b = TABLE_B[None, None, None, :, :, :, None, None] + np.arange(2)
+    idx_a = np.clip(score_a, 1, 12) - 1
+    idx_b = np.clip(score_b, 1, 12) - 1
+    idx_a, idx_b = np.broadcast_arrays(idx_a, idx_b)
+    final = TABLE_C[idx_a, idx_b] + ACTIVITY_SCORE
+    return np.clip(final, 1, 15).astype(np.uint8)
+
+
+# Tables A, B and C plus load/coupling folded into a single tensor so the
+# final REBA score of a frame is one gather.
+REBA_LUT = _build_reba_lut()
+
+# --- MMH RECOMMENDED WEIGHT MATRIX ---
+MMH_ZONES = ("Above Shoulder", "Shoulder to Elbow", "Elbow to Knuckle", "Knuckle to Mid-Leg", "Below Mid-Leg")
+MMH_REACHES = ("Close Reach", "Far Reach")
+PROFILES = ("Male", "Female")
+MMH_LIMITS = np.array([
+    [[10.0, 5.0], [20.0, 10.0], [25.0, 15.0], [20.0, 10.0], [10.0, 5.0]],
+    [[7.0, 3.0], [13.0, 7.0], [16.0, 10.0], [13.0, 7.0], [7.0, 3.0]],
+])
+
+# --- BODY PART TIER BREAKDOWN (bodyPartFrames) ---
+BODY_PARTS = {
+    "trunk": "trunk_score",
+    "neck": "neck_score",
+    "upper_arm": "upper_arm_score",
+    "legs": "legs_score",
+    "wrists": "wrist_score",
+}
+TIERS = ("s1_2", "s3_4", "s5_plus")
+
+JOINTS = ("neck", "trunk", "legs", "upper_arm", "lower_arm", "wrist")
+
+# Landmark triplets (a, b, c) for the angle at b, as used by ``calcAngle``.
+ANGLE_TRIPLETS = {
+    "trunk": (11, 23, 25),
+    "neck": (0, 11, 23),
+    "upper_arm": (23, 11, 13),
+    "lower_arm": (11, 13, 15),
+    "legs": (23, 25, 27),
+    "wrist": (13, 15, 19),
+}
+# Right-side counterparts: every body landmark from 11 on has its mirror at +1.
+ANGLE_TRIPLETS_RIGHT = {name: tuple(i if i < 11 else i + 1 for i in t) for name, t in ANGLE_TRIPLETS.items()}
+# The landmarks the 3D kernel reads, per side (left, then right): the nose,
+# then the chain ankle, knee, hip, shoulder, elbow, wrist, index, so that six
+# of the seven segments the joints share are differences of neighbours.
+_ANGLE_CHAINS = np.array([[0, 27, 25, 23, 11, 13, 15, 19], [0, 28, 26, 24, 12, 14, 16, 20]])
+_ANGLE_POINTS = _ANGLE_CHAINS.ravel()
+# Joint pairs below come as neck, then the neighbouring chain segments (legs,
+# trunk, upper arm, lower arm, wrist); this puts them in JOINTS order.
+_CHAIN_JOINTS = np.array([0, 2, 1, 3, 4, 5])
+# Joints whose wider angle is worse; for the rest, further from straight is worse.
+_WIDER_WORSE = np.array([j in ("neck", "upper_arm") for j in JOINTS])
+
+ANGLE_MODES = ("2d", "3d")
+
+LOAD_CONSTANT = 23.0
+FREQUENCY_MULTIPLIER = 0.95
+
+# Cut-offs applied in ``onResults``, in degrees unless noted.  The live view
+# uses these values; replaying a recording (``replay.py``) can override any
+# of them to study how the scores move.
+THRESHOLDS = {
+    "trunk_neutral_deg": 5.0,     # trunk score 1 within this of upright
+    "trunk_moderate_deg": 20.0,   # score 2 up to here, 3 beyond
+    "neck_deg": 20.0,
+    "upper_arm_low_deg": 20.0,
+    "upper_arm_high_deg": 45.0,
+    "lower_arm_min_deg": 60.0,
+    "lower_arm_max_deg": 100.0,
+    "legs_deg": 30.0,
+    "wrist_deg": 15.0,
+    "far_reach_cm": 40.0,         # MMH far reach beyond this horizontal distance
+    "det_min_score": 0.25,        # detections at or below this are ignored
+    "hand_near_px": 60.0,         # a box within this of a wrist is held
+    "hands_together_px": 180.0,   # wrists this close hold an unidentified object
+}
+
+
+def resolve_thresholds(thresholds=None):
+    """``THRESHOLDS`` with ``thresholds`` applied on top; unknown keys raise."""
+    if not thresholds:
+        return THRESHOLDS
+    unknown = set(thresholds) - set(THRESHOLDS)
+    if unknown:
+        raise ValueError(f"unknown thresholds: {sorted(unknown)}")
+    return {**THRESHOLDS, **{k: float(v) for k, v in thresholds.items()}}
+
+
+def _as_landmarks(landmarks):
+    lm = np.asarray(landmarks, dtype=np.float64)
+    if lm.ndim == 2:
+        lm = lm[None]
+    if lm.ndim != 3 or lm.shape[1] != 33 or lm.shape[2] < 2:
+        raise ValueError(f"expected landmarks of shape (N, 33, 3), got {lm.shape}")
+    return lm
+
+
+def calc_angle(a, b, c):
+    """Angle at ``b`` in degrees from 2D points, matching JS ``calcAngle``."""
+    radians = (np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0])
+               - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0]))
+    angle = np.abs(np.degrees(radians))
+    return np.where(angle > 180.0, 360.0 - angle, angle)
+
+
+def joint_angles(landmarks):
+    lm = _as_landmarks(landmarks)
+    return {name: calc_angle(lm[:, a], lm[:, b], lm[:, c]) for name, (a, b, c) in ANGLE_TRIPLETS.items()}
+
+
+# arccos polynomial (Abramowitz & Stegun 4.4.46), highest order first; shared
+# with JS ``acosDeg`` so both kernels give the same angles.
+_ACOS_POLY = (-0.0012624911, 0.0066700901, -0.0170881256, 0.0308918810,
+              -0.0501743046, 0.0889789874, -0.2145988016, 1.5707963050)
+
+
+def _acos_deg(x):
+    ax = np.abs(x)
+    np.minimum(ax, 1.0, out=ax)
+    # Horner's rule in place: one temporary for the whole polynomial.
+    p = _ACOS_POLY[0] * ax
+    for c in _ACOS_POLY[1:-1]:
+        p += c
+        p *= ax
+    p += _ACOS_POLY[-1]
+    r = np.sqrt(1.0 - ax)
+    r *= p
+    r = np.where(x < 0, np.pi - r, r)
+    r *= 180.0 / np.pi
+    return r
+
+
+def _angle_from_terms(dot, norm2):
+    return _acos_deg(dot / np.maximum(np.sqrt(norm2), 1e-12))
+
+
+def joint_angles_3d(landmarks, width=640, height=480, world=False):
+    """All REBA joint angles for both sides in 3D, keeping the worse side per joint.
+
+    Image landmarks are scaled to pixels (z shares x's scale, as in MediaPipe);
+    pass ``world=True`` for metric world landmarks.  The scaled landmarks are
+    rounded to float32 like the browser's packed buffer, and sides are compared
+    the same way as JS ``jointAngles3D``, with ties going to the left, and with
+    the same arithmetic.
+    """
+    lm = _as_landmarks(landmarks)
+    if lm.shape[2] < 3:
+        raise ValueError("3D joint angles need x, y, z landmarks")
+    # One gather on the contiguous array (a sliced one is far slower to take
+    # from), then coordinate-major and contiguous over frames: (3, side, point, n).
+    p = np.take(lm, _ANGLE_POINTS, axis=1).T[:3].astype(np.float64, order="C")
+    p *= np.array([1.0, 1.0, 1.0] if world else [width, height, width])[:, None, None]
+    p = p.astype(np.float32).astype(np.float64).reshape(3, 2, 8, len(lm))
+    # Shin, thigh, torso (all pointing up the chain), upper arm, forearm, hand; and the neck.
+    seg = p[:, :, 2:] - p[:, :, 1:-1]
+    neck = p[:, :, 0] - p[:, :, 4]
+    dot = seg[0, :, :-1] * seg[0, :, 1:] + seg[1, :, :-1] * seg[1, :, 1:] + seg[2, :, :-1] * seg[2, :, 1:]
+    sq = seg[0] * seg[0] + seg[1] * seg[1] + seg[2] * seg[2]
+    neck_dot = neck[0] * seg[0, :, 2] + neck[1] * seg[1, :, 2] + neck[2] * seg[2, :, 2]
+    neck_sq = neck[0] * neck[0] + neck[1] * neck[1] + neck[2] * neck[2]
+    # Every joint's segments meet head to tail along the chain, hence the minus.
+    d = -np.concatenate([neck_dot[:, None], dot], axis=1)[:, _CHAIN_JOINTS]
+    n2 = np.concatenate([(neck_sq * sq[:, 2])[:, None], sq[:, :-1] * sq[:, 1:]], axis=1)[:, _CHAIN_JOINTS]
+    dl, dr, nl, nr = d[0], d[1], n2[0], n2[1]
+
+    # cos * |cos| compared without the square roots.
+    key_l, key_r = dl * np.abs(dl) * nr, dr * np.abs(dr) * nl
+    right = np.where(_WIDER_WORSE[:, None], key_r < key_l, key_r > key_l)
+    # The chosen side of each joint, plus the right lower arm: the lower arm is
+    # worse further from its 60-100 degree band, so it needs both angles.
+    la = JOINTS.index("lower_arm")
+    dc = np.concatenate([np.where(right, dr, dl), dr[la:la + 1]])
+    nc = np.concatenate([np.where(right, nr, nl), nr[la:la + 1]])
+    dc[la], nc[la] = dl[la], nl[la]
+    angles = _angle_from_terms(dc, nc)
+    al, ar = angles[la], angles[-1]
+    angles[la] = np.where(np.abs(ar - 80.0) > np.abs(al - 80.0), ar, al)
+    return {joint: angles[k] for k, joint in enumerate(JOINTS)}
+
+
+def joint_scores(angles, thresholds=None):
+    t = resolve_thresholds(thresholds)
+    trunk_dev = np.abs(180.0 - angles["trunk"])
+    upper_arm = angles["upper_arm"]
+    lower_arm = angles["lower_arm"]
+    return {
+        "trunk_score": np.where(trunk_dev <= t["trunk_neutral_deg"], 1,
+                                np.where(trunk_dev <= t["trunk_moderate_deg"], 2, 3)).astype(np.int8),
+        "neck_score": np.where(angles["neck"] <= t["neck_deg"], 1, 2).astype(np.int8),
+        "upper_arm_score": np.where(upper_arm <= t["upper_arm_low_deg"], 1,
+                                    np.where(upper_arm <= t["upper_arm_high_deg"], 2, 3)).astype(np.int8),
+        "lower_arm_score": np.where((lower_arm >= t["lower_arm_min_deg"]) & (lower_arm <= t["lower_arm_max_deg"]),
+                                    1, 2).astype(np.int8),
+        "legs_score": np.where(np.abs(180.0 - angles["legs"]) <= t["legs_deg"], 1, 2).astype(np.int8),
+        "wrist_score": np.where(np.abs(180.0 - angles["wrist"]) <= t["wrist_deg"], 1, 2).astype(np.int8),
+    }
+
+
+def load_score(load_kg):
+    load_kg = np.asarray(load_kg, dtype=np.float64)
+    return np.where(load_kg < 5.0, 0, np.where(load_kg <= 10.0, 1, 2)).astype(np.int8)
+
+
+def reba_score(scores, load_kg, object_present):
+    """Final REBA per frame via a single gather into ``REBA_LUT``."""
+    return REBA_LUT[
+        np.clip(scores["trunk_score"], 1, 5) - 1,
+        np.clip(scores["neck_score"], 1, 3) - 1,
+        np.clip(scores["legs_score"], 1, 4) - 1,
+        np.clip(scores["upper_arm_score"], 1, 6) - 1,
+        np.clip(scores["lower_arm_score"], 1, 2) - 1,
+        np.clip(scores["wrist_score"], 1, 3) - 1,
+        load_score(load_kg),
+        np.asarray(object_present, dtype=np.int8),
+    ]
+
+
+def niosh(landmarks, trunk_angle, actual_wt, object_present, width=640, height=480, initial_wrist_v=None):
+    """Spatial geometry and NIOSH multipliers per frame.
+
+    ``initial_wrist_v`` is the baseline wrist height for the travel distance D;
+    when omitted the first frame's V is used, as the JS does once a session starts.
+    """
+    lm = _as_landmarks(landmarks)
+    nose, ankle = lm[:, 0], lm[:, 27]
+    body_pixel_height = np.hypot(nose[:, 0] - ankle[:, 0], nose[:, 1] - ankle[:, 1]) * height
+    scale_factor = 170.0 / np.maximum(100.0, body_pixel_height)
+
+    avg_wrist_y = (lm[:, 15, 1] + lm[:, 16, 1]) / 2.0
+    avg_ankle_y = (lm[:, 27, 1] + lm[:, 28, 1]) / 2.0
+    avg_ankle_x = (lm[:, 27, 0] + lm[:, 28, 0]) / 2.0
+    avg_wrist_x = (lm[:, 15, 0] + lm[:, 16, 0]) / 2.0
+
+    h_pixel = np.hypot(avg_wrist_x - avg_ankle_x, avg_wrist_y - avg_ankle_y) * width
+    h_cm = np.maximum(25.0, h_pixel * scale_factor)
+    hm = np.minimum(1.0, 25.0 / h_cm)
+
+    v_pixel = np.abs(avg_ankle_y - avg_wrist_y) * height
+    v_cm = np.maximum(0.0, v_pixel * scale_factor)
+    vm = np.maximum(0.0, 1.0 - (0.0033 * np.abs(v_cm - 75.0)))
+
+    if initial_wrist_v is None:
+        initial_wrist_v = v_cm[0] if len(v_cm) else 0.0
+    baseline = v_cm if not initial_wrist_v else initial_wrist_v
+    d_cm = np.maximum(25.0, np.abs(v_cm - baseline))
+    dm = np.minimum(1.0, 0.82 + (4.5 / d_cm))
+
+    a_deg = np.abs(180.0 - trunk_angle)
+    am = np.maximum(0.0, 1.0 - (0.0032 * a_deg))
+
+    object_present = np.broadcast_to(np.asarray(object_present, dtype=bool), h_cm.shape)
+    fm = np.full_like(h_cm, FREQUENCY_MULTIPLIER)
+    cm = np.where(object_present, 1.0, 0.95)
+
+    rwl = LOAD_CONSTANT * hm * vm * dm * am * fm * cm
+    li = actual_wt / np.maximum(0.1, rwl)
+    return {
+        "h_cm": h_cm, "v_cm": v_cm, "d_cm": d_cm, "a_deg": a_deg,
+        "hm": hm, "vm": vm, "dm": dm, "am": am, "fm": fm, "cm": cm,
+        "rwl": rwl, "li": li,
+    }
+
+
+def mmh_zone(landmarks, h_cm, far_reach_cm=THRESHOLDS["far_reach_cm"]):
+    """MMH height zone index into ``MMH_ZONES`` and reach index into ``MMH_REACHES``."""
+    lm = _as_landmarks(landmarks)
+    wrist_y = (lm[:, 15, 1] + lm[:, 16, 1]) / 2.0
+    bounds = np.stack([lm[:, 11, 1], lm[:, 13, 1], lm[:, 23, 1], lm[:, 25, 1]], axis=1)
+    # First boundary the wrist is above; falls through to "Below Mid-Leg".
+    above = wrist_y[:, None] < bounds
+    zone = np.where(above.any(axis=1), above.argmax(axis=1), len(MMH_ZONES) - 1).astype(np.int8)
+    reach = (h_cm > far_reach_cm).astype(np.int8)
+    return zone, reach
+
+
+def mmh_limit(profile, zone, reach):
+    """Recommended MMH weight limit, matching JS ``getDynamicMmhLimit``."""
+    p = PROFILES.index(profile) if profile in PROFILES else 0
+    return MMH_LIMITS[p][np.asarray(zone), np.asarray(reach)]
+
+
+def score_frames(landmarks, actual_wt=8.0, object_present=False, width=640, height=480, initial_wrist_v=None,
+                 angle_mode="2d", thresholds=None, world_landmarks=None):
+    """Score a batch of frames.
+
+    ``angle_mode`` is ``"2d"`` for the left-side image-plane angles of the
+    original ``calcAngle`` scoring, or ``"3d"`` for ``joint_angles_3d``; in
+    3D, frames with (finite) ``world_landmarks`` take their angles from those,
+    as the live view does.  ``thresholds`` overrides entries of ``THRESHOLDS``.
+
+    Returns a dict of NumPy arrays keyed like the JS ``peakAngles`` /
+    ``latestNiosh`` objects plus ``reba``, ``mmh_zone`` and ``mmh_reach``.
+    """
+    if angle_mode not in ANGLE_MODES:
+        raise ValueError(f"angle_mode must be one of {ANGLE_MODES}, got {angle_mode!r}")
+    t = resolve_thresholds(thresholds)
+    lm = _as_landmarks(landmarks)
+    object_present = np.broadcast_to(np.asarray(object_present, dtype=bool), (len(lm),))
+    if angle_mode == "2d":
+        angles = joint_angles(lm)
+    else:
+        angles = joint_angles_3d(lm, width, height)
+        if world_landmarks is not None:
+            world = _as_landmarks(world_landmarks)[..., :3]
+            has_world = np.isfinite(world).all(axis=(1, 2))
+            if has_world.any():
+                world_angles = joint_angles_3d(np.where(has_world[:, None, None], world, 0.0), world=True)
+                angles = {j: np.where(has_world, world_angles[j], angles[j]) for j in JOINTS}
+    scores = joint_scores(angles, t)
+    out = {**angles, **scores}
+    out["reba"] = reba_score(scores, actual_wt, object_present)
+    out.update(niosh(lm, angles["trunk"], actual_wt, object_present, width, height, initial_wrist_v))
+    out["mmh_zone"], out["mmh_reach"] = mmh_zone(lm, out["h_cm"], t["far_reach_cm"])
+    return out
+
+
+def tier_breakdown(scores):
+    """Per-body-part REBA tier counts, shaped like the JS ``bodyPartFrames``."""
+    breakdown = {}
+    for part, key in BODY_PARTS.items():
+        s = np.asarray(scores[key])
+        breakdown[part] = {
+            "s1_2": int(np.count_nonzero(s <= 2)),
+            "s3_4": int(np.count_nonzero((s > 2) & (s <= 4))),
+            "s5_plus": int(np.count_nonzero(s > 4)),
+        }
+    return breakdown
+
+
+def is_hand_near_box(hand_x, hand_y, bbox, threshold=60):
+    x, y, width, height = bbox
+    return (x - threshold) <= hand_x <= (x + width + threshold) and (y - threshold) <= hand_y <= (y + height + threshold)
+
+
+def hand_object(detections, left_wrist, right_wrist, min_score=THRESHOLDS["det_min_score"],
+                near_px=THRESHOLDS["hand_near_px"], together_px=THRESHOLDS["hands_together_px"]):
+    """Name of the object held in either hand, following ``onResults``.
+
+    ``detections`` are ``(class_name, score, [x, y, w, h])`` tuples in pixels,
+    wrists are ``(x, y)`` pixel positions or ``None``.
+    """
+    lw_x, lw_y = left_wrist if left_wrist is not None else (-1, -1)
+    rw_x, rw_y = right_wrist if right_wrist is not None else (-1, -1)
+    for name, score, bbox in detections:
+        if score > min_score and name != "person":
+            near_left = lw_x > 0 and is_hand_near_box(lw_x, lw_y, bbox, near_px)
+            near_right = rw_x > 0 and is_hand_near_box(rw_x, rw_y, bbox, near_px)
+            if near_left or near_right:
+                return name or "Unidentified Object"
+    if np.hypot(lw_x - rw_x, lw_y - rw_y) < together_px and lw_y > 0 and rw_y > 0:
+        return "Unidentified Object"
+    return NO_OBJECT
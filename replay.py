@@ -0,0 +1,209 @@
+"""Re-score recorded sessions with different thresholds, without inference.
+
+With "Record landmarks for replay" on, the live view stores each frame's raw
+pose landmarks, world landmarks and object detections as float16 columns
+(``frontend/telemetry.js`` ``LandmarkRecorder``) under
+``sessions/<id>/landmarks/``.  ``replay`` runs them back through the same
+scoring as the live view: the JS box tracker and hand-object association,
+then ``AuditSession``, with any of ``reba_engine.THRESHOLDS`` overridden.
+
+    python replay.py sessions/abc123-1712345678 --set trunk_moderate_deg=25 --set far_reach_cm=35
+    python replay.py sessions/abc123-1712345678 --sweep det_min_score=0.2,0.3,0.4,0.5
+
+Landmarks are float16: angles come back within ~0.1 degree (up to ~1 degree
+for the short wrist segment), so a replay at the default thresholds matches
+the live scores except for frames sitting right on a cut-off.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+import reba_engine
+import telemetry
+from session import AuditSession
+from tracking import iou_matrix
+
+STREAM = "landmarks"
+# Image x / y are recorded relative to the frame centre (float16 precision).
+LANDMARK_CENTRE = 0.5
+# Box tracker constants, as in auditor.js.
+TRACK_MATCH_IOU = 0.3
+TRACK_MAX_AGE_MS = 1000.0
+TRACK_VELOCITY_ALPHA = 0.5
+# Thresholds that change the held object, not just the scoring.
+OBJECT_THRESHOLDS = ("det_min_score", "hand_near_px", "hands_together_px")
+
+
+def load_recording(session_dir):
+    """Recorded frames of a session as float32 arrays plus the recording settings."""
+    stream_dir = Path(session_dir) / STREAM
+    if not (stream_dir / "meta.json").exists():
+        raise FileNotFoundError(f"{session_dir} has no landmark recording")
+    meta = json.loads((stream_dir / "meta.json").read_text())
+    cols = telemetry.load_columns(stream_dir)
+    n = len(cols["t_ms"])
+    info = meta.get("info", {})
+    landmarks = np.asarray(cols["landmarks"], dtype=np.float32).reshape(n, 33, 4)
+    landmarks[..., :2] += LANDMARK_CENTRE
+    return {
+        "frames": n,
+        "t_ms": np.asarray(cols["t_ms"], dtype=np.float64),
+        "landmarks": landmarks,
+        "world": np.asarray(cols["world"], dtype=np.float32).reshape(n, 33, 3),
+        "det_t_ms": np.asarray(cols["det_t_ms"], dtype=np.float64),
+        "det_n": np.asarray(cols["det_n"]),
+        "det_class": np.asarray(cols["det_class"]),
+        "det_score": np.asarray(cols["det_score"], dtype=np.float32),
+        "det_bbox": np.asarray(cols["det_bbox"], dtype=np.float32).reshape(n, -1, 4),
+        "classes": info.get("classes", []),
+        "settings": {k: v for k, v in info.items() if k != "classes"},
+        "dropped_chunks": meta.get("dropped_chunks", 0),
+    }
+
+
+class HandBoxTracker:
+    """Port of the auditor.js box tracker: constant-velocity boxes between detections."""
+
+    def __init__(self, min_score):
+        self.min_score = min_score
+        self.tracks = []  # dicts: class, score, bbox (ndarray), vx, vy, t
+
+    def _predict(self, tr, now):
+        dt = now - tr["t"]
+        return np.array([tr["bbox"][0] + tr["vx"] * dt, tr["bbox"][1] + tr["vy"] * dt, tr["bbox"][2], tr["bbox"][3]])
+
+    def update(self, detections, now):
+        """``detections`` are ``(class_name, score, bbox)`` tuples, as in ``hand_object``."""
+        kept = [d for d in detections if d[1] > self.min_score and d[0] != "person"]
+        predicted = [self._predict(tr, now) for tr in self.tracks]
+        ious = iou_matrix([d[2] for d in kept], predicted) if kept and predicted else None
+        nxt = []
+        for i, (name, score, bbox) in enumerate(kept):
+            best, best_iou = None, TRACK_MATCH_IOU
+            for j, tr in enumerate(self.tracks):
+                if tr["class"] == name and ious[i, j] > best_iou:
+                    best, best_iou = tr, ious[i, j]
+            vx = vy = 0.0
+            if best is not None:
+                dt = max(1.0, now - best["t"])
+                vx = _ema(best["vx"], (bbox[0] - best["bbox"][0]) / dt)
+                vy = _ema(best["vy"], (bbox[1] - best["bbox"][1]) / dt)
+            nxt.append({"class": name, "score": score, "bbox": np.asarray(bbox, dtype=np.float64), "vx": vx, "vy": vy,
+                        "t": now})
+        self.tracks = nxt
+
+    def boxes(self, now):
+        self.tracks = [tr for tr in self.tracks if now - tr["t"] <= TRACK_MAX_AGE_MS]
+        return [(tr["class"], tr["score"], self._predict(tr, now)) for tr in self.tracks]
+
+
+def _ema(prev, value):
+    return value if prev == 0 else prev + TRACK_VELOCITY_ALPHA * (value - prev)
+
+
+def hand_objects(recording, thresholds=None):
+    """Per-frame held object name, replaying detections through the box tracker."""
+    t = reba_engine.resolve_thresholds(thresholds)
+    width, height = recording["settings"].get("width", 640), recording["settings"].get("height", 480)
+    classes = recording["classes"]
+    tracker = HandBoxTracker(t["det_min_score"])
+    wrists = recording["landmarks"][:, 15:17, :2].astype(np.float64) * (width, height)
+    objects = []
+    for i in range(recording["frames"]):
+        n = int(recording["det_n"][i])
+        if not np.isnan(recording["det_t_ms"][i]):
+            detections = [(classes[c] if c < len(classes) else "", float(s), b.tolist())
+                          for c, s, b in zip(recording["det_class"][i, :n], recording["det_score"][i, :n],
+                                             recording["det_bbox"][i, :n])]
+            tracker.update(detections, recording["det_t_ms"][i])
+        boxes = tracker.boxes(recording["t_ms"][i])
+        objects.append(reba_engine.hand_object(boxes, tuple(wrists[i, 0]), tuple(wrists[i, 1]), t["det_min_score"],
+                                               t["hand_near_px"], t["hands_together_px"]))
+    return objects
+
+
+def replay(recording, thresholds=None, actual_wt=None, angle_mode=None, profile=None, objects=None):
+    """Re-score a loaded recording; returns the session summary.
+
+    ``actual_wt``, ``angle_mode`` and ``profile`` default to the recorded
+    settings.  Pass ``objects`` (from ``hand_objects``) to reuse them across
+    runs that only change scoring thresholds.
+    """
+    settings = recording["settings"]
+    session = AuditSession(
+        settings.get("operator_id", "OP-001"),
+        profile or settings.get("profile", "Male"),
+        settings.get("actual_wt", 8.0) if actual_wt is None else actual_wt,
+        settings.get("workstation", ""),
+        angle_mode=angle_mode or settings.get("angle_mode", "2d"),
+        thresholds=thresholds,
+        lift_duration=settings.get("lift_duration", "long"),
+    )
+    if objects is None:
+        objects = hand_objects(recording, thresholds)
+    session.score(recording["landmarks"], objects, recording["t_ms"] / 1000.0,
+                  settings.get("width", 640), settings.get("height", 480), recording["world"])
+    summary = session.summary()
+    summary["replayed_frames"] = recording["frames"]
+    return summary
+
+
+def _parse_value(text):
+    name, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected name=value, got {text!r}")
+    return name, value
+
+
+def _summary_line(summary):
+    pct = summary["body_part_pct"]
+    return (f"peak REBA {summary['peak_reba']:>2}  sustained {summary['sustained_reba']}  "
+            f"peak LI {summary['peak_niosh']['li'] if summary['peak_niosh'] else 0:.2f}  "
+            f"trunk 3+ {pct['trunk']['s3_4'] + pct['trunk']['s5_plus']:.1f}%  "
+            f"{summary['peak_mmh_zone']} ({summary['peak_mmh_reach']})  object {summary['object']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("session", help="session directory with a landmarks/ recording")
+    parser.add_argument("--set", type=_parse_value, action="append", default=[], metavar="NAME=VALUE",
+                        help=f"override a threshold; one of {', '.join(reba_engine.THRESHOLDS)}")
+    parser.add_argument("--sweep", type=_parse_value, metavar="NAME=V1,V2,...",
+                        help="replay once per value of one threshold")
+    parser.add_argument("--weight", type=float, help="actual weight lifted (kg); default: as recorded")
+    parser.add_argument("--angles", choices=reba_engine.ANGLE_MODES, help="default: as recorded")
+    parser.add_argument("--out", help="write the summaries as JSON")
+    args = parser.parse_args(argv)
+
+    recording = load_recording(args.session)
+    base = dict(args.set)
+    runs = [base]
+    if args.sweep:
+        name, values = args.sweep
+        runs = [{**base, name: v} for v in values.split(",")]
+    seconds = (recording["t_ms"][-1] - recording["t_ms"][0]) / 1000.0 if recording["frames"] else 0.0
+    print(f"{recording['frames']} frames ({seconds:.1f}s recorded, {recording['dropped_chunks']} chunk(s) dropped)")
+
+    summaries, objects_cache = [], {}
+    for overrides in runs:
+        thresholds = reba_engine.resolve_thresholds(overrides)
+        started = time.perf_counter()
+        key = tuple(thresholds[k] for k in OBJECT_THRESHOLDS)
+        if key not in objects_cache:
+            objects_cache[key] = hand_objects(recording, thresholds)
+        summary = replay(recording, thresholds, args.weight, args.angles, objects=objects_cache[key])
+        elapsed = time.perf_counter() - started
+        label = ", ".join(f"{k}={v}" for k, v in overrides.items()) or "defaults"
+        print(f"[{label}] {_summary_line(summary)}  ({elapsed * 1000:.0f} ms)")
+        summaries.append({"overrides": {k: thresholds[k] for k in overrides}, **summary})
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(summaries, indent=2, default=float))
+
+
+if __name__ == "__main__":
+    main()
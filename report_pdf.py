@@ -0,0 +1,433 @@
+"""Server-side REBA / MMH / NIOSH audit report with fpdf2.
+
+Renders the same pages as ``downloadPdfReport`` in the browser from a session
+summary (``session.AuditSession.summary()``, a ``session_summary`` event from
+the live component, or a ``batch_audit.py`` JSON file), plus a fourth page of
+worst-posture keyframes when the session has them.  Static content (risk
+table, MMH matrices, NIOSH formulas) is laid out once at import, and the
+reference diagram is decoded once per process and copied into each report's
+own fpdf2 image cache.
+
+    python report_pdf.py audits/*.json --out-dir reports --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from fpdf import FPDF
+from fpdf.image_datastructures import ImageCache
+
+import reba_engine
+
+DIAGRAM_PATH = Path(__file__).parent / "assets" / "recommended_weight.png"
+
+BODY_PART_ROWS = (
+    ("Trunk", "trunk"),
+    ("Neck", "neck"),
+    ("Upper Arm", "upper_arm"),
+    ("Legs", "legs"),
+    ("Wrists", "wrists"),
+)
+
+# (label, lowest score, highest score, risk level, action)
+RISK_ROWS = (
+    ("1", 1, 1, "None", "Not necessary"),
+    ("2-3", 2, 3, "Low", "May be necessary"),
+    ("4-7", 4, 7, "Medium", "Necessary"),
+    ("8-10", 8, 10, "High", "Necessary and soon"),
+    ("11-15", 11, 15, "Very high", "Necessary urgent"),
+)
+
+STEP_ROWS = (
+    ("Step 1: Neck", "neck"),
+    ("Step 2: Trunk", "trunk"),
+    ("Step 3: Legs", "legs"),
+    ("Step 7: Upper Arm", "upper_arm"),
+    ("Step 8: Lower Arm", "lower_arm"),
+    ("Step 9: Wrist", "wrist"),
+)
+
+MATRIX_ROWS = {
+    profile: tuple(
+        (zone, f"{reba_engine.MMH_LIMITS[p][z][0]:.1f} kg", f"{reba_engine.MMH_LIMITS[p][z][1]:.1f} kg")
+        for z, zone in enumerate(reba_engine.MMH_ZONES)
+    )
+    for p, profile in enumerate(reba_engine.PROFILES)
+}
+
+KEYFRAMES_PER_PAGE = 8
+KEYFRAME_JOINTS = (("Trunk", "trunk"), ("Neck", "neck"), ("Upper arm", "upper_arm"), ("Wrist", "wrist"))
+
+# (parameter, measured-value key, unit, multiplier key, formula)
+NIOSH_ROWS = (
+    ("Horizontal Multiplier (HM)", "h_cm", "cm", "hm", "25/H"),
+    ("Vertical Multiplier (VM)", "v_cm", "cm", "vm", "1-0.0033|V-75|"),
+    ("Distance Multiplier (DM)", "d_cm", "cm", "dm", "0.82 + (4.5/D)"),
+    ("Asymmetric Multiplier (AM)", "a_deg", "deg", "am", "1-0.0032(A)"),
+)
+
+
+@lru_cache(maxsize=1)
+def _diagram_cache():
+    """The reference diagram, decoded once per process; never handed to a report."""
+    cache = ImageCache()
+    if DIAGRAM_PATH.exists():
+        pdf = FPDF()
+        pdf.image_cache = cache
+        pdf.preload_image(str(DIAGRAM_PATH))
+    return cache
+
+
+def _report_image_cache():
+    """A fresh image cache per report, seeded with copies of the decoded diagram.
+
+    Snapshots and keyframes only ever enter the report's own cache, so
+    concurrent reports cannot see each other's images and nothing outlives
+    the report but the diagram.
+    """
+    diagram = _diagram_cache()
+    cache = ImageCache(icc_profiles=dict(diagram.icc_profiles), image_filter=diagram.image_filter)
+    for name, info in diagram.images.items():
+        cache.images[name] = type(info)(info, usages=0)
+    return cache
+
+
+class AuditReport(FPDF):
+    def __init__(self):
+        super().__init__(unit="mm", format="A4")
+        self.pages_total = 3
+        self.set_auto_page_break(False)
+        self.image_cache = _report_image_cache()
+
+    def centered(self, text, y):
+        self.text(105 - self.get_string_width(text) / 2, y, text)
+
+    def rule(self, y):
+        self.line(10, y, 198, y)
+
+    def highlight(self, y):
+        self.set_fill_color(255, 255, 0)
+        self.rect(10, y - 3.5, 188, 5, "F")
+
+    def footer_note(self, text):
+        self.set_font("Helvetica", "", 8)
+        self.centered(f"Page {self.page_no()} of {self.pages_total} - {text}", 285)
+
+
+def _pct(summary, part, tier):
+    return f"{summary['body_part_pct'][part][tier]:.1f}%"
+
+
+def quality_line(summary):
+    """One-line record of the adaptive capture quality, or ``None`` when it was fixed."""
+    quality = summary.get("quality") or {}
+    if not quality.get("target_fps"):
+        return None
+    levels = ", ".join(f"{name} {secs:g}s" for name, secs in quality["time_at_level_s"].items())
+    return (f"Capture quality (target {quality['target_fps']:g} FPS): {levels} - "
+            f"{len(quality['adjustments'])} adjustment(s)")
+
+
+def frequency_row(summary, niosh):
+    """FM table row: the measured lift rate and FM when lifts were segmented, else the assumed one."""
+    lifting = summary.get("lifting")
+    if lifting and lifting["lifts"] and lifting.get("fm") is not None:
+        return ("Frequency Multiplier (FM)", f"{lifting['lifts_per_min']:g} lifts/min", f"{lifting['fm']:.2f}",
+                f"Lifting Table ({lifting['duration']})")
+    return ("Frequency Multiplier (FM)", "Moderate (assumed)", f"{niosh['fm']:.2f}", "Lifting Table")
+
+
+def lifting_line(summary):
+    """One-line record of the segmented lift cycles, or ``None`` for older summaries."""
+    lifting = summary.get("lifting")
+    if lifting is None:
+        return None
+    if not lifting["lifts"]:
+        return "Measured lifts: none segmented (the table FM above is assumed)."
+    return (f"Measured lifts: {lifting['lifts']} at {lifting['lifts_per_min']:g} /min ({lifting['duration']} duration), "
+            f"mean D {lifting['mean_d_cm']:g} cm - max lift LI {lifting['max_li']:g}, "
+            f"composite LI {lifting['composite_li']:g}")
+
+
+def _page_reba(pdf, summary, snapshot):
+    peak = summary["peak_reba"]
+    angles = summary.get("peak_angles") or {}
+
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 14)
+    pdf.centered("REBA POSTURE AUDIT REPORT", 12)
+    pdf.set_font_size(10)
+    pdf.centered(f"Operator: {summary['operator_id']} | Total Duration: {summary['duration_s']:.1f} sec", 18)
+    sustained = summary.get("sustained_reba")
+    held = f" | Sustained (>= {summary['sustain_s']:g}s): {sustained:g}" if sustained is not None else ""
+    pdf.centered(f"Peak Evaluated REBA Score: {peak}{held}", 24)
+    capture = quality_line(summary)
+    if capture:
+        pdf.set_font("Helvetica", "", 7)
+        pdf.centered(capture, 28.5)
+        pdf.set_font("Helvetica", "B", 10)
+
+    y = 32
+    pdf.text(10, y, "Full-Body Posture Duration Breakdown"); y += 4
+    pdf.rule(y); y += 5
+    pdf.set_font_size(8)
+    pdf.text(12, y, "Body Part"); pdf.text(70, y, "Score 1-2 (%)")
+    pdf.text(115, y, "Score 3-4 (%)"); pdf.text(160, y, "Score 5+ (%)")
+    y += 2; pdf.rule(y); y += 5
+
+    pdf.set_font("Helvetica", "", 8)
+    for label, part in BODY_PART_ROWS:
+        pdf.text(12, y, label); pdf.text(70, y, _pct(summary, part, "s1_2"))
+        pdf.text(115, y, _pct(summary, part, "s3_4")); pdf.text(160, y, _pct(summary, part, "s5_plus"))
+        y += 5
+
+    y += 5
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.text(10, y, "REBA Standard Action & Risk Table"); y += 4
+    pdf.rule(y); y += 5
+    pdf.set_font_size(8)
+    pdf.text(12, y, "REBA Score"); pdf.text(70, y, "Risk Level"); pdf.text(130, y, "Action Required")
+    y += 2; pdf.rule(y); y += 5
+
+    for label, low, high, level, action in RISK_ROWS:
+        match = low <= peak <= high
+        if match:
+            pdf.highlight(y)
+        pdf.set_font("Helvetica", "B" if match else "", 8)
+        pdf.text(12, y, f"{'-> ' if match else ''}{label}")
+        pdf.text(70, y, level); pdf.text(130, y, action)
+        y += 5
+
+    y += 6
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.text(10, y, "Peak REBA Posture Snapshot & Step-by-Step Joint Angles"); y += 6
+
+    if snapshot is not None:
+        pdf.image(snapshot, 10, y, 90, 60)
+    else:
+        pdf.rect(10, y, 90, 60)
+        pdf.set_font_size(8)
+        pdf.text(55 - pdf.get_string_width("[ Frame Snapshot ]") / 2, y + 30, "[ Frame Snapshot ]")
+
+    table_y = y
+    pdf.set_font("Helvetica", "B", 8)
+    pdf.text(108, table_y, "REBA Step / Joint"); pdf.text(158, table_y, "Angle (°)"); pdf.text(185, table_y, "Score")
+    table_y += 2; pdf.line(108, table_y, 198, table_y); table_y += 5
+
+    pdf.set_font("Helvetica", "", 8)
+    for label, joint in STEP_ROWS:
+        angle = angles.get(joint)
+        pdf.text(108, table_y, label)
+        pdf.text(158, table_y, f"{angle:.1f}°" if angle is not None else "-")
+        pdf.text(185, table_y, f"+{angles[joint + '_score']}" if angle is not None else "-")
+        table_y += 6
+
+    pdf.footer_note("REBA Posture Risk Evaluation")
+
+
+def _page_mmh(pdf, summary):
+    profile = summary["profile"] if summary["profile"] in MATRIX_ROWS else "Male"
+    zone, reach = summary["peak_mmh_zone"], summary["peak_mmh_reach"]
+    max_limit = float(reba_engine.mmh_limit(profile, reba_engine.MMH_ZONES.index(zone), reba_engine.MMH_REACHES.index(reach)))
+
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 14)
+    pdf.centered("MANUAL WEIGHT LIFTING AUDIT", 12)
+    pdf.set_font_size(10)
+    pdf.centered(f"Operator: {summary['operator_id']} | Evaluation Profile: {profile}", 18)
+
+    y = 28
+    pdf.text(10, y, "Manual Material Handling Evaluation Summary"); y += 6
+    pdf.set_font("Helvetica", "", 9)
+    pdf.text(12, y, f"Automatically Evaluated Zone: {zone} ({reach})"); y += 5
+    pdf.text(12, y, f"Hand Detected Object: {summary['object']}"); y += 5
+    pdf.text(12, y, f"Actual Weight Lifted: {summary['actual_wt']:.1f} kg"); y += 5
+    pdf.text(12, y, f"Max Recommended Limit: {max_limit:.1f} kg"); y += 6
+
+    pdf.set_font("Helvetica", "B", 9)
+    is_safe = summary["actual_wt"] <= max_limit
+    pdf.text(12, y, f"SAFETY STATUS: {'WITHIN SAFE ERGONOMIC LIMIT' if is_safe else 'EXCEEDS SAFE ERGONOMIC LIMIT'}"); y += 10
+
+    pdf.set_font_size(10)
+    pdf.text(10, y, f"Recommended Weight Matrix Reference ({profile})"); y += 4
+    pdf.rule(y); y += 5
+    pdf.set_font_size(8)
+    pdf.text(12, y, "Height Zone"); pdf.text(90, y, "Close Reach Limit (kg)"); pdf.text(150, y, "Far Reach Limit (kg)")
+    y += 2; pdf.rule(y); y += 5
+
+    for row_zone, close, far in MATRIX_ROWS[profile]:
+        selected = row_zone == zone
+        if selected:
+            pdf.highlight(y)
+        pdf.set_font("Helvetica", "B" if selected else "", 8)
+        pdf.text(12, y, f"{'-> ' if selected else ''}{row_zone}")
+        pdf.text(90, y, close); pdf.text(150, y, far)
+        y += 5
+
+    y += 6
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.text(10, y, "Ergonomic Lifting Reference Diagram"); y += 6
+    if DIAGRAM_PATH.exists():
+        pdf.image(str(DIAGRAM_PATH), 10, y, 90, 65)
+    else:
+        pdf.rect(10, y, 90, 65)
+        pdf.set_font_size(8)
+        pdf.text(55 - pdf.get_string_width("[ recommended_weight.png ]") / 2, y + 32, "[ recommended_weight.png ]")
+
+    rec_x, rec_y = 108, y + 10
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.text(rec_x, rec_y, "Ergonomic Recommendations:"); rec_y += 6
+    pdf.set_font("Helvetica", "", 8)
+    pdf.text(rec_x, rec_y, "1. Maintain load close to body to optimize reach leverage."); rec_y += 5
+    pdf.text(rec_x, rec_y, "2. Avoid lifting above shoulder height without mechanical support.")
+
+    pdf.footer_note("Recommended Weight Limits Matrix Standard")
+
+
+def _page_niosh(pdf, summary):
+    niosh = summary.get("peak_niosh")
+
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 14)
+    pdf.centered("NIOSH LIFTING EQUATION ASSESSMENT", 12)
+    pdf.set_font_size(10)
+    pdf.centered(f"Operator: {summary['operator_id']} | Peak Dynamic Spatial Evaluation", 18)
+
+    y = 28
+    pdf.text(10, y, "1. Object & Load Condition"); y += 6
+    pdf.set_font("Helvetica", "", 8)
+    pdf.text(12, y, f"Hand Detected Object: {summary['object']}"); y += 5
+    pdf.text(12, y, f"Actual Object Weight: {summary['actual_wt']:.1f} kg"); y += 8
+
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.text(10, y, "2. Live NIOSH Multipliers & Spatial Geometry"); y += 4
+    pdf.rule(y); y += 5
+    pdf.set_font_size(8)
+    pdf.text(12, y, "Parameter / Multiplier"); pdf.text(70, y, "Measured Value")
+    pdf.text(120, y, "Multiplier Factor"); pdf.text(160, y, "Formula / Standard")
+    y += 2; pdf.rule(y); y += 5
+
+    pdf.set_font("Helvetica", "", 8)
+    rows = [("Load Constant (LC)", "23.0 kg", "1.00", "Baseline Load")]
+    if niosh:
+        rows += [(label, f"{niosh[value]:.1f} {unit}", f"{niosh[mult]:.2f}", formula)
+                 for label, value, unit, mult, formula in NIOSH_ROWS]
+        rows += [
+            frequency_row(summary, niosh),
+            ("Coupling Multiplier (CM)", "Good", f"{niosh['cm']:.2f}", "Container Grip"),
+        ]
+    for row in rows:
+        pdf.text(12, y, row[0]); pdf.text(70, y, row[1])
+        pdf.text(120, y, row[2]); pdf.text(160, y, row[3])
+        y += 5
+
+    y += 8
+    pdf.set_font("Helvetica", "B", 10)
+    pdf.text(10, y, "3. NIOSH Final Safety Assessment"); y += 6
+    pdf.set_font("Helvetica", "", 8)
+    if niosh:
+        # The peak frame is scored at the default FM; measured lifts get theirs in the lifts line.
+        pdf.text(12, y, f"Recommended Weight Limit (RWL, peak frame at default FM {niosh['fm']:.2f}): "
+                        f"{niosh['rwl']:.2f} kg"); y += 5
+        pdf.text(12, y, f"Lifting Index (LI = Actual Weight / RWL, default FM): {niosh['li']:.2f}"); y += 6
+        pdf.set_font("Helvetica", "B", 8)
+        pdf.text(12, y, f"NIOSH EVALUATION: {niosh['status']} (LI <= 1.0)"); y += 6
+        lifts = lifting_line(summary)
+        if lifts:
+            pdf.set_font("Helvetica", "", 8)
+            pdf.text(12, y, lifts)
+            pdf.set_font("Helvetica", "B", 8)
+        y += 4
+    else:
+        pdf.text(12, y, "No frames were scored in this session."); y += 10
+        pdf.set_font("Helvetica", "B", 8)
+
+    pdf.text(10, y, "Engineering Notes:"); y += 5
+    pdf.set_font("Helvetica", "", 8)
+    pdf.text(12, y, "- LI <= 1.0 indicates task is safe for most healthy industrial workers."); y += 5
+    pdf.text(12, y, "- Dynamic spatial tracking continuously evaluates horizontal reach (H) and vertical displacement (D).")
+
+    pdf.footer_note("NIOSH Lifting Equation Assessment Report")
+
+
+def _page_keyframes(pdf, summary, keyframes):
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 14)
+    pdf.centered("WORST-POSTURE KEYFRAMES", 12)
+    pdf.set_font_size(10)
+    pdf.centered(f"Operator: {summary['operator_id']} | {len(keyframes)} highest-REBA moments", 18)
+
+    for i, frame in enumerate(keyframes):
+        x, y = 10 + (i % 2) * 95, 26 + (i // 2) * 62
+        pdf.image(BytesIO(frame["jpeg"]), x, y, 60, 45)
+        pdf.set_font("Helvetica", "B", 9)
+        pdf.text(x + 62, y + 4, f"#{i + 1}  REBA {frame['reba']}")
+        pdf.set_font("Helvetica", "", 7)
+        lines = [f"t = {frame['t_s']} s", f"LI {frame.get('li', '-')}", frame.get("mmh_zone", ""), frame.get("object", ""),
+                 *(f"{label} {frame[joint]}°" for label, joint in KEYFRAME_JOINTS if joint in frame)]
+        for j, line in enumerate(lines):
+            pdf.text(x + 62, y + 9 + j * 4.5, str(line)[:24])
+
+    pdf.footer_note("Worst-Posture Keyframes")
+
+
+def build_report(summary, snapshot=None, keyframes=None):
+    """Render the report for one session summary and return the PDF bytes.
+
+    ``snapshot`` is an optional peak-posture image (path or bytes-like);
+    ``keyframes`` are the session's worst-posture frames as returned by
+    ``telemetry.load_keyframes``, which add a page and supply the snapshot
+    when none is given.
+    """
+    keyframes = keyframes[:KEYFRAMES_PER_PAGE] if keyframes else []
+    if snapshot is None and keyframes:
+        snapshot = BytesIO(keyframes[0]["jpeg"])
+    pdf = AuditReport()
+    pdf.pages_total = 4 if keyframes else 3
+    _page_reba(pdf, summary, snapshot)
+    _page_mmh(pdf, summary)
+    _page_niosh(pdf, summary)
+    if keyframes:
+        _page_keyframes(pdf, summary, keyframes)
+    return bytes(pdf.output())
+
+
+def report_filename(summary):
+    tag = summary.get("session_id") or (Path(summary["source"]).stem if summary.get("source") else "")
+    return f"REBA_NIOSH_Audit_{summary['operator_id']}{'_' + tag if tag else ''}.pdf"
+
+
+def write_report(summary, out_dir):
+    out_path = Path(out_dir) / report_filename(summary)
+    out_path.write_bytes(build_report(summary, summary.get("peak_frame_path")))
+    return out_path
+
+
+def generate_reports(summaries, out_dir, workers=None):
+    """Render many reports in parallel; returns the written paths in input order."""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers or os.cpu_count(), mp_context=ctx) as pool:
+        return list(pool.map(write_report, summaries, [out_dir] * len(summaries), chunksize=8))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("summaries", nargs="+", help="session summary JSON files")
+    parser.add_argument("--out-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    summaries = [json.loads(Path(p).read_text()) for p in args.summaries]
+    for path in generate_reports(summaries, args.out_dir, args.workers):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
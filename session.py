@@ -0,0 +1,152 @@
+"""Per-operator audit session state, mirroring the globals kept by ``onResults``.
+
+``AuditSession`` holds what the browser keeps between frames (tier counters,
+peak REBA, the peak posture's angles / NIOSH / MMH snapshot, the NIOSH wrist
+baseline and the last held object) and produces the summary dict the report and
+store use.  Rolling and sustained (worst posture held for ``sustain_s``) REBA /
+LI come from ``window_stats.PostureWindows``, updated frame by frame; the peak
+posture is the frame at which the sustained REBA last improved (the worst
+single frame until a posture has been held that long).  ``angle_mode``
+selects the joint angles (``reba_engine.ANGLE_MODES``) and ``thresholds``
+overrides scoring cut-offs (``reba_engine.THRESHOLDS``).  Lifts are segmented
+from the wrist height and held object by ``lifting.LiftSegmenter``, with the
+NIOSH frequency multiplier for the ``lift_duration`` work-duration category.
+"""
+
+import numpy as np
+
+import reba_engine
+from lifting import LiftSegmenter
+from window_stats import PostureWindows
+
+PEAK_ANGLE_KEYS = reba_engine.JOINTS + tuple(f"{j}_score" for j in reba_engine.JOINTS)
+NIOSH_KEYS = ("rwl", "li", "am", "hm", "vm", "dm", "fm", "cm", "h_cm", "v_cm", "d_cm", "a_deg")
+
+
+class AuditSession:
+    def __init__(self, operator_id="OP-001", profile="Male", actual_wt=8.0, workstation="", rolling_s=10.0, sustain_s=3.0,
+                 angle_mode="2d", thresholds=None, lift_duration="long"):
+        self.operator_id = operator_id
+        self.workstation = workstation
+        self.profile = profile
+        self.angle_mode = angle_mode
+        self.thresholds = reba_engine.resolve_thresholds(thresholds)
+        self.actual_wt = float(actual_wt)
+        self.initial_wrist_v = None
+        self.total_frames = 0
+        self.body_part_frames = {part: {tier: 0 for tier in reba_engine.TIERS} for part in reba_engine.BODY_PARTS}
+        self.peak_reba = 1
+        self.peak_angles = None
+        self.peak_niosh = None
+        self.peak_mmh_zone = "Shoulder to Elbow"
+        self.peak_mmh_reach = "Close Reach"
+        self.peak_frame_index = None
+        self.persist_object = reba_engine.NO_OBJECT
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.windows = PostureWindows(rolling_s, sustain_s)
+        self.lifting = LiftSegmenter(lift_duration, self.actual_wt)
+
+    def score(self, landmarks, objects, timestamps, width=640, height=480, world_landmarks=None):
+        """Score a chunk of frames and fold them into the session.
+
+        ``objects`` holds the per-frame hand object name, ``timestamps`` the
+        per-frame time in seconds.  Returns the per-frame score arrays.
+        """
+        objects = np.asarray(objects, dtype=object)
+        present = objects != reba_engine.NO_OBJECT
+        scores = reba_engine.score_frames(landmarks, self.actual_wt, present, width, height, self.initial_wrist_v,
+                                           self.angle_mode, self.thresholds, world_landmarks)
+        if self.initial_wrist_v is None and len(scores["v_cm"]):
+            self.initial_wrist_v = float(scores["v_cm"][0])
+        self.update(scores, objects, timestamps)
+        return scores
+
+    def update(self, scores, objects, timestamps):
+        n = len(scores["reba"])
+        if n == 0:
+            return
+        for part, counts in reba_engine.tier_breakdown(scores).items():
+            for tier, count in counts.items():
+                self.body_part_frames[part][tier] += count
+
+        held = [o for o in objects if o != reba_engine.NO_OBJECT]
+        if held:
+            self.persist_object = held[-1]
+
+        if self.first_timestamp is None:
+            self.first_timestamp = float(timestamps[0])
+        self.last_timestamp = float(timestamps[-1])
+        frames = zip(np.asarray(timestamps, dtype=np.float64).tolist(), scores["reba"].tolist(), scores["li"].tolist(),
+                     scores["h_cm"].tolist(), scores["v_cm"].tolist(), scores["a_deg"].tolist(),
+                     scores["mmh_zone"].tolist(), (np.asarray(objects, dtype=object) != reba_engine.NO_OBJECT).tolist())
+        improved = None
+        for i, (t, reba, li, h_cm, v_cm, a_deg, zone, held) in enumerate(frames):
+            if self.windows.push(t, reba, li):
+                improved = i
+            self.lifting.push(t, h_cm, v_cm, a_deg, reba_engine.MMH_ZONES[zone], held)
+
+        # Peaks only move on strict improvement, as in the JS.  The peak posture
+        # follows the sustained REBA, and the worst frame until there is one.
+        reba = scores["reba"]
+        chunk_peak = int(reba.max())
+        if chunk_peak > self.peak_reba:
+            self.peak_reba = chunk_peak
+            if improved is None and self.windows.sustained_reba is None:
+                self._record_peak(scores, int(np.argmax(reba == chunk_peak)))
+        if improved is not None:
+            self._record_peak(scores, improved)
+        self.total_frames += n
+
+    def _record_peak(self, scores, i):
+        self.peak_frame_index = self.total_frames + i
+        self.peak_angles = {k: scores[k][i].item() for k in PEAK_ANGLE_KEYS}
+        self.peak_niosh = {k: scores[k][i].item() for k in NIOSH_KEYS}
+        self.peak_niosh["status"] = "SAFE" if self.peak_niosh["li"] <= 1.0 else "HIGH RISK"
+        self.peak_mmh_zone = reba_engine.MMH_ZONES[scores["mmh_zone"][i]]
+        self.peak_mmh_reach = reba_engine.MMH_REACHES[scores["mmh_reach"][i]]
+
+    @property
+    def duration_s(self):
+        if self.first_timestamp is None:
+            return 0.0
+        return self.last_timestamp - self.first_timestamp
+
+    def body_part_pct(self):
+        if self.total_frames == 0:
+            return {part: {tier: 0.0 for tier in reba_engine.TIERS} for part in reba_engine.BODY_PARTS}
+        return {
+            part: {tier: 100.0 * count / self.total_frames for tier, count in tiers.items()}
+            for part, tiers in self.body_part_frames.items()
+        }
+
+    def summary(self):
+        return {
+            "operator_id": self.operator_id,
+            "workstation": self.workstation,
+            "profile": self.profile,
+            "actual_wt": self.actual_wt,
+            "angle_mode": self.angle_mode,
+            "thresholds": {k: v for k, v in self.thresholds.items() if v != reba_engine.THRESHOLDS[k]},
+            "duration_s": round(self.duration_s, 1),
+            "total_frames": self.total_frames,
+            "peak_reba": self.peak_reba,
+            "peak_angles": self.peak_angles,
+            "peak_niosh": self.peak_niosh,
+            "peak_mmh_zone": self.peak_mmh_zone,
+            "peak_mmh_reach": self.peak_mmh_reach,
+            "mmh_limit": float(reba_engine.mmh_limit(
+                self.profile,
+                reba_engine.MMH_ZONES.index(self.peak_mmh_zone),
+                reba_engine.MMH_REACHES.index(self.peak_mmh_reach),
+            )),
+            "sustain_s": self.windows.sustain_s,
+            "sustained_reba": self.windows.sustained_reba,
+            "sustained_li": self.windows.sustained_li,
+            "sustained_at_s": (None if self.windows.sustained_reba_at is None
+                               else round(self.windows.sustained_reba_at - self.first_timestamp, 1)),
+            "object": self.persist_object,
+            "body_part_frames": self.body_part_frames,
+            "body_part_pct": self.body_part_pct(),
+            "lifting": self.lifting.summary(),
+        }
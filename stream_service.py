@@ -0,0 +1,305 @@
+"""Concurrent multi-camera REBA / NIOSH / MMH auditing on one edge node.
+
+An asyncio front end reads every source (RTSP URLs, camera indices, or local
+files as stand-ins) and keeps only the newest frame per stream: when inference
+falls behind, stale frames are dropped rather than queued, so latency stays
+bounded and the drop rate shows how far over capacity the node is.  Pose and
+object detection run in a pool of worker processes; each stream is pinned to
+one worker so Pose keeps its temporal smoothing.  Scoring state (peaks, tier
+counters, NIOSH baseline, held object) lives in one ``AuditSession`` per stream.
+
+    python stream_service.py rtsp://cam1/stream rtsp://cam2/stream --workers 4
+    python stream_service.py recordings/*.mp4 --duration 60 --out stream_report.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+import numpy as np
+
+import reba_engine
+from session import AuditSession
+from vision import DETECTION_REGIONS
+
+CHUNK_FRAMES = 32
+REPORT_EVERY_S = 5.0
+# Latency percentiles cover this many of the most recent frames per stream.
+LATENCY_WINDOW = 1000
+
+_detector = None
+_det_region = "full"
+_poses = {}
+
+
+def _init_worker(weights, det_region="full", threads=None):
+    global _detector, _det_region
+    from detectors import make_detector
+
+    _detector = make_detector(weights, threads) if weights else None
+    _det_region = det_region
+
+
+def _infer(stream_id, frame_bgr):
+    """Pose + detection for one frame in a worker; returns ``(landmarks, object_name)``."""
+    import cv2
+    from vision import PoseEstimator, wrist_pixels
+
+    if stream_id not in _poses:
+        _poses[stream_id] = PoseEstimator()
+    lm = _poses[stream_id].process(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB))
+    if lm is None:
+        return None, reba_engine.NO_OBJECT
+    height, width = frame_bgr.shape[:2]
+    if _detector is None:
+        detections = []
+    elif _det_region == "wrists":
+        detections = _detector.detect_near_hands(frame_bgr, lm)
+    else:
+        detections = _detector.detect(frame_bgr)
+    left, right = wrist_pixels(lm, width, height)
+    return lm, reba_engine.hand_object(detections, left, right)
+
+
+def _close_stream(stream_id):
+    pose = _poses.pop(stream_id, None)
+    if pose is not None:
+        pose.close()
+
+
+def display_source(source):
+    """``source`` without URL credentials (user info, query, fragment), for summaries and reports."""
+    parts = urlsplit(source)
+    if not parts.scheme or not parts.netloc:
+        return source
+    host = parts.netloc.rpartition("@")[2]
+    return urlunsplit((parts.scheme, host, parts.path, "", ""))
+
+
+def _open(source):
+    import cv2
+
+    cap = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    if not cap.isOpened():
+        raise IOError(f"cannot open source {source}")
+    return cap
+
+
+class LatestFrame:
+    """Single-slot queue: a new frame replaces one not yet picked up.
+
+    ``close`` ends the stream without going through the slot, so the last
+    frame is still delivered: ``get`` returns ``None`` only once the slot is
+    closed and empty.
+    """
+
+    def __init__(self):
+        self._item = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        if self._item is not None:
+            self.dropped += 1
+        self._item = item
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def get(self):
+        while self._item is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        item, self._item = self._item, None
+        return item
+
+
+class StreamStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.captured = 0
+        self.processed = 0
+        self.no_pose = 0
+        self.latency_ms = deque(maxlen=LATENCY_WINDOW)
+        self.latency_max_ms = 0.0
+
+    def add_latency(self, ms):
+        self.latency_ms.append(ms)
+        self.latency_max_ms = max(self.latency_max_ms, ms)
+
+    def report(self, dropped):
+        """Counts and rates since the start; latency percentiles over the last ``LATENCY_WINDOW`` frames."""
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        lat = np.asarray(self.latency_ms) if self.latency_ms else np.zeros(1)
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "dropped": dropped,
+            "no_pose": self.no_pose,
+            "drop_pct": round(100.0 * dropped / max(self.captured, 1), 1),
+            "input_fps": round(self.captured / elapsed, 1),
+            "output_fps": round(self.processed / elapsed, 1),
+            "latency_p50_ms": round(float(np.percentile(lat, 50)), 1),
+            "latency_p95_ms": round(float(np.percentile(lat, 95)), 1),
+            "latency_max_ms": round(self.latency_max_ms, 1),
+        }
+
+
+class Stream:
+    def __init__(self, stream_id, source, worker, profile="Male", actual_wt=8.0):
+        self.stream_id = stream_id
+        self.source = source
+        self.worker = worker
+        self.session = AuditSession(stream_id, profile, actual_wt, workstation=display_source(source))
+        self.slot = LatestFrame()
+        self.stats = StreamStats()
+        self.size = (640, 480)
+        self.error = None
+        self.landmarks, self.objects, self.timestamps = [], [], []
+
+    async def read(self, realtime, stop):
+        """Push frames into the slot; files are paced at their own frame rate."""
+        import cv2
+
+        loop = asyncio.get_running_loop()
+        cap = None
+        try:
+            cap = await loop.run_in_executor(None, _open, self.source)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            is_file = os.path.exists(self.source)
+            start = time.perf_counter()
+            while not stop.is_set():
+                ok, frame = await loop.run_in_executor(None, cap.read)
+                if not ok:
+                    break
+                captured = time.perf_counter()
+                self.stats.captured += 1
+                self.slot.put((captured - start, captured, frame))
+                if realtime and is_file:
+                    await asyncio.sleep(max(0.0, start + self.stats.captured / fps - time.perf_counter()))
+        except IOError as exc:
+            self.error = str(exc)
+        finally:
+            if cap is not None:
+                cap.release()
+            self.slot.close()
+
+    async def infer(self):
+        loop = asyncio.get_running_loop()
+        while (item := await self.slot.get()) is not None:
+            ts, captured, frame = item
+            lm, obj = await loop.run_in_executor(self.worker, _infer, self.stream_id, frame)
+            self.stats.add_latency((time.perf_counter() - captured) * 1000)
+            self.stats.processed += 1
+            if lm is None:
+                self.stats.no_pose += 1
+                continue
+            self.size = (frame.shape[1], frame.shape[0])
+            self.landmarks.append(lm)
+            self.objects.append(obj)
+            self.timestamps.append(ts)
+            if len(self.landmarks) >= CHUNK_FRAMES:
+                self.flush()
+        self.flush()
+        await loop.run_in_executor(self.worker, _close_stream, self.stream_id)
+
+    def flush(self):
+        if self.landmarks:
+            self.session.score(np.stack(self.landmarks), self.objects, self.timestamps, *self.size)
+            self.landmarks.clear(); self.objects.clear(); self.timestamps.clear()
+
+    def report(self):
+        return {"stream_id": self.stream_id, "source": display_source(self.source), "peak_reba": self.session.peak_reba,
+                "error": self.error, **self.stats.report(self.slot.dropped)}
+
+
+def _print_reports(streams):
+    for s in streams:
+        r = s.report()
+        print(f"{r['stream_id']:>8}  in {r['input_fps']:5.1f} fps  out {r['output_fps']:5.1f} fps  "
+              f"drop {r['drop_pct']:5.1f}%  p50 {r['latency_p50_ms']:6.1f} ms  p95 {r['latency_p95_ms']:6.1f} ms  "
+              f"peak REBA {r['peak_reba']}")
+
+
+async def _reporter(streams, every, stop):
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), every)
+        except asyncio.TimeoutError:
+            _print_reports(streams)
+
+
+async def run(sources, workers=None, weights="yolov8n.pt", profile="Male", actual_wt=8.0,
+              duration=None, realtime=True, report_every=REPORT_EVERY_S, det_region="full"):
+    """Audit every source concurrently; returns ``{"streams": [...], "summaries": [...]}``."""
+    workers = min(workers or os.cpu_count(), len(sources))
+    ctx = multiprocessing.get_context("spawn")
+    pool = [ProcessPoolExecutor(1, mp_context=ctx, initializer=_init_worker,
+                                initargs=(weights, det_region, max(1, os.cpu_count() // workers)))
+            for _ in range(workers)]
+    streams = [Stream(f"CAM-{i + 1:02d}", src, pool[i % workers], profile, actual_wt)
+               for i, src in enumerate(sources)]
+    stop = asyncio.Event()
+    try:
+        readers = [asyncio.create_task(s.read(realtime, stop)) for s in streams]
+        inferers = [asyncio.create_task(s.infer()) for s in streams]
+        reporter = asyncio.create_task(_reporter(streams, report_every, stop))
+        await asyncio.wait(readers, timeout=duration)
+        # Readers stop at their next frame and close their slot; inference drains it and flushes.
+        stop.set()
+        await asyncio.gather(*readers, *inferers)
+        await reporter
+    finally:
+        for executor in pool:
+            executor.shutdown()
+
+    reports = [s.report() for s in streams]
+    processed = sum(r["processed"] for r in reports)
+    elapsed = max(max(time.perf_counter() - s.stats.started for s in streams), 1e-9)
+    return {
+        "workers": workers,
+        "total_output_fps": round(processed / elapsed, 1),
+        "streams": reports,
+        "summaries": [s.session.summary() for s in streams],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("sources", nargs="+", help="RTSP URLs, camera indices or video files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="inference worker processes")
+    parser.add_argument("--weights", default="yolov8n.pt",
+                        help="YOLOv8 weights, .pt or .onnx ('' disables object detection)")
+    parser.add_argument("--det-region", choices=DETECTION_REGIONS, default="full",
+                        help="detect objects in the whole frame or only around the wrists")
+    parser.add_argument("--profile", choices=reba_engine.PROFILES, default="Male")
+    parser.add_argument("--weight", type=float, default=8.0, help="actual weight lifted (kg)")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--no-realtime", action="store_true", help="read files as fast as possible instead of at their frame rate")
+    parser.add_argument("--report-every", type=float, default=REPORT_EVERY_S)
+    parser.add_argument("--out", help="write stream stats and session summaries as JSON")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args.sources, args.workers, args.weights, args.profile, args.weight,
+                             args.duration, not args.no_realtime, args.report_every, args.det_region))
+    print(f"total {result['total_output_fps']} fps over {len(args.sources)} stream(s), {result['workers']} worker(s)")
+    for r in result["streams"]:
+        print(json.dumps(r))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
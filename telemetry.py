@@ -0,0 +1,225 @@
+"""Columnar per-frame session telemetry.
+
+The live component batches each frame's angles, joint scores, REBA, RWL / LI
+and MMH zone into fixed-size column chunks and flushes them gzip-compressed as
+``telemetry`` events.  ``TelemetryStore`` appends every column to its own
+``.npy`` file per session, so analytics can memory-map just the columns they
+need::
+
+    cols = telemetry.load_columns("sessions/abc123-1712345678", ["t_ms", "reba", "li"])
+
+Sessions recorded for replay also carry a ``landmarks`` stream (raw float16
+landmarks and detections, see ``replay.py``) in a ``landmarks/`` subdirectory,
+and the worst-posture keyframe gallery (``keyframes`` event) is written as
+JPEG files with a ``keyframes.json`` index in ``keyframes/``, next to the
+peak-posture snapshot (``peak.jpg``).
+"""
+
+import base64
+import gzip
+import json
+import os
+import re
+import struct
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_ROOT = Path(os.environ.get("REBA_SESSION_DIR", "sessions"))
+
+# Column dtypes used by frontend/telemetry.js; chunks carry their own layout.
+DTYPES = {"f8": "<f8", "f4": "<f4", "f2": "<f2", "u1": "u1"}
+# Payload fields of the chunk itself; anything else is stream metadata.
+_CHUNK_FIELDS = {"session_id", "chunk", "frames", "columns", "encoding", "dropped", "data"}
+
+# Session ids and column names come from the browser and become paths: only
+# these are accepted (frontend/telemetry.js TELEMETRY_COLUMNS / LANDMARK_COLUMNS).
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+STREAM_COLUMNS = {
+    None: frozenset({"t_ms", "trunk", "neck", "legs", "upper_arm", "lower_arm", "wrist", "trunk_score", "neck_score",
+                     "legs_score", "upper_arm_score", "lower_arm_score", "wrist_score", "reba", "rwl", "li",
+                     "mmh_zone", "mmh_reach", "object"}),
+    "landmarks": frozenset({"t_ms", "landmarks", "world", "det_t_ms", "det_n", "det_class", "det_score", "det_bbox"}),
+}
+SUBDIRS = {"landmarks", "keyframes"}
+PEAK_SNAPSHOT = "peak.jpg"
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Fixed header size so the shape can be rewritten in place as rows are appended.
+_NPY_HEADER_LEN = 128
+
+
+def _write_npy_header(f, dtype, shape):
+    header = repr({"descr": np.dtype(dtype).str, "fortran_order": False, "shape": tuple(shape)})
+    pad = _NPY_HEADER_LEN - len(_NPY_MAGIC) - 2 - len(header) - 1
+    f.seek(0)
+    f.write(_NPY_MAGIC + struct.pack("<H", _NPY_HEADER_LEN - len(_NPY_MAGIC) - 2) + header.encode("latin1") + b" " * pad + b"\n")
+
+
+def _read_npy_header(f):
+    f.seek(0)
+    if np.lib.format.read_magic(f) != (1, 0):
+        raise ValueError(f"{f.name} was not written by append_npy")
+    shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+    if f.tell() != _NPY_HEADER_LEN:
+        raise ValueError(f"{f.name} was not written by append_npy")
+    return dtype, shape
+
+
+def append_npy(path, values):
+    """Append rows (a 1-D or 2-D array) to an ``.npy`` file, creating it if needed.
+
+    The row count comes from the header, so bytes of an interrupted append
+    past the last complete row are overwritten rather than counted.
+    """
+    values = np.ascontiguousarray(values)
+    path = Path(path)
+    row_shape = values.shape[1:]
+    row_bytes = values.dtype.itemsize * int(np.prod(row_shape, dtype=np.int64))
+    if row_bytes == 0:
+        raise ValueError(f"cannot append zero-width rows of shape {values.shape} to {path}")
+    if not path.exists():
+        with open(path, "wb") as f:
+            _write_npy_header(f, values.dtype, (0, *row_shape))
+    with open(path, "r+b") as f:
+        dtype, shape = _read_npy_header(f)
+        if dtype != values.dtype or shape[1:] != row_shape:
+            raise ValueError(f"cannot append {values.dtype} rows of shape {row_shape} to {path} "
+                             f"({dtype} rows of shape {shape[1:]})")
+        existing = shape[0]
+        f.truncate(_NPY_HEADER_LEN + existing * row_bytes)
+        f.seek(_NPY_HEADER_LEN + existing * row_bytes)
+        f.write(values.tobytes())
+        # Data first, header last: an interrupted append never exposes partial rows.
+        _write_npy_header(f, values.dtype, (existing + len(values), *row_shape))
+
+
+def decode_chunk(payload):
+    """Split a ``telemetry`` event payload into ``{column: ndarray}``.
+
+    Columns are ``[name, code]`` or ``[name, code, width]``; a column with
+    several values per frame comes back with shape ``(frames, width)``.
+    """
+    raw = base64.b64decode(payload["data"])
+    if payload.get("encoding") == "gzip":
+        raw = gzip.decompress(raw)
+    n = payload["frames"]
+    columns, offset = {}, 0
+    for name, code, *width in payload["columns"]:
+        dtype = np.dtype(DTYPES[code])
+        width = width[0] if width else 1
+        values = np.frombuffer(raw, dtype=dtype, count=n * width, offset=offset)
+        columns[name] = values if width == 1 else values.reshape(n, width)
+        offset += n * width * dtype.itemsize
+    if offset != len(raw):
+        raise ValueError(f"telemetry chunk size mismatch: expected {offset} bytes, got {len(raw)}")
+    return columns
+
+
+class TelemetryStore:
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+
+    def session_dir(self, session_id, stream=None):
+        """Directory of a session (or of one of its ``SUBDIRS``); ``ValueError`` for ids that are not plain names."""
+        if not isinstance(session_id, str) or not SESSION_ID_PATTERN.fullmatch(session_id):
+            raise ValueError(f"invalid session id {session_id!r}")
+        if stream is not None and stream not in SUBDIRS:
+            raise ValueError(f"unknown session stream {stream!r}")
+        path = self.root / session_id / stream if stream else self.root / session_id
+        if not path.resolve().is_relative_to(self.root.resolve()):
+            raise ValueError(f"session directory {path} is outside {self.root}")
+        return path
+
+    def _read_meta(self, session_dir):
+        meta_path = session_dir / "meta.json"
+        if meta_path.exists():
+            return json.loads(meta_path.read_text())
+        return {"frames": 0, "chunks": [], "columns": {}, "dropped_chunks": 0}
+
+    def append_chunk(self, payload, stream=None):
+        """Append one chunk; chunks already stored (re-sent before an ack) are skipped.
+
+        ``stream`` names a subdirectory for a second recorder of the session;
+        its chunk header fields beyond the columns are merged into ``meta["info"]``.
+        """
+        session_dir = self.session_dir(payload["session_id"], stream)
+        unknown = {column[0] for column in payload["columns"]} - STREAM_COLUMNS[stream]
+        if unknown:
+            raise ValueError(f"unknown {stream or 'telemetry'} columns: {sorted(map(str, unknown))}")
+        session_dir.mkdir(parents=True, exist_ok=True)
+        meta = self._read_meta(session_dir)
+        if payload["chunk"] in meta["chunks"]:
+            return meta
+        for name, values in decode_chunk(payload).items():
+            append_npy(session_dir / f"{name}.npy", values)
+            meta["columns"][name] = values.dtype.str
+        meta["frames"] += payload["frames"]
+        meta["chunks"].append(payload["chunk"])
+        meta["dropped_chunks"] = payload.get("dropped", meta["dropped_chunks"])
+        info = {k: v for k, v in payload.items() if k not in _CHUNK_FIELDS}
+        if info:
+            meta["info"] = {**meta.get("info", {}), **info}
+        (session_dir / "meta.json").write_text(json.dumps(meta))
+        return meta
+
+    def write_timing(self, payload):
+        """Store a ``stage_timing`` event (per-stage latency histograms) with its session."""
+        session_dir = self.session_dir(payload["session_id"])
+        session_dir.mkdir(parents=True, exist_ok=True)
+        path = session_dir / "timing.json"
+        path.write_text(json.dumps(payload))
+        return path
+
+    def write_keyframes(self, payload):
+        """Store a ``keyframes`` event: one JPEG per frame, worst first, plus their details.
+
+        The peak-posture snapshot, when the event has one, goes to ``peak.jpg``.
+        """
+        out_dir = self.session_dir(payload["session_id"], "keyframes")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        index = []
+        for i, frame in enumerate(payload["frames"]):
+            name = f"{i:02d}.jpg"
+            (out_dir / name).write_bytes(base64.b64decode(frame["jpeg"]))
+            index.append({**{k: v for k, v in frame.items() if k != "jpeg"}, "file": name})
+        peak = payload.get("peak")
+        if peak:
+            (out_dir / PEAK_SNAPSHOT).write_bytes(base64.b64decode(peak["jpeg"]))
+            peak = {**{k: v for k, v in peak.items() if k != "jpeg"}, "file": PEAK_SNAPSHOT}
+        keep = {f["file"] for f in index} | ({PEAK_SNAPSHOT} if peak else set())
+        for stale in out_dir.glob("*.jpg"):
+            if stale.name not in keep:
+                stale.unlink()
+        (out_dir / "keyframes.json").write_text(json.dumps({"min_gap_s": payload.get("min_gap_s"), "frames": index,
+                                                            "peak": peak}))
+        return out_dir
+
+
+def load_columns(session_dir, columns=None):
+    """Memory-map the requested columns (all by default) of a stored session."""
+    session_dir = Path(session_dir)
+    if columns is None:
+        columns = json.loads((session_dir / "meta.json").read_text())["columns"]
+    return {name: np.load(session_dir / f"{name}.npy", mmap_mode="r") for name in columns}
+
+
+def load_keyframes(session_dir):
+    """The stored keyframes of a session, worst first, each with its ``jpeg`` bytes; ``[]`` if none."""
+    path = Path(session_dir) / "keyframes" / "keyframes.json"
+    if not path.exists():
+        return []
+    frames = json.loads(path.read_text())["frames"]
+    return [{**f, "jpeg": (path.parent / f["file"]).read_bytes()} for f in frames]
+
+
+def load_peak_snapshot(session_dir):
+    """The JPEG bytes of a session's peak-posture snapshot, or ``None``."""
+    path = Path(session_dir) / "keyframes" / PEAK_SNAPSHOT
+    return path.read_bytes() if path.exists() else None
+
+
+def load_timing(session_dir):
+    """The stored stage-timing histograms of a session, or ``None``."""
+    path = Path(session_dir) / "timing.json"
+    return json.loads(path.read_text()) if path.exists() else None
@@ -0,0 +1,163 @@
+"""Multi-person REBA auditing with stable track IDs.
+
+People are found by the object detector (``person`` boxes), associated across
+frames by a greedy IoU tracker, and each track runs Pose on its own crop with
+its own ``AuditSession``: peaks, tier counters, NIOSH baseline and held object
+are all per operator.  Work per frame is one detection plus one Pose call per
+person in view.
+"""
+
+import numpy as np
+
+import reba_engine
+from session import AuditSession
+
+PERSON_MIN_SCORE = 0.5
+CROP_MARGIN = 0.15
+CHUNK_FRAMES = 64
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of ``[x, y, w, h]`` boxes, shape ``(len(a), len(b))``."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.clip(np.minimum(ax2[:, None], bx2) - np.maximum(a[:, None, 0], b[:, 0]), 0, None)
+    ih = np.clip(np.minimum(ay2[:, None], by2) - np.maximum(a[:, None, 1], b[:, 1]), 0, None)
+    inter = iw * ih
+    union = (a[:, 2] * a[:, 3])[:, None] + b[:, 2] * b[:, 3] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class IoUTracker:
+    """Greedy IoU association; a track survives ``max_missed`` frames unseen."""
+
+    def __init__(self, min_iou=0.3, max_missed=15):
+        self.min_iou = min_iou
+        self.max_missed = max_missed
+        self.tracks = {}
+        self._next_id = 1
+
+    def update(self, boxes):
+        """Returns ``(active, ended)``: ``{track_id: box}`` seen this frame and IDs just dropped."""
+        ids = list(self.tracks)
+        iou = iou_matrix([self.tracks[i]["box"] for i in ids], boxes) if ids and len(boxes) else np.zeros((len(ids), len(boxes)))
+        active, used = {}, set()
+        for flat in np.argsort(-iou, axis=None):
+            t, d = np.unravel_index(flat, iou.shape)
+            if iou[t, d] < self.min_iou:
+                break
+            if ids[t] in active or d in used:
+                continue
+            active[ids[t]] = boxes[d]
+            used.add(d)
+        for d, box in enumerate(boxes):
+            if d not in used:
+                active[self._next_id] = box
+                self._next_id += 1
+
+        ended = []
+        for track_id in ids:
+            if track_id not in active:
+                self.tracks[track_id]["missed"] += 1
+                if self.tracks[track_id]["missed"] > self.max_missed:
+                    del self.tracks[track_id]
+                    ended.append(track_id)
+        for track_id, box in active.items():
+            self.tracks[track_id] = {"box": list(box), "missed": 0}
+        return active, ended
+
+
+def crop_box(box, width, height, margin=CROP_MARGIN):
+    """Integer crop ``(x0, y0, x1, y1)`` around a box, padded and clipped to the frame."""
+    x, y, w, h = box
+    x0 = int(max(0, x - margin * w)); y0 = int(max(0, y - margin * h))
+    x1 = int(min(width, x + w + margin * w)); y1 = int(min(height, y + h + margin * h))
+    return x0, y0, x1, y1
+
+
+def crop_to_frame(landmarks, crop, width, height):
+    """Map crop-normalised landmarks back to frame-normalised coordinates."""
+    x0, y0, x1, y1 = crop
+    out = landmarks.copy()
+    out[:, 0] = (landmarks[:, 0] * (x1 - x0) + x0) / width
+    out[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / height
+    out[:, 2] = landmarks[:, 2] * (x1 - x0) / width
+    return out
+
+
+class _Track:
+    def __init__(self, session, pose):
+        self.session = session
+        self.pose = pose
+        self.landmarks, self.objects, self.timestamps = [], [], []
+
+    def flush(self, width, height):
+        if self.landmarks:
+            self.session.score(np.stack(self.landmarks), self.objects, self.timestamps, width, height)
+            self.landmarks.clear(); self.objects.clear(); self.timestamps.clear()
+
+
+class MultiPersonAuditor:
+    def __init__(self, pose_factory, operator_prefix="TRACK", profile="Male", actual_wt=8.0, angle_mode="2d",
+                 lift_duration="long"):
+        self.pose_factory = pose_factory
+        self.operator_prefix = operator_prefix
+        self.profile = profile
+        self.actual_wt = actual_wt
+        self.angle_mode = angle_mode
+        self.lift_duration = lift_duration
+        self.tracker = IoUTracker()
+        self.tracks = {}
+        self.finished = {}
+        self.width = self.height = None
+
+    def _track(self, track_id):
+        if track_id not in self.tracks:
+            session = AuditSession(f"{self.operator_prefix}-{track_id}", self.profile, self.actual_wt,
+                                   angle_mode=self.angle_mode, lift_duration=self.lift_duration)
+            self.tracks[track_id] = _Track(session, self.pose_factory())
+        return self.tracks[track_id]
+
+    def _end(self, track_id):
+        track = self.tracks.pop(track_id, None)
+        if track is not None:
+            track.flush(self.width, self.height)
+            track.pose.close()
+            self.finished[track_id] = track.session
+
+    def process(self, frame_rgb, timestamp, detections):
+        """Run per-person pose for one frame; returns ``{track_id: landmarks}`` in frame coordinates."""
+        self.height, self.width = frame_rgb.shape[:2]
+        people = [bbox for name, score, bbox in detections if name == "person" and score > PERSON_MIN_SCORE]
+        objects = [d for d in detections if d[0] != "person"]
+        active, ended = self.tracker.update(people)
+        for track_id in ended:
+            self._end(track_id)
+
+        frame_landmarks = {}
+        for track_id, box in active.items():
+            crop = crop_box(box, self.width, self.height)
+            x0, y0, x1, y1 = crop
+            if x1 - x0 < 8 or y1 - y0 < 8:
+                continue
+            track = self._track(track_id)
+            lm = track.pose.process(np.ascontiguousarray(frame_rgb[y0:y1, x0:x1]))
+            if lm is None:
+                continue
+            lm = crop_to_frame(lm, crop, self.width, self.height)
+            left, right = (lm[15, 0] * self.width, lm[15, 1] * self.height), (lm[16, 0] * self.width, lm[16, 1] * self.height)
+            track.landmarks.append(lm)
+            track.objects.append(reba_engine.hand_object(objects, left, right))
+            track.timestamps.append(timestamp)
+            if len(track.landmarks) >= CHUNK_FRAMES:
+                track.flush(self.width, self.height)
+            frame_landmarks[track_id] = lm
+        return frame_landmarks
+
+    def finish(self):
+        """Flush every track and return ``{track_id: summary}``."""
+        for track_id in list(self.tracks):
+            self._end(track_id)
+        return {track_id: session.summary() for track_id, session in sorted(self.finished.items())}
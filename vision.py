@@ -0,0 +1,119 @@
+"""Server-side pose and object detection models.
+
+Thin wrappers around MediaPipe Pose and Ultralytics YOLOv8 that return the
+same shapes the browser code works with: a ``(33, 4)`` landmark array in
+normalised coordinates and coco-ssd style ``(class_name, score, [x, y, w, h])``
+detections in pixels.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+POSE_OPTIONS = {"model_complexity": 0, "smooth_landmarks": True, "min_detection_confidence": 0.5}
+YOLO_WEIGHTS = "yolov8n.pt"
+
+# Object detection over the whole frame, or only around the wrists.
+DETECTION_REGIONS = ("full", "wrists")
+# Wrist regions, as ``wristRois`` in frontend/scoring.js.
+ROI_MIN_HALF_PX = 80
+ROI_MAX_HALF_PX = 200
+ROI_FOREARM_SCALE = 1.5
+ROI_MIN_VISIBILITY = 0.5
+
+
+class PoseEstimator:
+    def __init__(self, **options):
+        import mediapipe as mp
+
+        self._pose = mp.solutions.pose.Pose(static_image_mode=False, **{**POSE_OPTIONS, **options})
+
+    def process(self, frame_rgb):
+        """Landmarks of the single most prominent person, or ``None``."""
+        result = self._pose.process(frame_rgb)
+        if result.pose_landmarks is None:
+            return None
+        return np.array([(p.x, p.y, p.z, p.visibility) for p in result.pose_landmarks.landmark], dtype=np.float32)
+
+    def close(self):
+        self._pose.close()
+
+
+class BatchDetector(ABC):
+    """Single-frame, region and near-hands detection on top of ``detect_batch``."""
+
+    def detect(self, frame_bgr):
+        return self.detect_batch([frame_bgr])[0]
+
+    @abstractmethod
+    def detect_batch(self, frames_bgr):
+        """``[(class_name, score, [x, y, w, h]), ...]`` in pixels for each frame, in order."""
+
+    def detect_rois(self, frame_bgr, rois):
+        """Detect in each ``(x, y, w, h)`` region as one batch; boxes in frame pixels."""
+        if not rois:
+            return []
+        crops = [np.ascontiguousarray(frame_bgr[y:y + h, x:x + w]) for x, y, w, h in rois]
+        detections = []
+        for (x, y, _, _), found in zip(rois, self.detect_batch(crops)):
+            detections += [(name, score, [bx + x, by + y, bw, bh]) for name, score, (bx, by, bw, bh) in found]
+        return detections
+
+    def detect_near_hands(self, frame_bgr, landmarks):
+        height, width = frame_bgr.shape[:2]
+        return self.detect_rois(frame_bgr, wrist_rois(landmarks, width, height))
+
+
+class ObjectDetector(BatchDetector):
+    def __init__(self, weights=YOLO_WEIGHTS):
+        from ultralytics import YOLO
+
+        self._model = YOLO(weights)
+
+    def detect_batch(self, frames_bgr):
+        results = self._model(frames_bgr, verbose=False)
+        return [_to_detections(r) for r in results]
+
+
+def _to_detections(result):
+    names = result.names
+    boxes = result.boxes
+    xyxy = boxes.xyxy.cpu().numpy()
+    conf = boxes.conf.cpu().numpy()
+    cls = boxes.cls.cpu().numpy().astype(int)
+    return [
+        (names[c], float(s), [float(x1), float(y1), float(x2 - x1), float(y2 - y1)])
+        for (x1, y1, x2, y2), s, c in zip(xyxy, conf, cls)
+    ]
+
+
+def wrist_pixels(landmarks, width, height):
+    """Left / right wrist pixel positions as used by ``isHandNearBox``."""
+    if landmarks is None:
+        return None, None
+    return (
+        (landmarks[15, 0] * width, landmarks[15, 1] * height),
+        (landmarks[16, 0] * width, landmarks[16, 1] * height),
+    )
+
+
+def wrist_rois(landmarks, width, height):
+    """Integer ``(x, y, w, h)`` squares around the visible wrists, merged when they overlap."""
+    rois = []
+    for w, e in ((15, 13), (16, 14)):
+        if landmarks.shape[1] > 3 and landmarks[w, 3] < ROI_MIN_VISIBILITY:
+            continue
+        x, y = landmarks[w, 0] * width, landmarks[w, 1] * height
+        if not (0 <= x < width and 0 <= y < height):
+            continue
+        forearm = np.hypot(x - landmarks[e, 0] * width, y - landmarks[e, 1] * height)
+        half = min(ROI_MAX_HALF_PX, max(ROI_MIN_HALF_PX, ROI_FOREARM_SCALE * forearm))
+        x0, y0 = max(0, int(np.floor(x - half))), max(0, int(np.floor(y - half)))
+        x1, y1 = min(width, int(np.ceil(x + half))), min(height, int(np.ceil(y + half)))
+        rois.append((x0, y0, x1 - x0, y1 - y0))
+    if len(rois) == 2:
+        (ax, ay, aw, ah), (bx, by, bw, bh) = rois
+        if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+            x0, y0 = min(ax, bx), min(ay, by)
+            rois = [(x0, y0, max(ax + aw, bx + bw) - x0, max(ay + ah, by + bh) - y0)]
+    return rois
@@ -0,0 +1,264 @@
+"""Server-side inference over WebRTC for client devices too slow to run it.
+
+The browser only captures and displays.  ``streamlit-webrtc`` sends its camera
+frames to one ``ServerVideoProcessor`` per connection, which runs pose, object
+detection and scoring in Python and sends the annotated frames back.  ``recv``
+never waits for inference: it queues the frame in a bounded ``FrameQueue``,
+which drops the oldest frame when inference falls behind, and returns the
+latest annotated frame, so what the operator sees lags by at most one
+inference plus the queue.  Each connection keeps its own ``PoseEstimator``
+(temporal smoothing) and ``AuditSession``.  The object detector is the
+process-wide ``detectors.shared_pool``, so frames from concurrent connections
+are detected in one batch.  ``stats()`` is the per-connection latency readout.
+
+ICE uses public STUN, plus Metered TURN when ``METERED_API_KEY`` and
+``METERED_DOMAIN`` are set.  ``benchmarks/webrtc_loopback.py`` connects local
+aiortc peers to the processor with no ICE servers at all.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from urllib.request import urlopen
+
+import numpy as np
+
+import reba_engine
+from session import AuditSession
+from vision import PoseEstimator, wrist_pixels
+
+QUEUE_FRAMES = 2
+# A queued frame older than this is skipped when a newer one is waiting.
+MAX_FRAME_AGE_S = 0.5
+LATENCY_WINDOW = 300
+STUN_SERVERS = [{"urls": ["stun:stun.l.google.com:19302"]}]
+METERED_CREDENTIALS_URL = "https://{domain}/api/v1/turn/credentials?apiKey={key}"
+
+# Banner colours (BGR) by REBA risk: low, medium, high.
+RISK_COLORS = ((80, 175, 76), (0, 165, 255), (54, 67, 244))
+
+
+def rtc_configuration(api_key=None, domain=None):
+    """ICE servers for ``webrtc_streamer``: Metered TURN when configured, public STUN otherwise."""
+    api_key = api_key or os.environ.get("METERED_API_KEY")
+    domain = domain or os.environ.get("METERED_DOMAIN")
+    servers = list(STUN_SERVERS)
+    if api_key and domain:
+        try:
+            with urlopen(METERED_CREDENTIALS_URL.format(domain=domain, key=api_key), timeout=5) as response:
+                servers += json.load(response)
+        except (OSError, ValueError):
+            pass
+    return {"iceServers": servers}
+
+
+class FrameQueue:
+    """Bounded thread-safe frame queue; a full queue drops its oldest frame."""
+
+    def __init__(self, maxsize=QUEUE_FRAMES, max_age_s=MAX_FRAME_AGE_S):
+        self.maxsize = maxsize
+        self.max_age_s = max_age_s
+        self.received = 0
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, arrived, frame):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append((arrived, frame))
+            self.received += 1
+            self._cond.notify()
+
+    def get(self):
+        """The oldest frame still fresh, as ``(arrived, frame)``; ``None`` once closed."""
+        with self._cond:
+            while True:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return None
+                arrived, frame = self._items.popleft()
+                if self._items and time.perf_counter() - arrived > self.max_age_s:
+                    self.dropped += 1
+                    continue
+                return arrived, frame
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def _percentile(values, q):
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+
+def annotate(frame_bgr, landmarks, detections, live):
+    """Skeleton, detected objects and a REBA / LI banner drawn on a copy of the frame."""
+    import cv2
+    import mediapipe as mp
+
+    out = frame_bgr.copy()
+    height, width = out.shape[:2]
+    if landmarks is not None:
+        points = [(int(x * width), int(y * height)) for x, y in landmarks[:, :2]]
+        for a, b in mp.solutions.pose.POSE_CONNECTIONS:
+            cv2.line(out, points[a], points[b], (255, 255, 255), 2)
+        for x, y in points:
+            cv2.circle(out, (x, y), 3, (0, 0, 255), -1)
+    for name, score, (x, y, w, h) in detections:
+        if name != "person" and score > reba_engine.THRESHOLDS["det_min_score"]:
+            cv2.rectangle(out, (int(x), int(y)), (int(x + w), int(y + h)), (255, 200, 0), 2)
+            cv2.putText(out, name, (int(x), max(12, int(y) - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 200, 0), 1)
+    if live:
+        reba = live["reba"]
+        color = RISK_COLORS[0 if reba < 4 else 1 if reba < 8 else 2]
+        cv2.rectangle(out, (0, 0), (width, 26), color, -1)
+        text = f"REBA {reba}  LI {live['li']:.2f}  {live['mmh_zone']}  {live['object']}"
+        cv2.putText(out, text, (6, 18), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (255, 255, 255), 1, cv2.LINE_AA)
+    return out
+
+
+class ServerVideoProcessor:
+    """Per-connection processor for ``webrtc_streamer(video_processor_factory=...)``.
+
+    ``detector`` is any ``vision.BatchDetector`` (normally the shared pool) or
+    ``None`` to skip object detection; it runs on every ``det_every``-th frame
+    and the boxes are reused in between, as in the browser.
+    """
+
+    def __init__(self, operator_id="OP-001", profile="Male", actual_wt=8.0, workstation="", detector=None,
+                 det_region="full", det_every=1, pose=None, **session_options):
+        self.session = AuditSession(operator_id, profile, actual_wt, workstation, **session_options)
+        self.session_id = f"server-{uuid.uuid4().hex[:8]}-{int(time.time() * 1000)}"
+        self.started_at = datetime.now(timezone.utc)
+        self.detector = detector
+        self.det_region = det_region
+        self.det_every = max(1, int(det_every))
+        self.queue = FrameQueue()
+        self.processed = 0
+        self.no_pose = 0
+        self.error = None
+        self.live = None
+        self._pose = pose
+        self._detections = []
+        self._t0 = None
+        self._latest = None
+        self._lock = threading.Lock()
+        self._latency_ms = deque(maxlen=LATENCY_WINDOW)
+        self._infer_ms = deque(maxlen=LATENCY_WINDOW)
+        self._lag_ms = deque(maxlen=LATENCY_WINDOW)
+        self._done = deque(maxlen=LATENCY_WINDOW)
+        self._thread = threading.Thread(target=self._run, name=f"webrtc-{self.session_id}", daemon=True)
+        self._thread.start()
+
+    def recv(self, frame):
+        """Queue an incoming ``av.VideoFrame`` and return the latest annotated frame in its place."""
+        import av
+
+        image = frame.to_ndarray(format="bgr24")
+        now = time.perf_counter()
+        self.queue.put(now, image)
+        with self._lock:
+            latest = self._latest
+        if latest is not None and latest[1].shape == image.shape:
+            self._lag_ms.append((now - latest[0]) * 1000)
+            image = latest[1]
+        out = av.VideoFrame.from_ndarray(image, format="bgr24")
+        out.pts, out.time_base = frame.pts, frame.time_base
+        return out
+
+    def process(self, frame_bgr, t):
+        """Pose, detection, scoring and annotation of one frame taken ``t`` seconds into the session."""
+        import cv2
+
+        lm = self._pose.process(cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB))
+        if lm is None:
+            self.no_pose += 1
+            return annotate(frame_bgr, None, self._detections, self.live)
+        height, width = frame_bgr.shape[:2]
+        if self.detector is not None and self.processed % self.det_every == 0:
+            if self.det_region == "wrists":
+                self._detections = self.detector.detect_near_hands(frame_bgr, lm)
+            else:
+                self._detections = self.detector.detect(frame_bgr)
+        obj = reba_engine.hand_object(self._detections, *wrist_pixels(lm, width, height))
+        scores = self.session.score(lm[None], [obj], [t], width, height)
+        self.live = {
+            "reba": int(scores["reba"][0]),
+            "li": float(scores["li"][0]),
+            "mmh_zone": reba_engine.MMH_ZONES[int(scores["mmh_zone"][0])],
+            "object": obj,
+        }
+        return annotate(frame_bgr, lm, self._detections, self.live)
+
+    def _run(self):
+        if self._pose is None:
+            self._pose = PoseEstimator()
+        try:
+            while (item := self.queue.get()) is not None:
+                arrived, frame = item
+                if self._t0 is None:
+                    self._t0 = arrived
+                start = time.perf_counter()
+                try:
+                    annotated = self.process(frame, arrived - self._t0)
+                except Exception as exc:
+                    self.error = repr(exc)
+                    continue
+                done = time.perf_counter()
+                with self._lock:
+                    self._latest = (arrived, annotated)
+                self.processed += 1
+                self._infer_ms.append((done - start) * 1000)
+                self._latency_ms.append((done - arrived) * 1000)
+                self._done.append(done)
+        finally:
+            self._pose.close()
+
+    def stats(self):
+        """Per-connection readout: throughput, drops and latency percentiles over the recent frames."""
+        done = list(self._done)
+        received = self.queue.received
+        return {
+            "received": received,
+            "processed": self.processed,
+            "dropped": self.queue.dropped,
+            "drop_pct": round(100.0 * self.queue.dropped / max(received, 1), 1),
+            "no_pose": self.no_pose,
+            "fps": round((len(done) - 1) / (done[-1] - done[0]), 1) if len(done) > 1 and done[-1] > done[0] else 0.0,
+            # Arrival to annotated result (queue wait + inference).
+            "latency_p50_ms": _percentile(self._latency_ms, 50),
+            "latency_p95_ms": _percentile(self._latency_ms, 95),
+            "infer_p50_ms": _percentile(self._infer_ms, 50),
+            # Age of the annotated frame sent back in place of each new one.
+            "lag_p50_ms": _percentile(self._lag_ms, 50),
+            "lag_p95_ms": _percentile(self._lag_ms, 95),
+            "peak_reba": self.session.peak_reba,
+            "live": self.live,
+            "error": self.error,
+        }
+
+    def on_ended(self):
+        """Stop inference; called by ``streamlit-webrtc`` when the connection closes."""
+        self.queue.close()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=5)
+
+    def summary(self):
+        """The session summary (as from the live component), once the connection has ended."""
+        self.on_ended()
+        return {
+            **self.session.summary(),
+            "session_id": self.session_id,
+            "started_at": self.started_at.isoformat(),
+            "pipeline": "server",
+        }
@@ -0,0 +1,140 @@
+"""Incremental sliding-window REBA / LI statistics, mirroring ``frontend/window_stats.js``.
+
+``SlidingWindow`` keeps time-stamped samples in a bounded deque with a running
+sum (mean), monotonic deques (max / min) and a fixed-bin histogram
+(percentiles), so each push is O(1) amortised.  ``PostureWindows`` adds the
+sustained level: the worst REBA / LI held for at least ``sustain_s`` seconds,
+whose peak only moves when it strictly improves.  A tracking gap longer than
+``MAX_GAP_S`` restarts the held windows instead of bridging them.
+"""
+
+import math
+from collections import deque
+
+import numpy as np
+
+REBA_BINS = (-0.5, 1.0, 16)
+LI_BINS = (0.0, 0.05, 200)
+# Share of the sustain time a held window must span before it counts.
+SUSTAIN_COVERAGE = 0.9
+# Longest time between frames that a held window bridges; longer gaps (lost
+# tracking, a paused camera) restart it, as nothing is known about the posture.
+MAX_GAP_S = 0.5
+# Highest frame rate a window keeps every sample of; its buffer holds
+# window_s * MAX_FPS samples, beyond which the oldest are dropped.
+MAX_FPS = 120
+
+
+class SlidingWindow:
+    def __init__(self, window_s, bins=REBA_BINS, capacity=None):
+        self.window_s = window_s
+        self.lo, self.width, self.n_bins = bins
+        self.capacity = capacity or math.ceil(window_s * MAX_FPS) + 1
+        self.reset()
+
+    def reset(self):
+        self.samples = deque()  # (index, t, value, bin)
+        self.max_q = deque()    # (index, value), values decreasing
+        self.min_q = deque()    # (index, value), values increasing
+        self.hist = np.zeros(self.n_bins, dtype=np.int64)
+        self.sum = 0.0
+        self._next = 0
+
+    def __len__(self):
+        return len(self.samples)
+
+    def _evict_oldest(self):
+        i, _, value, b = self.samples.popleft()
+        self.sum -= value
+        self.hist[b] -= 1
+        if self.max_q and self.max_q[0][0] == i:
+            self.max_q.popleft()
+        if self.min_q and self.min_q[0][0] == i:
+            self.min_q.popleft()
+
+    def push(self, t, value):
+        while self.samples and t - self.samples[0][1] > self.window_s:
+            self._evict_oldest()
+        if len(self.samples) == self.capacity:
+            self._evict_oldest()
+
+        i = self._next
+        self._next += 1
+        b = min(max(int(np.floor((value - self.lo) / self.width)), 0), self.n_bins - 1)
+        self.samples.append((i, t, value, b))
+        self.sum += value
+        self.hist[b] += 1
+        while self.max_q and self.max_q[-1][1] <= value:
+            self.max_q.pop()
+        self.max_q.append((i, value))
+        while self.min_q and self.min_q[-1][1] >= value:
+            self.min_q.pop()
+        self.min_q.append((i, value))
+
+    @property
+    def span(self):
+        return self.samples[-1][1] - self.samples[0][1] if self.samples else 0.0
+
+    @property
+    def mean(self):
+        return self.sum / len(self.samples) if self.samples else 0.0
+
+    @property
+    def max(self):
+        return self.max_q[0][1] if self.samples else 0.0
+
+    @property
+    def min(self):
+        return self.min_q[0][1] if self.samples else 0.0
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        target = max(1, int(np.ceil(q * len(self.samples))))
+        b = int(np.searchsorted(np.cumsum(self.hist), target))
+        return min(self.lo + (b + 0.5) * self.width, self.max)
+
+
+class PostureWindows:
+    def __init__(self, rolling_s=10.0, sustain_s=3.0):
+        self.rolling_s = rolling_s
+        self.sustain_s = sustain_s
+        self.reba_rolling = SlidingWindow(rolling_s, REBA_BINS)
+        self.li_rolling = SlidingWindow(rolling_s, LI_BINS)
+        self.reba_held = SlidingWindow(sustain_s, REBA_BINS)
+        self.li_held = SlidingWindow(sustain_s, LI_BINS)
+        self.sustained_reba = None
+        self.sustained_li = None
+        self.sustained_reba_at = None
+        self._last_t = None
+
+    def push(self, t, reba, li):
+        """Add one frame; returns True when the sustained REBA peak improved."""
+        if self._last_t is not None and t - self._last_t > MAX_GAP_S:
+            self.reba_held.reset()
+            self.li_held.reset()
+        self._last_t = t
+        self.reba_rolling.push(t, reba)
+        self.li_rolling.push(t, li)
+        self.reba_held.push(t, reba)
+        self.li_held.push(t, li)
+        if self.reba_held.span < SUSTAIN_COVERAGE * self.sustain_s:
+            return False
+
+        held_li = self.li_held.min
+        if self.sustained_li is None or held_li > self.sustained_li:
+            self.sustained_li = held_li
+        held_reba = self.reba_held.min
+        if self.sustained_reba is None or held_reba > self.sustained_reba:
+            self.sustained_reba = held_reba
+            self.sustained_reba_at = t
+            return True
+        return False
+
+    def rolling(self):
+        return {
+            "reba_mean": self.reba_rolling.mean, "reba_max": self.reba_rolling.max,
+            "reba_p95": self.reba_rolling.percentile(0.95),
+            "li_mean": self.li_rolling.mean, "li_max": self.li_rolling.max,
+            "li_p95": self.li_rolling.percentile(0.95),
+        }